@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 from typing import Optional
 from pydantic import BaseSettings
-from core.security import create_access_token, verify_jwt_token
-from core.config import get_settings
+from app.core.config import get_settings
+from app.core.api_keys import api_key_manager
+from app.core.database import SessionLocal
+from app.core.ip_filter import ip_filter
+from app.core.key_ring import key_ring
+from app.core.permissions import permission_matrix
 
 # ルーターの初期化
 router = APIRouter()
@@ -57,6 +61,9 @@ def initialize_auth() -> None:
     """認証システムを初期化する関数"""
     # APIキーの設定
     api_keys = setup_api_keys()
+    # キャッシュにないAPIキーとユーザー権限はこのセッションで読み込む
+    api_key_manager.session_factory = SessionLocal
+    permission_matrix.session_factory = SessionLocal
     
     # OAuth設定の初期化
     oauth_config = configure_oauth()
@@ -73,4 +80,16 @@ def initialize_auth() -> None:
     print("Authentication system initialized successfully")
 
 # 初期化の実行
-initialize_auth()
\ No newline at end of file
+initialize_auth()
+
+# 鍵ファイルのローテーションとIPルールの変更を各ワーカーに反映する
+@router.on_event("startup")
+async def startup_event():
+    key_ring.load()
+    await key_ring.watch()
+    await ip_filter.watch()
+
+@router.on_event("shutdown")
+async def shutdown_event():
+    await key_ring.stop()
+    await ip_filter.stop()
\ No newline at end of file
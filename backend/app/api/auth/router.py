@@ -8,6 +8,7 @@ from app.schemas.auth import (
     Message
 )
 from app.core.dependencies import get_auth_service
+from app.core.security import security_manager
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -71,7 +72,10 @@ class AuthController:
             HTTPException: トークンの無効化に失敗した場合
         """
         try:
-            return await self.auth_service.revoke_token(token)
+            result = await self.auth_service.revoke_token(token)
+            # 検証済みキャッシュに残っていると無効化後も受け付けてしまうため削除する
+            security_manager.invalidate_token(token)
+            return result
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -0,0 +1,14 @@
+import math
+
+from fastapi import HTTPException
+
+from app.core.rate_limiter import RateLimitExceeded
+
+
+def too_many_requests(error: RateLimitExceeded) -> HTTPException:
+    """RateLimitExceededを Retry-After 付きの429レスポンスに変換する"""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
@@ -1,11 +1,41 @@
-from fastapi import APIRouter
-from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
-from core.event_system import EventSystem
-from services.trigger_service import TriggerService
+from app.core.database import SessionLocal
+from app.core.event_system import ALL_EVENTS, Event, EventQueueFullError, event_system
+from app.core.authorization import require_permission
+from app.core.condition_compiler import (
+    CompiledTrigger,
+    ConditionCompileError,
+    compile_condition,
+    trigger_index
+)
+from app.core.pagination import (
+    PaginationError,
+    bad_request,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+    parse_fields
+)
+from app.core.rate_limiter import RateLimitExceeded
+from app.core.trigger_registry import index_trigger, trigger_registry
+from app.core.trigger_scheduler import TimeTriggerScheduler
+from app.models.trigger import TRIGGER_FIELDS, ActionType, TriggerType, serialize_triggers
+from app.services.trigger_service import TriggerService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# トリガーが発行したイベントに付ける発行元（トリガーの照合には戻さない）
+TRIGGER_EVENT_SOURCE = "trigger"
+
+# initialize_triggers()で生成されるトリガーシステム
+trigger_system: Optional["EventTriggerSystem"] = None
+
 class TriggerConfig(BaseModel):
     """トリガー設定を管理するクラス"""
     event_type: str
@@ -17,9 +47,11 @@ class TriggerConfig(BaseModel):
 
 class EventTriggerSystem:
     def __init__(self):
-        self.event_system = EventSystem()
+        # エフェクトの発動・終了イベントと同じイベントシステムでトリガーを照合する
+        self.event_system = event_system
         self.trigger_service = TriggerService()
         self._registered_event_types: List[str] = []
+        self.scheduler = TimeTriggerScheduler(self.dispatch_action)
 
     async def register_event_types(self) -> None:
         """
@@ -52,10 +84,113 @@ class EventTriggerSystem:
         
         await self.event_system.add_listener("system_alert", global_system_monitor)
 
+        # 全てのイベントをトリガーインデックスで照合する
+        await self.event_system.add_listener(ALL_EVENTS, self.handle_event)
+
+    def find_matching_triggers(self, event_type: str, event_data: Dict) -> List[CompiledTrigger]:
+        """
+        イベントに一致する有効なトリガーをインデックスから取得
+        """
+        return trigger_index.match(event_type, event_data)
+
+    async def handle_event(self, event: Event) -> None:
+        """
+        イベントに一致したトリガーのアクションを実行する
+
+        インデックスで候補を絞ってから条件を評価するため、全トリガーは走査しない。
+        トリガー自身が発行したイベントは照合しない（自分に一致するトリガーが
+        発火し続けるのを防ぐ）。
+
+        Args:
+            event: 発生したイベント
+        """
+        if event.source == TRIGGER_EVENT_SOURCE:
+            return
+        for compiled in self.find_matching_triggers(event.type, event.data):
+            for action in compiled.payload or ():
+                await self.dispatch_action(compiled.trigger_id, action)
+
+    async def setup_scheduler(self) -> None:
+        """
+        レジストリの有効なTIMEトリガーでスケジューラーを開始する
+
+        以降の変更はレジストリの変更通知で反映される。
+        """
+        self.scheduler.load(trigger_registry.active(TriggerType.TIME))
+        trigger_registry.subscribe(self.scheduler.apply_change)
+        await self.scheduler.start()
+
+    async def dispatch_action(self, trigger_id: Any, action: Dict[str, Any]) -> None:
+        """
+        発火したトリガーのアクションをイベントとして発行する
+
+        スケジューラーとイベントワーカーから呼ばれるため、キューの空きは待たない
+        （満杯の場合はイベントシステムの背圧ポリシーに従って捨てる）。
+
+        Args:
+            trigger_id: 発火したトリガーのID
+            action: TriggerAction.to_dict()の形式のアクション
+        """
+        parameters = action.get("parameters") or {}
+        if action["action_type"] == ActionType.EFFECT.value:
+            try:
+                # トリガーごとのバケットで制限し、発火し続けるトリガーだけを止める
+                await self.event_system.trigger_effect(
+                    parameters.get("effect_type", "effect"),
+                    parameters,
+                    user=f"trigger:{trigger_id}",
+                    source=TRIGGER_EVENT_SOURCE,
+                    block=False
+                )
+            except (RateLimitExceeded, EventQueueFullError) as e:
+                # 発火し続けるトリガーがキューとサーバーを埋めないよう、制限中の発火は捨てる
+                logger.warning(f"Skipped effect action of trigger {trigger_id}: {str(e)}")
+            return
+        try:
+            await self.event_system.publish(Event(
+                type=action["action_type"],
+                data={"trigger_id": trigger_id, "parameters": parameters},
+                source=TRIGGER_EVENT_SOURCE
+            ), block=False)
+        except EventQueueFullError as e:
+            logger.warning(f"Skipped {action['action_type']} action of trigger {trigger_id}: {str(e)}")
+
+async def sync_trigger(trigger_id: Any) -> None:
+    """
+    作成・更新・削除されたトリガーをレジストリに反映する
+
+    レジストリの購読者（スケジューラー・トリガーインデックス）にも変更が通知される。
+
+    Args:
+        trigger_id: 変更されたトリガーのID
+    """
+    await trigger_registry.refresh(trigger_id)
+
+def fetch_trigger_page(
+    after: Optional[int],
+    limit: int,
+    trigger_type: Optional[TriggerType] = None,
+    is_active: Optional[bool] = None,
+    user_id: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """データベースからトリガーを1ページ分読み込む（スレッドで実行する）"""
+    with SessionLocal() as db:
+        return serialize_triggers(
+            db,
+            after=after,
+            limit=limit,
+            trigger_type=trigger_type,
+            is_active=is_active,
+            user_id=user_id,
+            fields=fields
+        )
+
 async def initialize_triggers() -> None:
     """
     トリガーシステムの初期化とセットアップを行う
     """
+    global trigger_system
     trigger_system = EventTriggerSystem()
     
     # イベントタイプの登録
@@ -67,23 +202,75 @@ async def initialize_triggers() -> None:
     # トリガーサービスの初期化
     await trigger_system.trigger_service.initialize()
 
+    # トリガーレジストリとインデックスの構築（以降は変更時に差分だけを反映する）
+    trigger_registry.subscribe(index_trigger)
+    await trigger_registry.load(SessionLocal)
+
+    # TIMEトリガーのスケジューラーを開始
+    await trigger_system.setup_scheduler()
+
 # APIルートの設定
-@router.post("/triggers")
+@router.post("/triggers", dependencies=[Depends(require_permission("triggers", "write"))])
 async def create_trigger(trigger_config: TriggerConfig):
     """新しいトリガーを作成"""
-    return await TriggerService().create_trigger(trigger_config)
+    try:
+        compile_condition(trigger_config.condition)
+    except ConditionCompileError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid trigger condition: {str(e)}")
+
+    trigger = await TriggerService().create_trigger(trigger_config)
+    # インデックスへの登録はレジストリの変更通知で行う
+    await sync_trigger(trigger.id)
+    return trigger
+
+@router.get("/triggers", dependencies=[Depends(require_permission("triggers", "read"))])
+async def get_triggers(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    type: Optional[TriggerType] = None,
+    is_active: Optional[bool] = None,
+    fields: Optional[str] = None
+):
+    """登録されているトリガーの一覧をカーソルページネーションで取得"""
+    try:
+        after = decode_cursor(cursor)
+        projection = parse_fields(fields, TRIGGER_FIELDS)
+    except PaginationError as e:
+        raise bad_request(e)
 
-@router.get("/triggers")
-async def get_triggers():
-    """登録されているトリガーの一覧を取得"""
-    return await TriggerService().get_all_triggers()
+    limit = clamp_limit(limit)
+    if trigger_registry.loaded:
+        rows = trigger_registry.page(
+            after,
+            limit + 1,
+            trigger_type=type.value if type else None,
+            is_active=is_active
+        )
+    else:
+        # レジストリの読み込み前は、指定されたカラムだけをキーセット方式で読み込む
+        rows = await asyncio.to_thread(
+            fetch_trigger_page,
+            after,
+            limit + 1,
+            trigger_type=type,
+            is_active=is_active,
+            fields=projection
+        )
+    return build_page(rows, limit, projection)
 
-@router.get("/triggers/{trigger_id}")
+@router.get("/triggers/{trigger_id}", dependencies=[Depends(require_permission("triggers", "read"))])
 async def get_trigger(trigger_id: str):
     """特定のトリガーの詳細を取得"""
+    if trigger_registry.loaded:
+        trigger = trigger_registry.get(trigger_id)
+        if trigger is None:
+            raise HTTPException(status_code=404, detail="Trigger not found")
+        return trigger
     return await TriggerService().get_trigger(trigger_id)
 
-@router.delete("/triggers/{trigger_id}")
+@router.delete("/triggers/{trigger_id}", dependencies=[Depends(require_permission("triggers", "delete"))])
 async def delete_trigger(trigger_id: str):
     """トリガーを削除"""
-    return await TriggerService().delete_trigger(trigger_id)
\ No newline at end of file
+    result = await TriggerService().delete_trigger(trigger_id)
+    await sync_trigger(trigger_id)
+    return result
\ No newline at end of file
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
 from app.services import trigger_service
 from app.schemas.trigger import (
     TriggerCreate,
@@ -7,7 +8,21 @@ from app.schemas.trigger import (
     Trigger,
     Message
 )
+from app.schemas.pagination import Page
 from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.core.authorization import require_permission
+from app.core.condition_compiler import ConditionCompileError, compile_condition
+from app.core.pagination import (
+    PaginationError,
+    bad_request,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+    parse_fields
+)
+from app.api.event_triggers import sync_trigger
+from app.models.trigger import TRIGGER_FIELDS, TriggerType, serialize_triggers
 from app.models.user import User
 
 router = APIRouter(
@@ -18,7 +33,7 @@ router = APIRouter(
 class TriggerController:
     """トリガー制御のハンドラクラス"""
     
-    @router.post("/create", response_model=Trigger)
+    @router.post("/create", response_model=Trigger, dependencies=[Depends(require_permission("triggers", "write"))])
     async def create_trigger(
         trigger_data: TriggerCreate,
         current_user: User = Depends(get_current_user)
@@ -33,11 +48,20 @@ class TriggerController:
         Returns:
             作成されたトリガーオブジェクト
         """
+        try:
+            compile_condition(trigger_data.condition)
+        except ConditionCompileError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"トリガー条件が不正です: {str(e)}"
+            )
+
         try:
             trigger = await trigger_service.create_trigger(
                 trigger_data=trigger_data,
                 user_id=current_user.id
             )
+            await sync_trigger(trigger.id)
             return trigger
         except Exception as e:
             raise HTTPException(
@@ -45,29 +69,51 @@ class TriggerController:
                 detail=f"トリガーの作成に失敗しました: {str(e)}"
             )
 
-    @router.get("/list", response_model=List[Trigger])
+    @router.get("/list", response_model=Page, dependencies=[Depends(require_permission("triggers", "read"))])
     async def list_triggers(
-        current_user: User = Depends(get_current_user)
-    ) -> List[Trigger]:
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1),
+        type: Optional[TriggerType] = None,
+        is_active: Optional[bool] = None,
+        fields: Optional[str] = None,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ) -> Page:
         """
-        ユーザーのトリガー一覧を取得する
+        ユーザーのトリガー一覧をカーソルページネーションで取得する
         
         Args:
+            cursor: 前のページのnext_cursor（先頭ページは省略）
+            limit: 1ページあたりの件数
+            type: トリガーの種類で絞り込む
+            is_active: 有効/無効状態で絞り込む
+            fields: 返すフィールド（カンマ区切り）。指定したカラムだけを読み込む
             current_user: 現在のログインユーザー
+            db: データベースセッション
             
         Returns:
-            トリガーオブジェクトのリスト
+            トリガーのページ
         """
         try:
-            triggers = await trigger_service.list_triggers(user_id=current_user.id)
-            return triggers
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"トリガー一覧の取得に失敗しました: {str(e)}"
-            )
+            after = decode_cursor(cursor)
+            projection = parse_fields(fields, TRIGGER_FIELDS)
+        except PaginationError as e:
+            raise bad_request(e)
+
+        # 所有ユーザーのトリガーだけを、指定されたカラムだけSELECTする
+        limit = clamp_limit(limit)
+        triggers = serialize_triggers(
+            db,
+            after=after,
+            limit=limit + 1,
+            trigger_type=type,
+            is_active=is_active,
+            user_id=current_user.id,
+            fields=projection
+        )
+        return build_page(triggers, limit, projection)
 
-    @router.put("/{trigger_id}", response_model=Trigger)
+    @router.put("/{trigger_id}", response_model=Trigger, dependencies=[Depends(require_permission("triggers", "write"))])
     async def update_trigger(
         trigger_id: str,
         trigger_data: TriggerUpdate,
@@ -84,12 +130,22 @@ class TriggerController:
         Returns:
             更新されたトリガーオブジェクト
         """
+        if trigger_data.condition is not None:
+            try:
+                compile_condition(trigger_data.condition)
+            except ConditionCompileError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"トリガー条件が不正です: {str(e)}"
+                )
+
         try:
             trigger = await trigger_service.update_trigger(
                 trigger_id=trigger_id,
                 trigger_data=trigger_data,
                 user_id=current_user.id
             )
+            await sync_trigger(trigger.id)
             return trigger
         except Exception as e:
             raise HTTPException(
@@ -97,7 +153,7 @@ class TriggerController:
                 detail=f"トリガーの更新に失敗しました: {str(e)}"
             )
 
-    @router.delete("/{trigger_id}", response_model=Message)
+    @router.delete("/{trigger_id}", response_model=Message, dependencies=[Depends(require_permission("triggers", "delete"))])
     async def delete_trigger(
         trigger_id: str,
         current_user: User = Depends(get_current_user)
@@ -117,6 +173,7 @@ class TriggerController:
                 trigger_id=trigger_id,
                 user_id=current_user.id
             )
+            await sync_trigger(trigger_id)
             return message
         except Exception as e:
             raise HTTPException(
@@ -1,12 +1,18 @@
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
-import json
+from typing import Any, Dict, List, Optional
 import logging
 from pathlib import Path
 
+from app.core.config import get_settings
 from app.core.minecraft_bridge import MinecraftConnection
 from app.core.effect_engine import EffectEngine
+from app.core.effect_lifecycle import EffectCapacityError
+from app.core.effect_store import EffectView
+from app.core.event_system import Event, EventSystem, event_system
+from app.core.id_generator import effect_id_generator
+from app.core.preset_catalog import PresetCatalog
+from app.core.rate_limiter import effect_admission
 
 # ルーターの初期化
 router = APIRouter()
@@ -15,7 +21,7 @@ class EffectConfig(BaseModel):
     """エフェクト設定を管理するクラス"""
     name: str
     type: str
-    parameters: Dict[str, any]
+    parameters: Dict[str, Any]
     duration: int = Field(ge=0, le=3600)  # 最大1時間
     intensity: float = Field(ge=0.0, le=1.0)
     is_enabled: bool = True
@@ -36,16 +42,12 @@ class EffectConfig(BaseModel):
 effect_engine: Optional[EffectEngine] = None
 minecraft_connection: Optional[MinecraftConnection] = None
 
-def load_presets() -> List[EffectConfig]:
-    """プリセットエフェクトを読み込む"""
-    try:
-        preset_path = Path(__file__).parent / "presets" / "effects.json"
-        with open(preset_path, "r") as f:
-            presets = json.load(f)
-        return [EffectConfig(**preset) for preset in presets]
-    except Exception as e:
-        logging.error(f"Failed to load effect presets: {e}")
-        return []
+# エフェクトタイプ -> エフェクトを生成するEffectEngineのメソッド名
+EFFECT_CREATORS: Dict[str, str] = {
+    "particle": "create_particle_effect",
+    "sound": "create_sound_effect",
+    "light": "create_light_effect"
+}
 
 def validate_effect_params(effect: EffectConfig) -> bool:
     """エフェクトパラメータを検証する"""
@@ -64,26 +66,117 @@ def validate_effect_params(effect: EffectConfig) -> bool:
         logging.error(f"Effect validation failed: {e}")
         return False
 
+# EffectConfig の検証規則や validate_effect_params を変更した場合に上げる（キャッシュを作り直す）
+PRESET_SCHEMA_VERSION = "1"
+
+# プリセットカタログ（名前・タイプでインデックスし、ファイル変更時に再読み込みする）
+preset_catalog: PresetCatalog[EffectConfig] = PresetCatalog(
+    Path(__file__).parent / "presets" / "effects.json",
+    EffectConfig,
+    validator=validate_effect_params,
+    schema_version=PRESET_SCHEMA_VERSION
+)
+
+def load_presets() -> List[EffectConfig]:
+    """プリセットエフェクトを読み込む
+
+    ファイルの内容が前回と同じ場合は再検証せずキャッシュから返す。
+    """
+    preset_catalog.load()
+    return preset_catalog.all()
+
+async def register_presets(catalog: PresetCatalog[EffectConfig]) -> None:
+    """カタログのプリセットをエフェクトエンジンに登録する
+
+    ホットリロードでファイルから削除されたプリセットはエンジンからも取り除く。
+    """
+    if effect_engine is None:
+        return
+    for name in [name for name in effect_engine.presets if name not in catalog]:
+        await effect_engine.unregister_effect(name)
+    for preset in catalog.all():
+        await effect_engine.register_effect(preset)
+
+async def run_effect(event: Event) -> Optional[EffectView]:
+    """
+    エフェクトの発動イベントからエフェクトを生成し、稼働中として登録してサーバーに送信する
+
+    登録したエフェクトはdurationの経過後に取り除かれ、effect_expired イベントが
+    トリガーと同じイベントシステムに発行される。
+
+    Args:
+        event: trigger_effect が発行したイベント（type がエフェクトタイプ）
+
+    Returns:
+        Optional[EffectView]: 稼働中エフェクトのビュー（発動しなかった場合None）
+    """
+    if effect_engine is None:
+        return None
+    parameters = event.data.get("parameters") or {}
+    effect = getattr(effect_engine, EFFECT_CREATORS[event.type])(parameters)
+    try:
+        view = effect_engine.activate_effect(effect)
+    except EffectCapacityError as e:
+        logging.warning(f"Skipped {event.type} effect: {e}")
+        return None
+
+    if minecraft_connection is not None and not await minecraft_connection.send_effect(effect):
+        # 送信できなかったエフェクトは稼働中の一覧に残さない
+        effect_engine.cancel_effect(effect["id"])
+        return None
+    return view
+
+async def setup_effect_handlers(system: EventSystem = event_system) -> None:
+    """エフェクトの発動イベントを run_effect で処理するよう登録する"""
+    for effect_type in EFFECT_CREATORS:
+        await system.add_listener(effect_type, run_effect)
+
 async def initialize_effects():
     """エフェクトシステムを初期化する"""
     global effect_engine
     try:
+        # ワーカーIDの設定の誤りは最初のエフェクト生成ではなく起動時に検出する
+        effect_id_generator.assign_worker()
         effect_engine = EffectEngine()
-        presets = load_presets()
-        for preset in presets:
-            if validate_effect_params(preset):
-                await effect_engine.register_effect(preset)
+        # 検証済みのプリセットだけがカタログに載る
+        load_presets()
+        await register_presets(preset_catalog)
+        preset_catalog.on_reload(register_presets)
+        await preset_catalog.watch()
+        # 発動イベントでエフェクトを生成・登録し、稼働中エフェクトの終了判定を開始
+        await setup_effect_handlers()
+        await effect_engine.start()
         logging.info("Effect system initialized successfully")
     except Exception as e:
         logging.error(f"Failed to initialize effect system: {e}")
         raise
 
-async def setup_minecraft_connection(host: str = "localhost", port: int = 25565):
-    """マインクラフトサーバーとの接続を設定する"""
+async def setup_minecraft_connection(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    password: Optional[str] = None
+):
+    """
+    マインクラフトサーバーとの接続を設定する
+
+    省略した接続先とRCONパスワードは設定（MINECRAFT_HOST, MINECRAFT_RCON_PORT,
+    MINECRAFT_RCON_PASSWORD）から読み込む。
+
+    Raises:
+        ValueError: RCONパスワードが設定されていない場合
+    """
     global minecraft_connection
+    settings = get_settings()
+    host = host or getattr(settings, "MINECRAFT_HOST", "localhost")
+    port = port or getattr(settings, "MINECRAFT_RCON_PORT", 25575)
+    password = password or getattr(settings, "MINECRAFT_RCON_PASSWORD", None)
     try:
-        minecraft_connection = MinecraftConnection(host=host, port=port)
+        if not password:
+            raise ValueError("MINECRAFT_RCON_PASSWORD is not configured")
+        minecraft_connection = MinecraftConnection(host=host, port=port, password=password)
         await minecraft_connection.connect()
+        # RCONの応答が遅延している間はエフェクトの発動を受け付けない
+        effect_admission.controller.latency = minecraft_connection.rcon_latency
         logging.info(f"Successfully connected to Minecraft server at {host}:{port}")
         return minecraft_connection
     except Exception as e:
@@ -95,11 +188,15 @@ async def setup_minecraft_connection(host: str = "localhost", port: int = 25565)
 async def startup_event():
     await initialize_effects()
     await setup_minecraft_connection()
+    # 発動イベントをワーカーで処理する（負荷制御はこのキューの長さで判定する）
+    await event_system.start()
 
 # クリーンアップ処理
 @router.on_event("shutdown")
 async def shutdown_event():
+    await event_system.stop(timeout=10.0)
+    await preset_catalog.stop()
     if minecraft_connection:
-        await minecraft_connection.disconnect()
+        await minecraft_connection.close()
     if effect_engine:
         await effect_engine.cleanup()
\ No newline at end of file
@@ -1,20 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
+from sqlalchemy.orm import Session
 from app.services import effect_service
 from app.schemas.effect import (
     Effect,
     EffectCreate,
     EffectUpdate,
-    EffectPreset,
     TriggerData,
     EffectResult,
     Message
 )
+from app.schemas.pagination import Page
+from app.core.database import get_db
 from app.core.minecraft_bridge import MinecraftBridge
 from app.core.dependencies import get_minecraft_bridge
+from app.core.authorization import API_KEY_HEADER, require_permission
+from app.api.errors import too_many_requests
+from app.core.rate_limiter import RateLimitExceeded, effect_admission
+from app.core.security import security_manager
+from app.core.pagination import (
+    PaginationError,
+    bad_request,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+    fetch_page_rows,
+    parse_fields
+)
+from app.models.effect import Effect as EffectModel, EffectPreset as EffectPresetModel, serialize_effects
 
 router = APIRouter(prefix="/effects", tags=["effects"])
 
+# fields= で指定可能なプリセットのカラム
+PRESET_COLUMNS = {
+    "id": EffectPresetModel.id,
+    "name": EffectPresetModel.name,
+    "effect_id": EffectPresetModel.effect_id,
+    "settings": EffectPresetModel.settings,
+    "created_at": EffectPresetModel.created_at,
+}
+
+def _client_identity(request: Request) -> Optional[str]:
+    """レート制限に使うクライアントの識別子（検証済みトークンのsub、なければ接続元IP）"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = security_manager.verify_token(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except HTTPException:
+            pass
+    return f"ip:{request.client.host}" if request.client else None
+
+async def admit_trigger(request: Request, effect_id: str) -> None:
+    """エフェクト発動リクエストにレート制限と負荷制御を適用する"""
+    try:
+        # エフェクトタイプはサービスで解決されるため、ここではエフェクトIDごとに制限する
+        await effect_admission.admit(
+            effect_id,
+            user=_client_identity(request),
+            api_key=request.headers.get(API_KEY_HEADER)
+        )
+    except RateLimitExceeded as e:
+        raise too_many_requests(e)
+
 class EffectController:
     def __init__(self, minecraft_bridge: MinecraftBridge = Depends(get_minecraft_bridge)):
         self.minecraft_bridge = minecraft_bridge
@@ -27,9 +76,57 @@ class EffectController:
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    async def get_presets(self) -> List[EffectPreset]:
-        """利用可能なエフェクトプリセットのリストを取得する"""
-        return await self.effect_service.get_presets()
+    async def list_effects(
+        self,
+        db: Session,
+        cursor: Optional[str],
+        limit: int,
+        include_presets: bool = False
+    ) -> Page:
+        """エフェクトをパラメータ（とプリセット）付きでカーソルページネーションで取得する"""
+        try:
+            after = decode_cursor(cursor)
+        except PaginationError as e:
+            raise bad_request(e)
+
+        # 関連テーブルは集合クエリでまとめて読むため、件数に関わらずSELECTは最大3回
+        limit = clamp_limit(limit)
+        rows = serialize_effects(db, include_presets=include_presets, after=after, limit=limit + 1)
+        return build_page(rows, limit)
+
+    async def get_presets(
+        self,
+        db: Session,
+        cursor: Optional[str],
+        limit: int,
+        effect_id: Optional[int] = None,
+        effect_type: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """利用可能なエフェクトプリセットをカーソルページネーションで取得する"""
+        try:
+            after = decode_cursor(cursor)
+            projection = parse_fields(fields, PRESET_COLUMNS)
+        except PaginationError as e:
+            raise bad_request(e)
+
+        query = db.query(EffectPresetModel)
+        if effect_id is not None:
+            query = query.filter(EffectPresetModel.effect_id == effect_id)
+        if effect_type is not None:
+            query = query.join(EffectModel).filter(EffectModel.type == effect_type)
+
+        # 指定されたカラムだけをSELECTし、ORMオブジェクトは組み立てない
+        names = projection or list(PRESET_COLUMNS)
+        limit = clamp_limit(limit)
+        rows = fetch_page_rows(
+            query,
+            EffectPresetModel.id,
+            after,
+            limit,
+            columns=[PRESET_COLUMNS[name] for name in names]
+        )
+        return build_page(rows, limit)
 
     async def trigger_effect(self, effect_id: str, trigger_data: TriggerData) -> EffectResult:
         """指定されたエフェクトを実行する"""
@@ -61,22 +158,44 @@ class EffectController:
 controller = EffectController()
 
 # エンドポイントの定義
-@router.post("/create", response_model=Effect)
+@router.post("/create", response_model=Effect, dependencies=[Depends(require_permission("effects", "write"))])
 async def create_effect(effect_data: EffectCreate, controller: EffectController = Depends()):
     return await controller.create_effect(effect_data)
 
-@router.get("/presets", response_model=List[EffectPreset])
-async def get_presets(controller: EffectController = Depends()):
-    return await controller.get_presets()
+@router.get("", response_model=Page, dependencies=[Depends(require_permission("effects", "read"))])
+async def list_effects(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    include_presets: bool = False,
+    db: Session = Depends(get_db),
+    controller: EffectController = Depends()
+):
+    return await controller.list_effects(db, cursor, limit, include_presets)
+
+@router.get("/presets", response_model=Page, dependencies=[Depends(require_permission("effects", "read"))])
+async def get_presets(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    effect_id: Optional[int] = None,
+    type: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    controller: EffectController = Depends()
+):
+    return await controller.get_presets(db, cursor, limit, effect_id, type, fields)
 
-@router.post("/trigger", response_model=EffectResult)
+@router.post(
+    "/trigger",
+    response_model=EffectResult,
+    dependencies=[Depends(require_permission("effects", "write")), Depends(admit_trigger)]
+)
 async def trigger_effect(effect_id: str, trigger_data: TriggerData, controller: EffectController = Depends()):
     return await controller.trigger_effect(effect_id, trigger_data)
 
-@router.put("/{effect_id}", response_model=Effect)
+@router.put("/{effect_id}", response_model=Effect, dependencies=[Depends(require_permission("effects", "write"))])
 async def update_effect(effect_id: str, effect_data: EffectUpdate, controller: EffectController = Depends()):
     return await controller.update_effect(effect_id, effect_data)
 
-@router.delete("/{effect_id}", response_model=Message)
+@router.delete("/{effect_id}", response_model=Message, dependencies=[Depends(require_permission("effects", "delete"))])
 async def delete_effect(effect_id: str, controller: EffectController = Depends()):
     return await controller.delete_effect(effect_id)
\ No newline at end of file
@@ -0,0 +1,326 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.permissions import permission_matrix
+from app.core.token_cache import default_token_cache_ttl
+from app.core.ttl_cache import CacheStats, TTLCache
+from app.models.user import ApiKey, User, query_api_key_by_prefix
+
+logger = logging.getLogger(__name__)
+
+# APIキーの形式: "mk_<12桁の識別子>_<シークレット>"
+API_KEY_SCHEME = "mk"
+PREFIX_BYTES = 6
+SECRET_BYTES = 32
+
+# キーのハッシュに使う秘密値を指定する環境変数（全プロセスで同じ値にすること）
+API_KEY_HASH_SECRET_ENV = "API_KEY_HASH_SECRET"
+
+
+class ApiKeyFormatError(ValueError):
+    """APIキーの形式が不正な場合の例外"""
+
+
+@dataclass(frozen=True)
+class ApiKeyPrincipal:
+    """検証済みAPIキーの所有者
+
+    権限は持たない。検証結果はマスクより長くキャッシュするため、
+    権限は毎回 permission_matrix からユーザーIDで引く。
+    """
+    key_id: int
+    prefix: str
+    key_hash: str
+    user_id: int
+    username: str
+    expires_at: Optional[float]
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    """DateTime列の値をUNIX時刻に変換する（タイムゾーンなしはUTCとみなす）"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _load_hash_secret() -> bytes:
+    configured = os.getenv(API_KEY_HASH_SECRET_ENV)
+    if configured:
+        return configured.encode()
+    logger.warning(
+        f"{API_KEY_HASH_SECRET_ENV} is not set; API keys issued by this process will not validate after a restart"
+    )
+    return secrets.token_bytes(32)
+
+
+class ApiKeyManager:
+    """APIキーの発行と検証
+
+    キーは検索用の識別子とシークレットからなり、データベースには識別子と
+    シークレットのHMAC-SHA256だけを保存する。検証済みのキーは所有者・権限ごと
+    TTL付きのキャッシュに保持するため、2回目以降の認証はデータベースにアクセスしない。
+    読み込み時に所有者の権限も permission_matrix に登録する。
+    存在しない・無効なキーの識別子も短時間キャッシュし、同じ不正なキーによる
+    繰り返しの認証でデータベースを引かない。
+    キーやユーザーを無効化した場合はキャッシュからも即座に削除する。
+
+    キャッシュはプロセスごとに持つため、即座に削除されるのは無効化したプロセスだけ。
+    他のワーカーでは無効化したキーが最大 ttl 秒（既定はトークンと同じ TOKEN_CACHE_TTL、
+    5秒）受け付けられる。この時間を許容できない場合は TOKEN_CACHE_TTL を短くする
+    （0でキャッシュしない）。
+    """
+
+    def __init__(
+        self,
+        secret: Optional[bytes] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        cache_size: int = 10000,
+        ttl: Optional[float] = None,
+        negative_ttl: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        初期化
+
+        Args:
+            secret: ハッシュの鍵（省略時は環境変数 API_KEY_HASH_SECRET）
+            session_factory: キャッシュにないキーを読み込むセッションの生成関数
+            cache_size: キャッシュするキー数の上限
+            ttl: キャッシュの最大保持時間（秒）。省略時は default_token_cache_ttl()
+            negative_ttl: 見つからなかった識別子を保持する時間（秒）
+            clock: UNIX時刻を返す関数
+        """
+        self._secret = secret if secret is not None else _load_hash_secret()
+        self.session_factory = session_factory
+        self._clock = clock
+        self.ttl = default_token_cache_ttl() if ttl is None else ttl
+        self._cache: TTLCache[ApiKeyPrincipal] = TTLCache(maxsize=cache_size, ttl=self.ttl, clock=clock)
+        # 存在しない・無効なキーの識別子
+        self._missing: TTLCache[bool] = TTLCache(maxsize=cache_size, ttl=negative_ttl, clock=clock)
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """キャッシュの統計"""
+        return self._cache.stats
+
+    def hash_secret(self, secret: str) -> str:
+        """
+        シークレットの鍵付きハッシュを計算する
+
+        キーは十分なエントロピーを持つ乱数のため、低速なハッシュは使わない。
+
+        Args:
+            secret: キーのシークレット部分
+
+        Returns:
+            str: 16進数のHMAC-SHA256
+        """
+        return hmac.new(self._secret, secret.encode(), hashlib.sha256).hexdigest()
+
+    def generate(self) -> Tuple[str, str, str]:
+        """
+        新しいAPIキーを生成する
+
+        Returns:
+            Tuple[str, str, str]: 利用者に渡すキー、識別子、保存するハッシュ
+        """
+        prefix = secrets.token_hex(PREFIX_BYTES)
+        secret = secrets.token_urlsafe(SECRET_BYTES)
+        return f"{API_KEY_SCHEME}_{prefix}_{secret}", prefix, self.hash_secret(secret)
+
+    @staticmethod
+    def parse(raw_key: str) -> Tuple[str, str]:
+        """
+        APIキーを識別子とシークレットに分ける
+
+        Args:
+            raw_key: X-API-Key ヘッダーの値
+
+        Returns:
+            Tuple[str, str]: 識別子とシークレット
+
+        Raises:
+            ApiKeyFormatError: 形式が不正な場合
+        """
+        scheme, _, rest = raw_key.partition("_")
+        prefix, _, secret = rest.partition("_")
+        if scheme != API_KEY_SCHEME or len(prefix) != PREFIX_BYTES * 2 or not secret:
+            raise ApiKeyFormatError("Malformed API key")
+        return prefix, secret
+
+    def create(
+        self,
+        db: Session,
+        user_id: int,
+        name: str,
+        expires_at: Optional[datetime] = None
+    ) -> Tuple[ApiKey, str]:
+        """
+        APIキーを発行して保存する
+
+        Args:
+            db: データベースセッション
+            user_id: 所有ユーザーのID
+            name: キーの名前
+            expires_at: 有効期限
+
+        Returns:
+            Tuple[ApiKey, str]: 保存したレコードと、利用者に一度だけ渡す平文のキー
+        """
+        raw_key, prefix, key_hash = self.generate()
+        api_key = ApiKey(prefix=prefix, key_hash=key_hash, user_id=user_id, name=name, expires_at=expires_at)
+        db.add(api_key)
+        db.commit()
+        db.refresh(api_key)
+        self._missing.invalidate(prefix)
+        return api_key, raw_key
+
+    def reissue(self, db: Session, api_key: ApiKey) -> Tuple[ApiKey, str]:
+        """
+        同じ所有者・名前・有効期限で新しいキーを発行し、元のキーを無効化する
+
+        平文のキーを保存していた旧形式のキー（識別子とハッシュを持たない）は
+        検証できないため、このメソッドで発行し直す。
+
+        Args:
+            db: データベースセッション
+            api_key: 置き換えるキー
+
+        Returns:
+            Tuple[ApiKey, str]: 新しいレコードと、利用者に一度だけ渡す平文のキー
+        """
+        api_key.is_active = False
+        replacement, raw_key = self.create(db, api_key.user_id, api_key.name, expires_at=api_key.expires_at)
+        if api_key.prefix:
+            self.invalidate(api_key.prefix)
+        return replacement, raw_key
+
+    async def authenticate(self, raw_key: str) -> Optional[ApiKeyPrincipal]:
+        """
+        APIキーを検証する
+
+        キャッシュにあればデータベースにアクセスせずに判定する。
+
+        Args:
+            raw_key: X-API-Key ヘッダーの値
+
+        Returns:
+            Optional[ApiKeyPrincipal]: 有効なキーの場合は所有者と権限
+        """
+        try:
+            prefix, secret = self.parse(raw_key)
+        except ApiKeyFormatError:
+            return None
+
+        principal = self._cache.get(prefix)
+        if principal is None:
+            if self._missing.get(prefix):
+                return None
+            # キャッシュにない場合だけ、イベントループを止めないようスレッドで読み込む
+            principal = await asyncio.to_thread(self._load, prefix)
+            if principal is None:
+                self._missing.put(prefix, True)
+                return None
+
+        if not hmac.compare_digest(principal.key_hash, self.hash_secret(secret)):
+            return None
+        if principal.expires_at is not None and self._clock() >= principal.expires_at:
+            self._cache.invalidate(prefix)
+            return None
+        return principal
+
+    def deactivate(self, db: Session, api_key: ApiKey) -> None:
+        """
+        APIキーを無効化する
+
+        Args:
+            db: データベースセッション
+            api_key: 無効化するキー
+        """
+        api_key.is_active = False
+        db.commit()
+        self.invalidate(api_key.prefix)
+
+    def deactivate_user(self, db: Session, user: User) -> None:
+        """
+        ユーザーを無効化し、そのユーザーのキーをキャッシュから削除する
+
+        Args:
+            db: データベースセッション
+            user: 無効化するユーザー
+        """
+        user.is_active = False
+        db.commit()
+        self.invalidate_user(user.id)
+
+    def invalidate(self, prefix: str) -> bool:
+        """
+        キーをキャッシュから削除する（権限を変更した場合など）
+
+        Args:
+            prefix: キーの識別子
+
+        Returns:
+            bool: 削除した場合True
+        """
+        return self._cache.invalidate(prefix)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """
+        ユーザーの全キーをキャッシュから削除する
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: 削除したキー数
+        """
+        return self._cache.invalidate_where(lambda principal: principal.user_id == user_id)
+
+    def clear(self) -> None:
+        """キャッシュを全て削除する"""
+        self._cache.clear()
+        self._missing.clear()
+
+    def _load(self, prefix: str) -> Optional[ApiKeyPrincipal]:
+        """データベースからキーを読み込み、有効であればキャッシュする"""
+        if self.session_factory is None:
+            raise RuntimeError("ApiKeyManager.session_factory is not configured")
+
+        with self.session_factory() as db:
+            api_key = query_api_key_by_prefix(db, prefix).one_or_none()
+            if api_key is None or not api_key.is_active or api_key.user is None or not api_key.user.is_active:
+                return None
+            principal = ApiKeyPrincipal(
+                key_id=api_key.id,
+                prefix=api_key.prefix,
+                key_hash=api_key.key_hash,
+                user_id=api_key.user.id,
+                username=api_key.user.username,
+                expires_at=_timestamp(api_key.expires_at)
+            )
+            # 同じクエリで読み込んだ権限を登録し、直後のチェックでデータベースを引かない
+            permission_matrix.set_user(
+                api_key.user.id,
+                [(permission.resource, permission.action) for permission in api_key.user.permissions],
+                is_superuser=api_key.user.is_superuser
+            )
+
+        self._cache.put(prefix, principal, expires_at=principal.expires_at)
+        return principal
+
+
+# シングルトンインスタンスの作成
+api_key_manager = ApiKeyManager()
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.api_keys import api_key_manager
+from app.core.permissions import UserPermissions, permission_bits, permission_matrix
+from app.core.security import security_manager
+
+# APIキーを受け取るヘッダー
+API_KEY_HEADER = "X-API-Key"
+
+# トークンのsubに付くユーザーIDの接頭辞（例: "user_123"）
+USER_SUBJECT_PREFIX = "user_"
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def _token_user_id(claims: Dict[str, Any]) -> Optional[int]:
+    """トークンのクレームからユーザーIDを取り出す（user_id、なければsub）"""
+    value = claims.get("user_id", claims.get("sub"))
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value[len(USER_SUBJECT_PREFIX):] if value.startswith(USER_SUBJECT_PREFIX) else value
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+async def resolve_permissions(request: Request) -> UserPermissions:
+    """
+    リクエストの認証情報からコンパイル済みの権限を取得する
+
+    APIキー・トークンのどちらもユーザーIDで権限を引き、未読み込み・期限切れの
+    場合だけデータベースから構築する。
+
+    Args:
+        request: リクエスト
+
+    Returns:
+        UserPermissions: 認証されたユーザーの権限
+
+    Raises:
+        HTTPException: 認証情報がない、または無効な場合（401）
+    """
+    raw_key = request.headers.get(API_KEY_HEADER)
+    if raw_key:
+        principal = await api_key_manager.authenticate(raw_key)
+        if principal is None:
+            raise _unauthorized("Invalid API key")
+        user_id = principal.user_id
+    else:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise _unauthorized("Not authenticated")
+
+        user_id = _token_user_id(security_manager.verify_token(token))
+        if user_id is None:
+            raise _unauthorized("Invalid token subject")
+
+    permissions = permission_matrix.get(user_id)
+    if permissions is None:
+        permissions = await asyncio.to_thread(permission_matrix.load, user_id)
+    return permissions
+
+
+def require_permission(resource: str, action: str) -> Callable[[Request], Any]:
+    """
+    リソースに対する操作の権限を要求する依存関係を作成する
+
+    ビットはルート定義時に1度だけ求め、リクエストごとの判定はマスクとのANDだけで行う。
+
+    Args:
+        resource: リソース名（例: "effects"）
+        action: アクション（例: "write"）
+
+    Returns:
+        Callable[[Request], Any]: FastAPI の依存関係（認証されたユーザーの権限を返す）
+    """
+    bit = permission_bits.bit(resource, action)
+
+    async def dependency(request: Request) -> UserPermissions:
+        permissions = await resolve_permissions(request)
+        if not permissions.allows(bit):
+            raise HTTPException(status_code=403, detail=f"Permission denied: {resource}:{action}")
+        return permissions
+
+    dependency.__name__ = f"require_{resource}_{action}"
+    return dependency
@@ -0,0 +1,362 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# コンパイル済みの条件（イベントデータを受け取り真偽値を返す）
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# 条件内でイベントタイプを指定する予約キー
+EVENT_TYPE_KEY = "event_type"
+# イベントタイプを問わないトリガーのバケット
+ANY_EVENT_TYPE = "*"
+
+_MISSING = object()
+
+
+class ConditionCompileError(ValueError):
+    """条件の構文が不正な場合の例外"""
+
+
+def _compile_path(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """ドット区切りのフィールドパスを取得関数に変換する"""
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: data.get(key, _MISSING) if isinstance(data, dict) else _MISSING
+
+    def getter(data: Dict[str, Any]) -> Any:
+        value: Any = data
+        for key in keys:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return getter
+
+
+def _compare(op: Callable[[Any, Any], bool], expected: Any) -> Callable[[Any], bool]:
+    def check(value: Any) -> bool:
+        if value is _MISSING:
+            return False
+        try:
+            return op(value, expected)
+        except TypeError:
+            return False
+    return check
+
+
+def _compile_operator(operator: str, operand: Any) -> Callable[[Any], bool]:
+    """比較演算子を値の検査関数に変換する"""
+    if operator == "$eq":
+        return lambda value: value == operand
+    if operator == "$ne":
+        return lambda value: value != operand
+    if operator == "$gt":
+        return _compare(lambda a, b: a > b, operand)
+    if operator == "$gte":
+        return _compare(lambda a, b: a >= b, operand)
+    if operator == "$lt":
+        return _compare(lambda a, b: a < b, operand)
+    if operator == "$lte":
+        return _compare(lambda a, b: a <= b, operand)
+    if operator in ("$in", "$nin"):
+        if not isinstance(operand, (list, tuple, set)):
+            raise ConditionCompileError(f"{operator} requires a list")
+        try:
+            members: Any = frozenset(operand)
+        except TypeError:
+            members = list(operand)
+        if operator == "$in":
+            return lambda value: value is not _MISSING and value in members
+        return lambda value: value is _MISSING or value not in members
+    if operator == "$exists":
+        expected = bool(operand)
+        return lambda value: (value is not _MISSING) is expected
+    if operator == "$contains":
+        return _compare(lambda a, b: b in a, operand)
+    if operator == "$regex":
+        try:
+            pattern = re.compile(operand)
+        except (re.error, TypeError) as e:
+            raise ConditionCompileError(f"Invalid $regex: {e}")
+        return lambda value: isinstance(value, str) and pattern.search(value) is not None
+    raise ConditionCompileError(f"Unknown operator: {operator}")
+
+
+def _compile_field(path: str, spec: Any) -> Predicate:
+    getter = _compile_path(path)
+    if isinstance(spec, dict) and spec and all(key.startswith("$") for key in spec):
+        checks = [_compile_operator(operator, operand) for operator, operand in spec.items()]
+        if len(checks) == 1:
+            check = checks[0]
+            return lambda data: check(getter(data))
+
+        def check_all(data: Dict[str, Any]) -> bool:
+            value = getter(data)
+            return all(check(value) for check in checks)
+        return check_all
+    return lambda data: getter(data) == spec
+
+
+def compile_condition(condition: Optional[Dict[str, Any]]) -> Predicate:
+    """
+    条件の辞書を述語関数にコンパイルする
+
+    書式:
+        {"field": value}                  等価比較（"a.b" でネストしたフィールドを参照）
+        {"field": {"$gt": 1, "$lt": 5}}   比較演算子（$eq $ne $gt $gte $lt $lte $in $nin
+                                          $exists $contains $regex）
+        {"$and": [...]}, {"$or": [...]}, {"$not": {...}}
+    キー "event_type" はルーティングに使うため評価対象から除外する。
+
+    Args:
+        condition: 条件の辞書
+
+    Returns:
+        Predicate: イベントデータを受け取り条件を満たすかを返す関数
+
+    Raises:
+        ConditionCompileError: 条件の構文が不正な場合
+    """
+    if not condition:
+        return lambda data: True
+    if not isinstance(condition, dict):
+        raise ConditionCompileError("Condition must be a dict")
+
+    predicates: List[Predicate] = []
+    for key, spec in condition.items():
+        if key == EVENT_TYPE_KEY:
+            continue
+        if key in ("$and", "$or"):
+            if not isinstance(spec, list):
+                raise ConditionCompileError(f"{key} requires a list")
+            children = [compile_condition(child) for child in spec]
+            if key == "$and":
+                predicates.append(lambda data, children=children: all(child(data) for child in children))
+            else:
+                predicates.append(lambda data, children=children: any(child(data) for child in children))
+        elif key == "$not":
+            child = compile_condition(spec)
+            predicates.append(lambda data, child=child: not child(data))
+        elif key.startswith("$"):
+            raise ConditionCompileError(f"Unknown operator: {key}")
+        else:
+            predicates.append(_compile_field(key, spec))
+
+    if not predicates:
+        return lambda data: True
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda data: all(predicate(data) for predicate in predicates)
+
+
+def _index_keys(condition: Optional[Dict[str, Any]]) -> Optional[Tuple[str, List[Hashable]]]:
+    """
+    インデックスに使うフィールドと値を選ぶ
+
+    トップレベルの等価比較または $in のうち、値がハッシュ可能な最初のものを使う。
+    """
+    for key, spec in (condition or {}).items():
+        if key == EVENT_TYPE_KEY or key.startswith("$"):
+            continue
+        if isinstance(spec, dict):
+            if set(spec) == {"$eq"}:
+                values = [spec["$eq"]]
+            elif set(spec) == {"$in"} and isinstance(spec["$in"], (list, tuple)):
+                values = list(spec["$in"])
+            else:
+                continue
+        elif isinstance(spec, (list, set)):
+            continue
+        else:
+            values = [spec]
+        try:
+            for value in values:
+                hash(value)
+        except TypeError:
+            continue
+        return key, values
+    return None
+
+
+@dataclass
+class CompiledTrigger:
+    """コンパイル済みトリガー"""
+    trigger_id: Any
+    event_type: str
+    predicate: Predicate
+    payload: Any = None
+    index_field: Optional[str] = None
+    index_values: List[Hashable] = field(default_factory=list)
+
+
+class _TypeBucket:
+    """イベントタイプ単位のインデックス"""
+
+    def __init__(self):
+        self.by_value: Dict[Tuple[str, Hashable], Set[Any]] = {}
+        self.field_refs: Dict[str, int] = {}
+        self.getters: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.unindexed: Set[Any] = set()
+
+    def add(self, compiled: CompiledTrigger) -> None:
+        if compiled.index_field is None:
+            self.unindexed.add(compiled.trigger_id)
+            return
+        self.field_refs[compiled.index_field] = self.field_refs.get(compiled.index_field, 0) + 1
+        if compiled.index_field not in self.getters:
+            self.getters[compiled.index_field] = _compile_path(compiled.index_field)
+        for value in compiled.index_values:
+            self.by_value.setdefault((compiled.index_field, value), set()).add(compiled.trigger_id)
+
+    def remove(self, compiled: CompiledTrigger) -> None:
+        if compiled.index_field is None:
+            self.unindexed.discard(compiled.trigger_id)
+            return
+        refs = self.field_refs.get(compiled.index_field, 0) - 1
+        if refs > 0:
+            self.field_refs[compiled.index_field] = refs
+        else:
+            self.field_refs.pop(compiled.index_field, None)
+            self.getters.pop(compiled.index_field, None)
+        for value in compiled.index_values:
+            key = (compiled.index_field, value)
+            ids = self.by_value.get(key)
+            if ids is not None:
+                ids.discard(compiled.trigger_id)
+                if not ids:
+                    del self.by_value[key]
+
+    def candidates(self, data: Dict[str, Any]) -> Iterable[Any]:
+        yield from self.unindexed
+        for path, getter in self.getters.items():
+            value = getter(data)
+            if value is _MISSING:
+                continue
+            try:
+                ids = self.by_value.get((path, value))
+            except TypeError:
+                continue
+            if ids:
+                yield from ids
+
+    def __len__(self) -> int:
+        return len(self.unindexed) + sum(self.field_refs.values())
+
+
+class TriggerIndex:
+    """コンパイル済みトリガー条件のインメモリインデックス
+
+    トリガーの作成・更新時に条件を一度だけコンパイルし、イベントタイプと
+    条件の等価フィールドでインデックスする。イベント発生時は候補となる
+    トリガーの述語だけを評価する。
+    """
+
+    def __init__(self):
+        self._triggers: Dict[Any, CompiledTrigger] = {}
+        self._buckets: Dict[str, _TypeBucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def __contains__(self, trigger_id: Any) -> bool:
+        return trigger_id in self._triggers
+
+    def upsert(
+        self,
+        trigger_id: Any,
+        condition: Optional[Dict[str, Any]],
+        event_type: Optional[str] = None,
+        payload: Any = None,
+        predicate: Optional[Predicate] = None
+    ) -> CompiledTrigger:
+        """
+        トリガーを登録または更新する
+
+        Args:
+            trigger_id: トリガーID
+            condition: 条件の辞書
+            event_type: 対象のイベントタイプ（省略時は条件の "event_type"、それもなければ全タイプ）
+            payload: マッチ時に返す任意のデータ
+            predicate: コンパイル済みの述語（検証時にコンパイルしたものを再利用する場合）
+
+        Returns:
+            CompiledTrigger: コンパイル済みトリガー
+
+        Raises:
+            ConditionCompileError: 条件の構文が不正な場合
+        """
+        if predicate is None:
+            predicate = compile_condition(condition)
+        resolved_type = event_type or (condition or {}).get(EVENT_TYPE_KEY) or ANY_EVENT_TYPE
+        index = _index_keys(condition)
+        compiled = CompiledTrigger(
+            trigger_id=trigger_id,
+            event_type=resolved_type,
+            predicate=predicate,
+            payload=payload,
+            index_field=index[0] if index else None,
+            index_values=index[1] if index else []
+        )
+
+        self.remove(trigger_id)
+        self._triggers[trigger_id] = compiled
+        self._buckets.setdefault(resolved_type, _TypeBucket()).add(compiled)
+        return compiled
+
+    def remove(self, trigger_id: Any) -> bool:
+        """
+        トリガーをインデックスから削除する
+
+        Args:
+            trigger_id: トリガーID
+
+        Returns:
+            bool: 削除した場合True
+        """
+        compiled = self._triggers.pop(trigger_id, None)
+        if compiled is None:
+            return False
+        bucket = self._buckets.get(compiled.event_type)
+        if bucket is not None:
+            bucket.remove(compiled)
+            if not len(bucket):
+                del self._buckets[compiled.event_type]
+        return True
+
+    def clear(self) -> None:
+        """全トリガーを削除する"""
+        self._triggers.clear()
+        self._buckets.clear()
+
+    def match(self, event_type: str, data: Dict[str, Any]) -> List[CompiledTrigger]:
+        """
+        イベントに一致するトリガーを取得する
+
+        Args:
+            event_type: イベントタイプ
+            data: イベントデータ
+
+        Returns:
+            List[CompiledTrigger]: 条件を満たしたトリガー
+        """
+        matched: List[CompiledTrigger] = []
+        seen: Set[Any] = set()
+        for bucket_type in (event_type, ANY_EVENT_TYPE):
+            bucket = self._buckets.get(bucket_type)
+            if bucket is None:
+                continue
+            for trigger_id in bucket.candidates(data):
+                if trigger_id in seen:
+                    continue
+                seen.add(trigger_id)
+                compiled = self._triggers[trigger_id]
+                if compiled.predicate(data):
+                    matched.append(compiled)
+        return matched
+
+
+# シングルトンインスタンスの作成
+trigger_index = TriggerIndex()
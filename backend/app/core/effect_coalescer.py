@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 重複を除いたエフェクト列を受け取り、各エフェクトのレスポンスまたは例外を同じ順序で返す送信関数
+EffectSender = Callable[[List[Dict[str, Any]]], Awaitable[List[Union[str, None, Exception]]]]
+
+
+def effect_content_key(effect_data: Dict[str, Any]) -> Hashable:
+    """
+    タイプとパラメータが全て同じエフェクトをまとめるキー
+
+    エフェクトIDのように送信内容に影響しない項目は含めない。パラメータが
+    1つでも違うエフェクトは別のキーになり、それぞれ指定どおりに送信される。
+    """
+    parameters = effect_data.get("parameters") or {}
+    return effect_data.get("type", ""), json.dumps(parameters, sort_keys=True, default=repr)
+
+
+@dataclass
+class CoalescerStats:
+    """重複排除の統計"""
+    submitted: int = 0
+    sent: int = 0
+    duplicates: int = 0
+
+    @property
+    def suppressed(self) -> int:
+        """送信せずに済んだエフェクト数"""
+        return self.duplicates
+
+
+@dataclass
+class _CoalescedEffect:
+    effect: Dict[str, Any]
+    futures: List[asyncio.Future] = field(default_factory=list, repr=False)
+
+
+class EffectCoalescer:
+    """エフェクト送信の重複排除ステージ
+
+    ウィンドウの間に投入された同じ内容のエフェクトを1回だけ送信する。
+    パラメータは書き換えないため、タイプが同じでも duration や intensity が
+    違うエフェクトは別々に送信される。まとめられた呼び出し元には、
+    送信したエフェクトのレスポンスを共有して返す。
+    """
+
+    def __init__(
+        self,
+        sender: EffectSender,
+        window: float = 0.02,
+        key: Callable[[Dict[str, Any]], Hashable] = effect_content_key
+    ):
+        """
+        初期化
+
+        Args:
+            sender: 重複を除いたエフェクトを送信する関数
+            window: エフェクトをまとめる待ち時間（秒）
+            key: 同じ内容とみなすエフェクトのキーを返す関数（送信内容が同じになるものだけを同じキーにすること）
+        """
+        if window < 0:
+            raise ValueError("window must not be negative")
+
+        self._sender = sender
+        self.window = window
+        self._key = key
+        self.stats = CoalescerStats()
+        self._groups: Dict[Hashable, _CoalescedEffect] = {}
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+    async def submit(self, effect_data: Dict[str, Any]) -> Optional[str]:
+        """
+        エフェクトを投入し、送信したエフェクトのレスポンスを待つ
+
+        Args:
+            effect_data: エフェクトデータ
+
+        Returns:
+            Optional[str]: サーバーからのレスポンス（まとめられた場合は最初のエフェクトのもの）
+        """
+        return await self._enqueue(effect_data)
+
+    async def submit_many(self, batch: List[Dict[str, Any]]) -> List[Union[str, None, Exception]]:
+        """
+        複数のエフェクトをまとめて投入する
+
+        Args:
+            batch: エフェクトデータのリスト
+
+        Returns:
+            List[Union[str, None, Exception]]: エフェクトごとのレスポンスまたは例外
+        """
+        futures = [self._enqueue(effect_data) for effect_data in batch]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def flush(self) -> None:
+        """待機中のエフェクトを即座に送信する"""
+        self._cancel_timer()
+        if self._groups:
+            await self._flush_groups()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """残りのエフェクトを送信してステージを閉じる"""
+        await self.flush()
+
+    def _enqueue(self, effect_data: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.stats.submitted += 1
+
+        key = self._key(effect_data)
+        group = self._groups.get(key)
+        if group is None:
+            effect = dict(effect_data)
+            effect["parameters"] = dict(effect_data.get("parameters", {}))
+            self._groups[key] = _CoalescedEffect(effect, [future])
+            if self._flush_timer is None:
+                self._flush_timer = loop.call_later(self.window, self._on_timer)
+            return future
+
+        group.futures.append(future)
+        self.stats.duplicates += 1
+        return future
+
+    def _on_timer(self) -> None:
+        self._flush_timer = None
+        task = asyncio.create_task(self._flush_groups())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _cancel_timer(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    async def _flush_groups(self) -> None:
+        """ウィンドウ内に集まったエフェクトを送信し、呼び出し元へ結果を配る"""
+        groups, self._groups = list(self._groups.values()), {}
+        if not groups:
+            return
+
+        effects = [group.effect for group in groups]
+        try:
+            responses = await self._sender(effects)
+        except Exception as e:
+            logger.error(f"Error sending coalesced effects: {str(e)}")
+            responses = [e] * len(groups)
+
+        self.stats.sent += len(groups)
+        suppressed = sum(len(group.futures) for group in groups) - len(groups)
+        if suppressed:
+            logger.debug(f"Coalesced {suppressed} effects into {len(groups)} commands")
+
+        responses = list(responses) + [None] * (len(groups) - len(responses))
+        for group, response in zip(groups, responses):
+            for future in group.futures:
+                if future.done():
+                    continue
+                if isinstance(response, Exception):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
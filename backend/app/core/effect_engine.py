@@ -1,29 +1,140 @@
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 import random
 import logging
 from dataclasses import dataclass
+from functools import lru_cache, partial
+from types import MappingProxyType
+
+from app.core.effect_lifecycle import EffectLifecycleManager
+from app.core.effect_store import EffectView
+from app.core.id_generator import SnowflakeIdGenerator, effect_id_generator, format_effect_id
+
+try:
+    import numpy as np
+except ImportError:  # numpyがない環境では標準のrandomで逐次生成する
+    np = None
+
+# テンプレートキャッシュの最大エントリ数
+TEMPLATE_CACHE_SIZE = 4096
 
 # エフェクトのパラメータを定義するデータクラス
 @dataclass
 class EffectParameters:
+    __slots__ = ("color", "duration", "intensity")
+
     color: str
     duration: float
     intensity: float
 
+@dataclass(frozen=True)
+class EffectTemplate:
+    """生成済みのエフェクトの骨格（不変）
+
+    固定のパラメータを出力順に保持し、呼び出しごとに変わる値は
+    random_field と random_value で補う。random_spec は一括生成用の
+    分布（"int" は両端を含む整数、"uniform" は一様分布の実数）。
+    """
+    effect_type: str
+    parameters: Mapping[str, Any]
+    random_field: str
+    random_value: Callable[[], Any]
+    random_spec: Tuple[str, float, float]
+
+# エフェクトタイプごとのランダム値の列と分布
+RANDOM_FIELDS: Dict[str, Tuple[str, Tuple[str, float, float]]] = {
+    'particle': ('particles_count', ('int', 10, 50)),
+    'sound': ('frequency', ('uniform', 200, 2000)),
+    'light': ('radius', ('uniform', 1.0, 5.0)),
+}
+
+def _build_template(effect_type: str, params: EffectParameters) -> EffectTemplate:
+    """マージ済みのパラメータからエフェクトタイプごとのテンプレートを組み立てる"""
+    if effect_type == 'particle':
+        fixed = {'color': params.color, 'duration': params.duration, 'intensity': params.intensity}
+    elif effect_type == 'sound':
+        fixed = {'volume': params.intensity, 'duration': params.duration}
+    elif effect_type == 'light':
+        fixed = {'color': params.color, 'intensity': params.intensity, 'duration': params.duration}
+    else:
+        raise KeyError(effect_type)
+
+    random_field, spec = RANDOM_FIELDS[effect_type]
+    kind, low, high = spec
+    sampler = partial(random.randint if kind == 'int' else random.uniform, low, high)
+    return EffectTemplate(effect_type, MappingProxyType(fixed), random_field, sampler, spec)
+
+@dataclass
+class EffectBatch:
+    """一括生成したエフェクト（列指向）
+
+    全エフェクトで共通のパラメータは fixed に1つだけ持ち、
+    エフェクトごとに異なるIDとランダム値だけを列として保持する。
+    """
+    effect_type: str
+    ids: List[str]
+    fixed: Mapping[str, Any]
+    random_field: str
+    random_values: Union[Sequence[float], "np.ndarray"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """create_*_effect と同じ形式の辞書を1件ずつ返す"""
+        values = self.random_values.tolist() if np is not None and isinstance(self.random_values, np.ndarray) else self.random_values
+        for effect_id, value in zip(self.ids, values):
+            parameters = self.fixed.copy()
+            parameters[self.random_field] = value
+            yield {'type': self.effect_type, 'id': effect_id, 'parameters': parameters}
+
+    def columns(self) -> Dict[str, Any]:
+        """
+        列ごとの値を取得する
+
+        Returns:
+            Dict[str, Any]: "id"、ランダム値の列、共通パラメータ（スカラー）
+        """
+        return {'id': self.ids, self.random_field: self.random_values, **self.fixed}
+
 class EffectEngine:
     """
     エフェクト生成エンジン
     様々な視覚・音響効果を生成・管理するためのクラス
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        id_generator: Optional[SnowflakeIdGenerator] = None,
+        lifecycle: Optional[EffectLifecycleManager] = None
+    ):
+        """
+        Args:
+            seed: 一括生成に使う乱数のシード（同じシードなら同じランダム値を再現できる）
+            id_generator: エフェクトIDの生成器（省略時はプロセス共通の生成器）
+            lifecycle: 稼働中エフェクトの管理（省略時は既定の設定で作成）
+        """
         self.logger = logging.getLogger(__name__)
+        self._bulk_rng = self._make_rng(seed)
+        self._id_generator = id_generator or effect_id_generator
+        self.lifecycle = lifecycle if lifecycle is not None else EffectLifecycleManager()
+        # 名前 -> 登録済みプリセット
+        self.presets: Dict[str, Any] = {}
         # デフォルトのエフェクトパラメータ
         self.default_parameters = {
             'particle': EffectParameters(color='#FFFFFF', duration=1.0, intensity=1.0),
             'sound': EffectParameters(color='#000000', duration=2.0, intensity=0.8),
             'light': EffectParameters(color='#FFFF00', duration=1.5, intensity=0.9)
         }
+        # (エフェクトタイプ, 型付きの正規化したパラメータ) -> テンプレート
+        self._template_cache = lru_cache(maxsize=TEMPLATE_CACHE_SIZE)(
+            lambda effect_type, key: _build_template(effect_type, EffectParameters(*(value for _, value in key)))
+        )
+        # パラメータ指定なしの場合のテンプレート
+        self._default_templates = {
+            effect_type: _build_template(effect_type, params)
+            for effect_type, params in self.default_parameters.items()
+        }
 
     def create_particle_effect(self, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -36,19 +147,7 @@ class EffectEngine:
             生成されたパーティクルエフェクトの情報
         """
         try:
-            params = self._merge_parameters('particle', parameters)
-            effect = {
-                'type': 'particle',
-                'id': self._generate_effect_id(),
-                'parameters': {
-                    'color': params.color,
-                    'duration': params.duration,
-                    'intensity': params.intensity,
-                    'particles_count': random.randint(10, 50)
-                }
-            }
-            self.logger.info(f"Created particle effect: {effect['id']}")
-            return effect
+            return self._create_from_template('particle', parameters)
         except Exception as e:
             self.logger.error(f"Failed to create particle effect: {str(e)}")
             raise
@@ -64,18 +163,7 @@ class EffectEngine:
             生成されたサウンドエフェクトの情報
         """
         try:
-            params = self._merge_parameters('sound', parameters)
-            effect = {
-                'type': 'sound',
-                'id': self._generate_effect_id(),
-                'parameters': {
-                    'volume': params.intensity,
-                    'duration': params.duration,
-                    'frequency': random.uniform(200, 2000)
-                }
-            }
-            self.logger.info(f"Created sound effect: {effect['id']}")
-            return effect
+            return self._create_from_template('sound', parameters)
         except Exception as e:
             self.logger.error(f"Failed to create sound effect: {str(e)}")
             raise
@@ -91,46 +179,176 @@ class EffectEngine:
             生成された光エフェクトの情報
         """
         try:
-            params = self._merge_parameters('light', parameters)
-            effect = {
-                'type': 'light',
-                'id': self._generate_effect_id(),
-                'parameters': {
-                    'color': params.color,
-                    'intensity': params.intensity,
-                    'duration': params.duration,
-                    'radius': random.uniform(1.0, 5.0)
-                }
-            }
-            self.logger.info(f"Created light effect: {effect['id']}")
-            return effect
+            return self._create_from_template('light', parameters)
         except Exception as e:
             self.logger.error(f"Failed to create light effect: {str(e)}")
             raise
 
-    def _generate_effect_id(self) -> str:
+    def _create_from_template(self, effect_type: str, parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        ユニークなエフェクトIDを生成する
+        テンプレートにIDとランダム値だけを埋めてエフェクトを生成する
+        
+        Args:
+            effect_type: エフェクトタイプ
+            parameters: エフェクトのパラメータ（オプション）
+            
+        Returns:
+            生成されたエフェクトの情報
         """
-        return f"effect_{random.randint(1000, 9999)}_{random.randint(1000, 9999)}"
+        template = self._get_template(effect_type, parameters) if parameters else self._default_templates[effect_type]
+        effect_parameters = template.parameters.copy()
+        effect_parameters[template.random_field] = template.random_value()
+        effect = {
+            'type': effect_type,
+            'id': self._generate_effect_id(),
+            'parameters': effect_parameters
+        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Created {effect_type} effect: {effect['id']}")
+        return effect
 
-    def _merge_parameters(self, effect_type: str, custom_params: Optional[Dict[str, Any]] = None) -> EffectParameters:
+    def _get_template(self, effect_type: str, parameters: Dict[str, Any]) -> EffectTemplate:
         """
-        デフォルトパラメータとカスタムパラメータをマージする
+        正規化したパラメータをキーにテンプレートを取得する
+        
+        1, 1.0, True は同じハッシュで等しいため、値の型もキーに含めて
+        呼び出し元が渡した型のままテンプレートを返す。
+        ハッシュできない値を含むパラメータはキャッシュせずにその都度組み立てる。
+        """
+        default = self.default_parameters[effect_type]
+        values = (
+            parameters.get('color', default.color),
+            parameters.get('duration', default.duration),
+            parameters.get('intensity', default.intensity)
+        )
+        try:
+            return self._template_cache(effect_type, tuple((type(value), value) for value in values))
+        except TypeError:
+            return _build_template(effect_type, EffectParameters(*values))
+
+    def template_cache_info(self):
+        """テンプレートキャッシュのヒット率などの統計を取得する"""
+        return self._template_cache.cache_info()
+
+    def create_effects_bulk(
+        self,
+        effect_type: str,
+        n: int,
+        parameters: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ) -> EffectBatch:
+        """
+        同じ種類のエフェクトをまとめて生成する
+        
+        ランダム値は1回のベクトル演算でまとめてサンプリングする
+        （numpyがない場合は標準のrandomで生成する）。
         
         Args:
-            effect_type: エフェクトタイプ
-            custom_params: カスタムパラメータ
+            effect_type: エフェクトタイプ（particle / sound / light）
+            n: 生成する数
+            parameters: 全エフェクトに共通のパラメータ（オプション）
+            seed: 乱数のシード（指定時はエンジンの乱数状態を使わず、再現可能なランダム値を返す）
             
         Returns:
-            マージされたパラメータ
+            EffectBatch: 列指向の生成結果（イテレートすると辞書が得られる）
         """
-        default = self.default_parameters[effect_type]
-        if not custom_params:
-            return default
-
-        return EffectParameters(
-            color=custom_params.get('color', default.color),
-            duration=custom_params.get('duration', default.duration),
-            intensity=custom_params.get('intensity', default.intensity)
-        )
\ No newline at end of file
+        if n < 0:
+            raise ValueError("n must not be negative")
+        if effect_type not in self.default_parameters:
+            raise ValueError(f"Unknown effect type: {effect_type}")
+
+        template = self._get_template(effect_type, parameters) if parameters else self._default_templates[effect_type]
+        rng = self._bulk_rng if seed is None else self._make_rng(seed)
+        kind, low, high = template.random_spec
+        if np is not None:
+            if kind == 'int':
+                random_values = rng.integers(low, high + 1, size=n)
+            else:
+                random_values = rng.uniform(low, high, size=n)
+        else:
+            sample = rng.randint if kind == 'int' else rng.uniform
+            random_values = [sample(low, high) for _ in range(n)]
+
+        batch = EffectBatch(
+            effect_type=effect_type,
+            ids=[format_effect_id(effect_id) for effect_id in self._id_generator.next_ids(n)],
+            fixed=template.parameters,
+            random_field=template.random_field,
+            random_values=random_values
+        )
+        self.logger.info(f"Created {n} {effect_type} effects in bulk")
+        return batch
+
+    async def register_effect(self, preset: Any) -> None:
+        """
+        プリセットを名前で登録する（同名のプリセットは置き換える）
+
+        Args:
+            preset: name属性を持つプリセット
+        """
+        self.presets[preset.name] = preset
+        self.logger.debug(f"Registered effect preset: {preset.name}")
+
+    async def unregister_effect(self, name: str) -> bool:
+        """
+        登録済みのプリセットを取り除く
+
+        Args:
+            name: プリセット名
+
+        Returns:
+            bool: 取り除いた場合True
+        """
+        if self.presets.pop(name, None) is None:
+            return False
+        self.logger.debug(f"Unregistered effect preset: {name}")
+        return True
+
+    def activate_effect(self, effect: Dict[str, Any], duration: Optional[float] = None) -> EffectView:
+        """
+        生成したエフェクトを稼働中として登録する
+
+        durationが経過すると自動的に取り除かれ、effect_expired イベントが発行される。
+
+        Args:
+            effect: create_*_effect が返したエフェクト
+            duration: 稼働時間（秒）。省略時はエフェクトのduration
+
+        Returns:
+            EffectView: 稼働中エフェクトのビュー
+
+        Raises:
+            EffectCapacityError: 同時実行数の上限に達し、登録を拒否した場合
+        """
+        return self.lifecycle.register(effect, duration)
+
+    def get_active_effect(self, effect_id: str) -> Optional[EffectView]:
+        """稼働中のエフェクトを取得する"""
+        return self.lifecycle.get(effect_id)
+
+    def cancel_effect(self, effect_id: str) -> bool:
+        """稼働中のエフェクトを取り消す"""
+        return self.lifecycle.cancel(effect_id)
+
+    async def start(self) -> None:
+        """稼働中エフェクトの終了判定を開始する"""
+        await self.lifecycle.start()
+
+    async def cleanup(self) -> None:
+        """終了判定を停止し、稼働中エフェクトと登録済みプリセットを破棄する"""
+        await self.lifecycle.stop()
+        self.lifecycle.clear()
+        self.presets.clear()
+
+    @staticmethod
+    def _make_rng(seed: Optional[int]):
+        """一括生成用の乱数生成器を作る"""
+        if np is not None:
+            return np.random.default_rng(seed)
+        return random.Random(seed)
+
+    def _generate_effect_id(self) -> str:
+        """
+        ユニークなエフェクトIDを生成する（時刻順に並び、プロセス間でも衝突しない）
+        """
+        return format_effect_id(self._id_generator.next_id())
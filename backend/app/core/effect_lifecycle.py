@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core.effect_store import ActiveEffectStore, EffectView
+from app.core.event_system import Event, EventSystem, event_system as default_event_system
+from app.core.timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# エフェクト終了時に発行するイベントタイプ
+EFFECT_EXPIRED_EVENT = "effect_expired"
+
+
+class EvictionPolicy(Enum):
+    """同時実行数の上限に達したときの振る舞い"""
+    OLDEST = "oldest"
+    REJECT = "reject"
+
+
+class EffectCapacityError(Exception):
+    """REJECTポリシーで同時実行数の上限に達した場合の例外"""
+
+
+@dataclass
+class LifecycleMetrics:
+    """エフェクトライフサイクルの統計"""
+    active: int
+    max_active: int
+    registered: int
+    expired: int
+    evicted: int
+    cancelled: int
+
+
+class EffectLifecycleManager:
+    """稼働中エフェクトの登録と終了を管理するクラス
+
+    エフェクトは ActiveEffectStore に格納し、登録・参照・取り消しはO(1)。
+    終了時刻はタイマーホイールで管理し、durationを過ぎたエフェクトを
+    取り除いて effect_expired イベントを発行する。
+    同時実行数が上限に達した場合は最も古いエフェクトを退去させるか、登録を拒否する。
+    """
+
+    def __init__(
+        self,
+        event_system: Optional[EventSystem] = None,
+        max_active: int = 10000,
+        eviction: EvictionPolicy = EvictionPolicy.OLDEST,
+        tick: float = 0.05,
+        slots: int = 1024,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初期化
+
+        Args:
+            event_system: effect_expired を発行するイベントシステム（省略時は共通のインスタンス）
+            max_active: 同時に稼働できるエフェクト数の上限
+            eviction: 上限に達したときの振る舞い
+            tick: 終了判定の分解能（秒）
+            slots: タイマーホイールのスロット数
+            clock: 単調増加する時刻を返す関数
+        """
+        if max_active < 1:
+            raise ValueError("max_active must be at least 1")
+
+        self.event_system = event_system if event_system is not None else default_event_system
+        self.max_active = max_active
+        self.eviction = eviction
+        self._store = ActiveEffectStore()
+        self._wheel = TimerWheel(tick=tick, slots=slots, clock=clock)
+        self._timers: Dict[str, int] = {}
+        # 登録順（OLDESTポリシーの退去対象を O(1) で選ぶため）
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._emit_tasks: Set[asyncio.Task] = set()
+        self._registered = 0
+        self._expired = 0
+        self._evicted = 0
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, effect_id: str) -> bool:
+        return effect_id in self._store
+
+    def register(self, effect: Dict[str, Any], duration: Optional[float] = None) -> EffectView:
+        """
+        エフェクトを稼働中として登録する
+
+        Args:
+            effect: create_*_effect が返したエフェクト
+            duration: 稼働時間（秒）。省略時は parameters["duration"]、0以下なら終了しない
+
+        Returns:
+            EffectView: 登録したエフェクトのビュー
+
+        Raises:
+            EffectCapacityError: REJECTポリシーで上限に達している場合
+        """
+        effect_id = effect["id"]
+        if effect_id in self._store:
+            self._untrack(effect_id)
+        elif len(self._store) >= self.max_active:
+            if self.eviction == EvictionPolicy.REJECT:
+                raise EffectCapacityError(f"Active effect limit reached ({self.max_active})")
+            oldest = next(iter(self._order))
+            self._retire(oldest, "evicted")
+            self._evicted += 1
+
+        self._store.add(effect)
+        self._order[effect_id] = None
+        if duration is None:
+            duration = effect.get("parameters", {}).get("duration") or 0
+        if duration > 0:
+            self._timers[effect_id] = self._wheel.schedule(duration, effect_id)
+        self._registered += 1
+        return self._store.view(effect_id)
+
+    def get(self, effect_id: str) -> Optional[EffectView]:
+        """
+        稼働中のエフェクトを取得する
+
+        Args:
+            effect_id: エフェクトID
+
+        Returns:
+            Optional[EffectView]: エフェクトのビュー
+        """
+        return self._store.view(effect_id)
+
+    def active(self) -> List[EffectView]:
+        """稼働中の全エフェクトを登録順に取得する"""
+        return [self._store.view(effect_id) for effect_id in self._order]
+
+    def cancel(self, effect_id: str) -> bool:
+        """
+        エフェクトを終了時刻前に取り消す
+
+        Args:
+            effect_id: エフェクトID
+
+        Returns:
+            bool: 取り消した場合True
+        """
+        if effect_id not in self._store:
+            return False
+        self._retire(effect_id, "cancelled")
+        self._cancelled += 1
+        return True
+
+    def expire_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        終了時刻を過ぎたエフェクトを取り除く
+
+        Args:
+            now: 現在時刻（省略時はclock）
+
+        Returns:
+            List[str]: 終了したエフェクトのID
+        """
+        expired = []
+        for effect_id in self._wheel.advance(now):
+            self._timers.pop(effect_id, None)
+            if effect_id in self._store:
+                self._retire(effect_id, "expired", cancel_timer=False)
+                expired.append(effect_id)
+        self._expired += len(expired)
+        return expired
+
+    def metrics(self) -> LifecycleMetrics:
+        """
+        現在の統計を取得する
+
+        Returns:
+            LifecycleMetrics: ライフサイクルの統計
+        """
+        return LifecycleMetrics(
+            active=len(self._store),
+            max_active=self.max_active,
+            registered=self._registered,
+            expired=self._expired,
+            evicted=self._evicted,
+            cancelled=self._cancelled
+        )
+
+    async def start(self) -> None:
+        """終了判定のループを開始する"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Effect lifecycle manager started")
+
+    async def stop(self) -> None:
+        """終了判定のループを停止し、発行中のイベントを待つ"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*self._emit_tasks, return_exceptions=True)
+        logger.info("Effect lifecycle manager stopped")
+
+    def clear(self) -> None:
+        """全エフェクトをイベントを発行せずに破棄する"""
+        for handle in self._timers.values():
+            self._wheel.cancel(handle)
+        self._timers.clear()
+        self._order.clear()
+        self._store.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._wheel.tick)
+            try:
+                self.expire_due()
+            except Exception as e:
+                logger.error(f"Error in effect lifecycle loop: {str(e)}")
+
+    def _untrack(self, effect_id: str) -> None:
+        handle = self._timers.pop(effect_id, None)
+        if handle is not None:
+            self._wheel.cancel(handle)
+        self._order.pop(effect_id, None)
+        self._store.remove(effect_id)
+
+    def _retire(self, effect_id: str, reason: str, cancel_timer: bool = True) -> None:
+        view = self._store.view(effect_id)
+        effect = view.to_dict() if view is not None else {"id": effect_id}
+        if cancel_timer:
+            self._untrack(effect_id)
+        else:
+            self._order.pop(effect_id, None)
+            self._store.remove(effect_id)
+        self._emit(Event(
+            type=EFFECT_EXPIRED_EVENT,
+            data={
+                "effect_id": effect_id,
+                "effect_type": effect.get("type"),
+                "reason": reason,
+                "effect": effect
+            }
+        ))
+
+    def _emit(self, event: Event) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"No running event loop, dropping {event.type} for {event.data.get('effect_id')}")
+            return
+        task = loop.create_task(self._publish(event))
+        self._emit_tasks.add(task)
+        task.add_done_callback(self._emit_tasks.discard)
+
+    async def _publish(self, event: Event) -> None:
+        try:
+            await self.event_system.publish(event)
+        except Exception as e:
+            logger.error(f"Failed to publish {event.type} for {event.data.get('effect_id')}: {str(e)}")
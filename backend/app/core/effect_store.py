@@ -0,0 +1,359 @@
+import string
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# エフェクトタイプの列挙値（型付き列にはこのコードを格納する）
+EFFECT_TYPES: Tuple[str, ...] = ("particle", "sound", "light")
+_TYPE_CODES = {effect_type: code for code, effect_type in enumerate(EFFECT_TYPES)}
+
+# エフェクトタイプごとのランダム値の列名と、値が整数かどうか
+_VALUE_FIELDS: Dict[str, Tuple[str, bool]] = {
+    "particle": ("particles_count", True),
+    "sound": ("frequency", False),
+    "light": ("radius", False),
+}
+
+# エフェクトタイプごとのパラメータ名（これ以外のキーを含むエフェクトは元の辞書のまま保持する）
+_PARAMETER_KEYS: Dict[str, frozenset] = {
+    "particle": frozenset(("color", "duration", "intensity", "particles_count")),
+    "sound": frozenset(("volume", "duration", "frequency")),
+    "light": frozenset(("color", "intensity", "duration", "radius")),
+}
+
+# 色を持たないエフェクト
+NO_COLOR = -1
+
+# 型付き列から元の値を復元するためのフラグ（整数で渡された値・小文字の色）
+DURATION_INT = 1
+INTENSITY_INT = 2
+VALUE_INT = 4
+COLOR_LOWER = 8
+
+_HEX_DIGITS = frozenset(string.hexdigits)
+
+
+def pack_color(color: Any) -> int:
+    """
+    "#RRGGBB" 形式の色を24ビット整数に変換する
+
+    Args:
+        color: 色の文字列
+
+    Returns:
+        int: 0xRRGGBB
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    # int() は符号や "_" も受け付けるため、16進数の6文字であることを先に確かめる
+    if not isinstance(color, str) or len(color) != 7 or color[0] != "#" or not _HEX_DIGITS.issuperset(color[1:]):
+        raise ValueError(f"Unsupported color: {color!r}")
+    return int(color[1:], 16)
+
+
+def unpack_color(packed: int, lower: bool = False) -> Optional[str]:
+    """24ビット整数を "#RRGGBB" 形式に戻す（lower=True の場合は小文字）"""
+    if packed == NO_COLOR:
+        return None
+    return f"#{packed:06x}" if lower else f"#{packed:06X}"
+
+
+def _number(value: Any) -> Tuple[float, bool]:
+    """
+    数値を型付き列に格納する値に変換する
+
+    Returns:
+        Tuple[float, bool]: 列に格納する値と、元の値が整数だったかどうか
+
+    Raises:
+        ValueError: 型付き列から元の値を復元できない場合（bool・巨大な整数・NaN等）
+    """
+    if type(value) not in (int, float) or float(value) != value:
+        raise ValueError(f"Unsupported number: {value!r}")
+    return float(value), type(value) is int
+
+
+@dataclass(frozen=True)
+class EffectRecord:
+    """稼働中エフェクトの不変レコード（__slots__ で属性辞書を持たない）
+
+    flags には元の値の型と色の表記を記録し、to_dict() で渡された値と
+    同じ型・表記の辞書に戻す。
+    """
+    __slots__ = ("id", "type", "duration", "intensity", "color", "value", "flags")
+
+    id: str
+    type: str
+    duration: float
+    intensity: float
+    color: int
+    value: float
+    flags: int
+
+    @classmethod
+    def from_dict(cls, effect: Dict[str, Any]) -> "EffectRecord":
+        """
+        EffectEngine.create_*_effect の辞書からレコードを作る
+
+        Raises:
+            ValueError: 型付き列に収まらない値を含む場合（元の辞書に戻せない場合）
+        """
+        effect_type = effect["type"]
+        if effect_type not in _VALUE_FIELDS:
+            raise ValueError(f"Unknown effect type: {effect_type}")
+        if set(effect) != {"type", "id", "parameters"}:
+            raise ValueError("Unsupported effect keys")
+        parameters = effect["parameters"]
+        if parameters.keys() != _PARAMETER_KEYS[effect_type]:
+            raise ValueError(f"Unsupported {effect_type} parameters")
+
+        value_field, _ = _VALUE_FIELDS[effect_type]
+        duration, duration_int = _number(parameters["duration"])
+        intensity, intensity_int = _number(parameters["volume" if effect_type == "sound" else "intensity"])
+        value, value_int = _number(parameters[value_field])
+        flags = (DURATION_INT if duration_int else 0) | (INTENSITY_INT if intensity_int else 0) | (VALUE_INT if value_int else 0)
+
+        color = NO_COLOR
+        if "color" in parameters:
+            color = pack_color(parameters["color"])
+            digits = parameters["color"][1:]
+            if digits != digits.upper():
+                # 大文字・小文字が混在した表記は復元できない
+                if digits != digits.lower():
+                    raise ValueError(f"Mixed-case color: {parameters['color']!r}")
+                flags |= COLOR_LOWER
+        return cls(
+            id=effect["id"],
+            type=effect_type,
+            duration=duration,
+            intensity=intensity,
+            color=color,
+            value=value,
+            flags=flags
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """create_*_effect と同じ形式の辞書に変換する（from_dict に渡した辞書と等しい）"""
+        return _build_dict(self.id, self.type, self.duration, self.intensity, self.color, self.value, self.flags)
+
+
+def _build_dict(
+    effect_id: str,
+    effect_type: str,
+    duration: float,
+    intensity: float,
+    color: int,
+    value: float,
+    flags: int
+) -> Dict[str, Any]:
+    value_field, _ = _VALUE_FIELDS[effect_type]
+    duration = int(duration) if flags & DURATION_INT else duration
+    intensity = int(intensity) if flags & INTENSITY_INT else intensity
+    if effect_type == "particle":
+        parameters = {"color": unpack_color(color, bool(flags & COLOR_LOWER)), "duration": duration, "intensity": intensity}
+    elif effect_type == "sound":
+        parameters = {"volume": intensity, "duration": duration}
+    else:
+        parameters = {"color": unpack_color(color, bool(flags & COLOR_LOWER)), "intensity": intensity, "duration": duration}
+    parameters[value_field] = int(value) if flags & VALUE_INT else value
+    return {"type": effect_type, "id": effect_id, "parameters": parameters}
+
+
+class EffectView(Mapping):
+    """ストア内のエフェクトを辞書として読むためのビュー
+
+    APIレスポンスなど辞書を期待する箇所にそのまま渡せる。
+    値は初回参照時に列から組み立てる。スロットは再利用されるため、
+    エフェクトの削除後にビューを使い続けないこと。
+    """
+
+    __slots__ = ("_store", "_slot", "_cached")
+
+    def __init__(self, store: "ActiveEffectStore", slot: int):
+        self._store = store
+        self._slot = slot
+        self._cached: Optional[Dict[str, Any]] = None
+
+    def _materialize(self) -> Dict[str, Any]:
+        if self._cached is None:
+            self._cached = self._store._slot_dict(self._slot)
+        return self._cached
+
+    def __getitem__(self, key: str) -> Any:
+        return self._materialize()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("type", "id", "parameters"))
+
+    def __len__(self) -> int:
+        return 3
+
+    def to_dict(self) -> Dict[str, Any]:
+        """通常の辞書に変換する"""
+        return dict(self._materialize())
+
+
+class ActiveEffectStore:
+    """稼働中エフェクトの列指向ストア
+
+    数値は array による型付き列に詰めて保持し、削除されたスロットは
+    空きリストで再利用する。元の値の型（整数/実数）と色の大文字・小文字は
+    フラグ列に記録するため、ビューは追加した辞書と同じ値を返す。
+    型付き列から元に戻せないエフェクト（色の形式が異なる・未知のキーを含む等）は
+    元の辞書のまま別表に保持する。
+    """
+
+    def __init__(self):
+        self._ids: List[Optional[str]] = []
+        self._types = array("b")
+        self._durations = array("d")
+        self._intensities = array("d")
+        self._colors = array("l")
+        self._values = array("d")
+        self._flags = array("B")
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._overflow: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, effect_id: str) -> bool:
+        return effect_id in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    @property
+    def capacity(self) -> int:
+        """確保済みのスロット数（空きスロットを含む）"""
+        return len(self._ids)
+
+    def add(self, effect: Union[Dict[str, Any], EffectRecord]) -> int:
+        """
+        エフェクトを追加する（同じIDがあれば置き換える）
+
+        Args:
+            effect: create_*_effect の辞書またはレコード
+
+        Returns:
+            int: 格納したスロット番号
+        """
+        effect_id = effect.id if isinstance(effect, EffectRecord) else effect["id"]
+        self.remove(effect_id)
+
+        record: Optional[EffectRecord] = None
+        if isinstance(effect, EffectRecord):
+            record = effect
+        else:
+            try:
+                record = EffectRecord.from_dict(effect)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                record = None
+
+        slot = self._allocate()
+        self._ids[slot] = effect_id
+        self._slots[effect_id] = slot
+        if record is None:
+            self._types[slot] = -1
+            self._overflow[slot] = effect
+            return slot
+
+        self._types[slot] = _TYPE_CODES[record.type]
+        self._durations[slot] = record.duration
+        self._intensities[slot] = record.intensity
+        self._colors[slot] = record.color
+        self._values[slot] = record.value
+        self._flags[slot] = record.flags
+        return slot
+
+    def remove(self, effect_id: str) -> bool:
+        """
+        エフェクトを削除しスロットを空きリストに戻す
+
+        Args:
+            effect_id: エフェクトID
+
+        Returns:
+            bool: 削除した場合True
+        """
+        slot = self._slots.pop(effect_id, None)
+        if slot is None:
+            return False
+        self._ids[slot] = None
+        self._overflow.pop(slot, None)
+        self._free.append(slot)
+        return True
+
+    def get(self, effect_id: str) -> Optional[EffectRecord]:
+        """
+        エフェクトをレコードとして取得する（別表のエフェクトはNone）
+
+        Args:
+            effect_id: エフェクトID
+
+        Returns:
+            Optional[EffectRecord]: レコード
+        """
+        slot = self._slots.get(effect_id)
+        if slot is None or slot in self._overflow:
+            return None
+        return EffectRecord(
+            id=effect_id,
+            type=EFFECT_TYPES[self._types[slot]],
+            duration=self._durations[slot],
+            intensity=self._intensities[slot],
+            color=self._colors[slot],
+            value=self._values[slot],
+            flags=self._flags[slot]
+        )
+
+    def view(self, effect_id: str) -> Optional[EffectView]:
+        """
+        エフェクトを辞書互換のビューとして取得する
+
+        Args:
+            effect_id: エフェクトID
+
+        Returns:
+            Optional[EffectView]: ビュー
+        """
+        slot = self._slots.get(effect_id)
+        return None if slot is None else EffectView(self, slot)
+
+    def views(self) -> Iterator[EffectView]:
+        """全エフェクトのビューを返す"""
+        for slot in list(self._slots.values()):
+            yield EffectView(self, slot)
+
+    def clear(self) -> None:
+        """全エフェクトを削除し、確保済みの領域も解放する"""
+        self.__init__()
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self._ids.append(None)
+        self._types.append(-1)
+        self._durations.append(0.0)
+        self._intensities.append(0.0)
+        self._colors.append(NO_COLOR)
+        self._values.append(0.0)
+        self._flags.append(0)
+        return len(self._ids) - 1
+
+    def _slot_dict(self, slot: int) -> Dict[str, Any]:
+        overflow = self._overflow.get(slot)
+        if overflow is not None:
+            return overflow
+        return _build_dict(
+            self._ids[slot],
+            EFFECT_TYPES[self._types[slot]],
+            self._durations[slot],
+            self._intensities[slot],
+            self._colors[slot],
+            self._values[slot],
+            self._flags[slot]
+        )
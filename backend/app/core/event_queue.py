@@ -0,0 +1,252 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+class EventPriority(IntEnum):
+    """イベントの優先度レーン（値が小さいほど優先）"""
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# イベントタイプごとのデフォルト優先度
+DEFAULT_TYPE_PRIORITIES: Dict[str, EventPriority] = {
+    "system_alert": EventPriority.HIGH,
+    "user_action": EventPriority.LOW,
+}
+
+# CRITICAL以外のレーンの重み（1巡あたりに取り出す回数）
+DEFAULT_LANE_WEIGHTS: Dict[EventPriority, int] = {
+    EventPriority.HIGH: 8,
+    EventPriority.NORMAL: 4,
+    EventPriority.LOW: 1,
+}
+
+
+def default_priority(event: Any) -> EventPriority:
+    """
+    イベントの優先度を決定する
+
+    明示的な優先度 > severity == "critical" > イベントタイプの既定値 の順に判定する。
+
+    Args:
+        event: 判定するイベント
+
+    Returns:
+        EventPriority: イベントの優先度
+    """
+    priority = getattr(event, "priority", None)
+    if priority is not None:
+        return EventPriority(priority)
+    if event.data.get("severity") == "critical":
+        return EventPriority.CRITICAL
+    return DEFAULT_TYPE_PRIORITIES.get(event.type, EventPriority.NORMAL)
+
+
+@dataclass
+class LaneMetrics:
+    """レーンごとのキュー統計"""
+    priority: str
+    depth: int = 0
+    enqueued: int = 0
+    dequeued: int = 0
+    dropped: int = 0
+    avg_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    depth_by_type: Dict[str, int] = field(default_factory=dict)
+
+
+class _Lane:
+    """1つの優先度レーン
+
+    イベントタイプごとにサブキューを持ち、タイプ間はラウンドロビンで取り出す。
+    """
+
+    def __init__(self, priority: EventPriority):
+        self.priority = priority
+        self.by_type: Dict[str, Deque[Tuple[float, Any]]] = {}
+        self.rotation: Deque[str] = deque()
+        self.depth = 0
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def push(self, event: Any, now: float) -> None:
+        queue = self.by_type.get(event.type)
+        if queue is None:
+            queue = self.by_type[event.type] = deque()
+            self.rotation.append(event.type)
+        queue.append((now, event))
+        self.depth += 1
+        self.enqueued += 1
+
+    def pop(self, now: float) -> Any:
+        event_type = self.rotation[0]
+        queue = self.by_type[event_type]
+        enqueued_at, event = queue.popleft()
+        if queue:
+            self.rotation.rotate(-1)
+        else:
+            del self.by_type[event_type]
+            self.rotation.popleft()
+
+        self.depth -= 1
+        self.dequeued += 1
+        wait = now - enqueued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return event
+
+    def drop(self) -> Any:
+        """最も多く溜まっているタイプの最古のイベントを捨てる"""
+        event_type = max(self.by_type, key=lambda name: len(self.by_type[name]))
+        queue = self.by_type[event_type]
+        _, event = queue.popleft()
+        if not queue:
+            del self.by_type[event_type]
+            self.rotation.remove(event_type)
+        self.depth -= 1
+        self.dropped += 1
+        return event
+
+    def metrics(self) -> LaneMetrics:
+        return LaneMetrics(
+            priority=self.priority.name.lower(),
+            depth=self.depth,
+            enqueued=self.enqueued,
+            dequeued=self.dequeued,
+            dropped=self.dropped,
+            avg_wait_ms=(self.total_wait / self.dequeued * 1000) if self.dequeued else 0.0,
+            max_wait_ms=self.max_wait * 1000,
+            depth_by_type={name: len(queue) for name, queue in self.by_type.items()}
+        )
+
+
+class _LaneScheduler:
+    """全レーンを保持し、次に取り出すレーンを決める"""
+
+    def __init__(self, cycle: List[EventPriority], resolve_priority: Callable[[Any], EventPriority]):
+        self.lanes = {priority: _Lane(priority) for priority in EventPriority}
+        self._cycle = cycle
+        self._cursor = 0
+        self._resolve_priority = resolve_priority
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        for lane in self.lanes.values():
+            for queue in lane.by_type.values():
+                for _, event in queue:
+                    yield event
+
+    def push(self, event: Any) -> None:
+        self.lanes[self._resolve_priority(event)].push(event, time.monotonic())
+        self._size += 1
+
+    def pop(self) -> Any:
+        event = self._next_lane().pop(time.monotonic())
+        self._size -= 1
+        return event
+
+    def drop(self) -> Any:
+        for priority in sorted(EventPriority, reverse=True):
+            lane = self.lanes[priority]
+            if lane.depth:
+                self._size -= 1
+                return lane.drop()
+        raise asyncio.QueueEmpty
+
+    def _next_lane(self) -> _Lane:
+        critical = self.lanes[EventPriority.CRITICAL]
+        if critical.depth:
+            return critical
+
+        for offset in range(len(self._cycle)):
+            index = (self._cursor + offset) % len(self._cycle)
+            lane = self.lanes[self._cycle[index]]
+            if lane.depth:
+                self._cursor = (index + 1) % len(self._cycle)
+                return lane
+
+        # 重みに含まれていないレーン
+        for lane in self.lanes.values():
+            if lane.depth:
+                return lane
+        raise asyncio.QueueEmpty
+
+
+class LaneQueue(asyncio.Queue):
+    """優先度レーンとイベントタイプ単位の公平スケジューリングを行うキュー
+
+    CRITICALレーンは常に最優先で取り出す。それ以外のレーンは重み付き
+    ラウンドロビンで取り出すため、低優先度レーンも飢餓状態にならない。
+    各レーン内ではイベントタイプごとに順番に取り出すので、
+    1つのタイプが大量に発生しても他のタイプの処理は遅れない。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        priority_resolver: Optional[Callable[[Any], EventPriority]] = None,
+        lane_weights: Optional[Dict[EventPriority, int]] = None
+    ):
+        """
+        Args:
+            maxsize (int): 全レーン合計の最大長（0は無制限）
+            priority_resolver (Optional[Callable]): イベントの優先度を決める関数
+            lane_weights (Optional[Dict[EventPriority, int]]): CRITICAL以外のレーンの重み
+        """
+        self._resolve_priority = priority_resolver or default_priority
+        weights = lane_weights or DEFAULT_LANE_WEIGHTS
+        self._cycle: List[EventPriority] = [
+            priority
+            for priority in sorted(weights)
+            if priority != EventPriority.CRITICAL
+            for _ in range(max(1, weights[priority]))
+        ]
+        super().__init__(maxsize)
+
+    # asyncio.Queueの内部フック（PriorityQueue等と同じ拡張方法）
+    def _init(self, maxsize: int) -> None:
+        self._queue = _LaneScheduler(self._cycle, self._resolve_priority)
+
+    def _put(self, event: Any) -> None:
+        self._queue.push(event)
+
+    def _get(self) -> Any:
+        return self._queue.pop()
+
+    def drop_one(self) -> Any:
+        """
+        空きを作るためにイベントを1件捨てる
+
+        最も優先度の低い空でないレーンから、最も多く溜まっているタイプの
+        最古のイベントを選ぶ。
+
+        Returns:
+            Any: 捨てたイベント
+
+        Raises:
+            asyncio.QueueEmpty: キューが空の場合
+        """
+        event = self._queue.drop()
+        self.task_done()
+        return event
+
+    def metrics(self) -> Dict[str, LaneMetrics]:
+        """
+        レーンごとの統計を取得する
+
+        Returns:
+            Dict[str, LaneMetrics]: レーン名をキーとした統計
+        """
+        return {lane.priority.name.lower(): lane.metrics() for lane in self._queue.lanes.values()}
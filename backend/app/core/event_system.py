@@ -1,9 +1,14 @@
-from typing import Dict, List, Callable, Any
-from dataclasses import dataclass
+from typing import Dict, List, Callable, Any, Optional, Set
+from dataclasses import dataclass, field
+from enum import Enum
 import logging
 import asyncio
+import contextvars
 from datetime import datetime
 
+from app.core.event_queue import EventPriority, LaneMetrics, LaneQueue
+from app.core.rate_limiter import EffectAdmission, effect_admission
+
 # ロガーの設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +19,49 @@ class Event:
     type: str
     data: Dict[str, Any]
     timestamp: datetime = datetime.now()
+    priority: Optional[EventPriority] = None
+    # イベントを発行した仕組み（トリガーが発行したイベントはトリガーの照合に戻さない）
+    source: Optional[str] = None
+
+class DispatchMode(Enum):
+    """ハンドラーの実行完了をどこまで待つかを表す列挙型"""
+    FIRE_AND_FORGET = "fire_and_forget"
+    WAIT_ALL = "wait_all"
+    WAIT_FIRST_N = "wait_first_n"
+
+class BackpressurePolicy(Enum):
+    """イベントキューが満杯のときの振る舞い"""
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    REJECT = "reject"
+
+class EventQueueFullError(Exception):
+    """REJECTポリシーでイベントキューが満杯の場合の例外"""
+
+@dataclass
+class HandlerResult:
+    """ハンドラー1つ分の実行結果"""
+    handler: Callable
+    result: Any = None
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and not self.timed_out
+
+@dataclass
+class DispatchResult:
+    """イベント1件分のディスパッチ結果"""
+    event: Event
+    results: List[HandlerResult] = field(default_factory=list)
+    pending: int = 0
+
+# 全てのイベントを受け取るハンドラーの登録に使うイベントタイプ
+ALL_EVENTS = "*"
+
+# 実行中のハンドラーが同時実行数の枠を持っているか（ハンドラーのタスクごとの値）
+_holding_slot: contextvars.ContextVar[bool] = contextvars.ContextVar("holding_handler_slot", default=False)
 
 class EventSystem:
     """イベント管理システム
@@ -21,10 +69,42 @@ class EventSystem:
     イベントの登録、処理、エフェクトの発動を管理するシステム
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        handler_timeout: Optional[float] = 10.0,
+        worker_count: int = 4,
+        queue_size: int = 10000,
+        backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        priority_resolver: Optional[Callable[[Event], EventPriority]] = None,
+        admission: Optional[EffectAdmission] = None
+    ):
+        """
+        Args:
+            max_concurrency (int): 同時に実行できるハンドラー数の上限
+            handler_timeout (Optional[float]): ハンドラー1つあたりのタイムアウト（秒）
+            worker_count (int): キューを処理するワーカータスク数
+            queue_size (int): イベントキューの最大長
+            backpressure (BackpressurePolicy): キューが満杯のときの振る舞い
+            priority_resolver (Optional[Callable]): イベントの優先度レーンを決める関数
+            admission (Optional[EffectAdmission]): エフェクト発動の受け付け判定（Noneの場合は制限しない）
+        """
+        if worker_count < 1:
+            raise ValueError("worker_count must be at least 1")
+
         self._handlers: Dict[str, List[Callable]] = {}
-        self._active = True
-        self._event_queue = asyncio.Queue()
+        self._active = False
+        self._event_queue = LaneQueue(maxsize=queue_size, priority_resolver=priority_resolver)
+        self.worker_count = worker_count
+        self.backpressure = backpressure
+        self.dropped_events = 0
+        # ワーカーの起動前にその場で処理中のイベント数
+        self._inline_events = 0
+        self._workers: List[asyncio.Task] = []
+        self.handler_timeout = handler_timeout
+        self.admission = admission
+        self._handler_slots = asyncio.Semaphore(max_concurrency)
+        self._background_tasks: Set[asyncio.Task] = set()
         
     def register_handler(self, event_type: str, handler: Callable) -> None:
         """イベントハンドラーを登録する
@@ -40,86 +120,304 @@ class EventSystem:
             self._handlers[event_type].append(handler)
             logger.info(f"Registered handler for event type: {event_type}")
 
-    async def process_event(self, event: Event) -> None:
+    async def register_event_type(self, event_type: str) -> None:
+        """イベントタイプを登録する（ハンドラーがなくても警告しない）
+        
+        Args:
+            event_type (str): イベントタイプ
+        """
+        self._handlers.setdefault(event_type, [])
+
+    async def add_listener(self, event_type: str, handler: Callable) -> None:
+        """イベントハンドラーを登録する（register_handler の非同期版）
+        
+        Args:
+            event_type (str): イベントタイプ（ALL_EVENTS の場合は全てのイベント）
+            handler (Callable): ハンドラー関数
+        """
+        self.register_handler(event_type, handler)
+
+    async def process_event(
+        self,
+        event: Event,
+        mode: DispatchMode = DispatchMode.WAIT_ALL,
+        first_n: int = 1
+    ) -> DispatchResult:
         """イベントを処理する
         
+        登録されたハンドラーを並行に実行するため、イベントの処理時間は
+        各ハンドラーの合計ではなく最も遅いハンドラーの時間になる。
+        
         Args:
             event (Event): 処理するイベント
+            mode (DispatchMode): ハンドラーの完了をどこまで待つか
+            first_n (int): WAIT_FIRST_N の場合に待つハンドラー数
+            
+        Returns:
+            DispatchResult: 完了したハンドラーの結果と未完了のハンドラー数
         """
+        dispatch = DispatchResult(event=event)
         try:
-            if event.type in self._handlers:
-                handlers = self._handlers[event.type]
-                for handler in handlers:
-                    try:
-                        await asyncio.create_task(self._execute_handler(handler, event))
-                    except Exception as e:
-                        logger.error(f"Error executing handler: {e}")
-            else:
-                logger.warning(f"No handlers registered for event type: {event.type}")
+            handlers = self._handlers.get(event.type, []) + self._handlers.get(ALL_EVENTS, [])
+            if not handlers:
+                if event.type not in self._handlers:
+                    logger.warning(f"No handlers registered for event type: {event.type}")
+                return dispatch
+
+            tasks = [asyncio.create_task(self._execute_handler(handler, event)) for handler in handlers]
+
+            if mode == DispatchMode.FIRE_AND_FORGET:
+                self._track_background(tasks)
+                dispatch.pending = len(tasks)
+                return dispatch
+
+            if mode == DispatchMode.WAIT_FIRST_N:
+                remaining = set(tasks)
+                target = max(1, min(first_n, len(tasks)))
+                while remaining and len(dispatch.results) < target:
+                    done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+                    dispatch.results.extend(task.result() for task in done)
+                self._track_background(remaining)
+                dispatch.pending = len(remaining)
+                return dispatch
+
+            dispatch.results = list(await asyncio.gather(*tasks))
+            return dispatch
                 
         except Exception as e:
             logger.error(f"Error processing event: {e}")
+            return dispatch
 
-    async def _execute_handler(self, handler: Callable, event: Event) -> None:
+    async def _execute_handler(self, handler: Callable, event: Event) -> HandlerResult:
         """ハンドラーを実行する
         
+        同時実行数の上限とハンドラーごとのタイムアウトを適用する。
+        同期ハンドラーはイベントループを止めないようスレッドで実行する
+        （タイムアウトした場合も枠は返すが、スレッド自体は最後まで実行される）。
+        
         Args:
             handler (Callable): 実行するハンドラー
             event (Event): イベントデータ
+            
+        Returns:
+            HandlerResult: ハンドラーの戻り値または例外
         """
+        async with self._handler_slots:
+            _holding_slot.set(True)
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    call = handler(event)
+                else:
+                    call = asyncio.to_thread(handler, event)
+                result = await asyncio.wait_for(call, timeout=self.handler_timeout)
+                return HandlerResult(handler=handler, result=result)
+            except asyncio.TimeoutError as e:
+                logger.error(f"Handler timed out after {self.handler_timeout}s: {getattr(handler, '__name__', handler)}")
+                return HandlerResult(handler=handler, error=e, timed_out=True)
+            except Exception as e:
+                logger.error(f"Handler execution error: {e}")
+                return HandlerResult(handler=handler, error=e)
+            finally:
+                _holding_slot.set(False)
+
+    async def _process_nested(self, event: Event) -> None:
+        """ハンドラーの中から発行されたイベントをその場で処理する
+        
+        発行元のハンドラーが持つ枠を処理の間だけ返す。持ったまま入れ子の
+        ハンドラーの完了を待つと、入れ子が深いほど枠を使い切って止まる。
+        """
+        self._handler_slots.release()
+        _holding_slot.set(False)
         try:
-            if asyncio.iscoroutinefunction(handler):
-                await handler(event)
-            else:
-                handler(event)
-        except Exception as e:
-            logger.error(f"Handler execution error: {e}")
+            await self.process_event(event)
+        finally:
+            await self._handler_slots.acquire()
+            _holding_slot.set(True)
 
-    async def trigger_effect(self, effect_type: str, parameters: Dict[str, Any]) -> None:
+    def _track_background(self, tasks) -> None:
+        """待たずに実行を続けるハンドラータスクの参照を保持する"""
+        for task in tasks:
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def trigger_effect(
+        self,
+        effect_type: str,
+        parameters: Dict[str, Any],
+        user: Optional[str] = None,
+        api_key: Optional[str] = None,
+        source: Optional[str] = None,
+        block: bool = True
+    ) -> bool:
         """エフェクトを発動する
         
         Args:
             effect_type (str): エフェクトタイプ
             parameters (Dict[str, Any]): エフェクトのパラメータ
+            user (Optional[str]): 発動したユーザーの識別子（レート制限に使う）
+            api_key (Optional[str]): 発動に使われたAPIキー（レート制限に使う）
+            source (Optional[str]): イベントを発行した仕組み
+            block (bool): Falseの場合はキューの空きを待たない（publish を参照）
+            
+        Returns:
+            bool: イベントが受け付けられた場合True
+            
+        Raises:
+            RateLimitExceeded: レート制限または負荷制御で受け付けなかった場合
+            EventQueueFullError: REJECTポリシーでキューが満杯の場合
         """
+        if self.admission is not None:
+            await self.admission.admit(effect_type, user=user, api_key=api_key)
+
         event = Event(
             type=effect_type,
             data={
                 "parameters": parameters,
                 "triggered_at": datetime.now().isoformat()
-            }
+            },
+            source=source
         )
         
-        await self._event_queue.put(event)
-        await self.process_event(event)
+        return await self.publish(event, block=block)
+
+    async def publish(self, event: Event, block: bool = True) -> bool:
+        """イベントを発行する
+        
+        ワーカーが起動している場合はキューに積むだけで、処理はワーカーが行う。
+        起動前はその場で処理する。
+        
+        ハンドラーの中（ワーカー上）から発行する場合は block=False にする。
+        BLOCKポリシーでキューの空きを待つと、キューを空けるはずのワーカー自身が
+        止まってデッドロックするため、満杯なら発行したイベントを捨てる。
+        
+        Args:
+            event (Event): 発行するイベント
+            block (bool): Falseの場合はキューの空きやハンドラーの完了を待たない
+            
+        Returns:
+            bool: イベントが受け付けられた場合True
+            
+        Raises:
+            EventQueueFullError: REJECTポリシーでキューが満杯の場合
+        """
+        if not self._workers:
+            if not block:
+                await self.process_event(event, mode=DispatchMode.FIRE_AND_FORGET)
+                return True
+            self._inline_events += 1
+            try:
+                if _holding_slot.get():
+                    await self._process_nested(event)
+                else:
+                    await self.process_event(event)
+            finally:
+                self._inline_events -= 1
+            return True
+
+        if not self._active:
+            logger.warning(f"Event system is stopping, discarding event: {event.type}")
+            return False
+
+        if self.backpressure == BackpressurePolicy.BLOCK and block:
+            await self._event_queue.put(event)
+            return True
+
+        try:
+            self._event_queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            if self.backpressure == BackpressurePolicy.BLOCK:
+                self.dropped_events += 1
+                logger.warning(f"Event queue full, discarded event without waiting: {event.type}")
+                return False
+            if self.backpressure == BackpressurePolicy.REJECT:
+                raise EventQueueFullError(f"Event queue is full ({self._event_queue.maxsize})")
+
+        # DROP_OLDEST: 最も優先度の低いレーンで最も溜まっているタイプの最古のイベントを捨てる
+        dropped = self._event_queue.drop_one()
+        self.dropped_events += 1
+        logger.warning(f"Event queue full, dropped oldest event: {dropped.type}")
+        self._event_queue.put_nowait(event)
+        return True
+
+    def queue_depth(self) -> int:
+        """キューに溜まっているイベント数を取得する（ワーカーの起動前はその場で処理中のイベント数）"""
+        return self._event_queue.qsize() + self._inline_events
+
+    def queue_metrics(self) -> Dict[str, LaneMetrics]:
+        """レーンごとのキュー長と待ち時間の統計を取得する
+        
+        Returns:
+            Dict[str, LaneMetrics]: レーン名をキーとした統計
+        """
+        return self._event_queue.metrics()
 
     async def start(self) -> None:
-        """イベントシステムを開始する"""
+        """イベントシステムを開始する
+        
+        ワーカータスクを起動して戻る。
+        """
+        if self._workers:
+            return
         self._active = True
-        while self._active:
+        self._workers = [
+            asyncio.create_task(self._worker(index))
+            for index in range(self.worker_count)
+        ]
+        logger.info(f"Event system started with {self.worker_count} workers")
+
+    async def _worker(self, index: int) -> None:
+        """キューからイベントを取り出して処理するワーカー"""
+        while True:
+            event = await self._event_queue.get()
             try:
-                event = await self._event_queue.get()
                 await self.process_event(event)
             except Exception as e:
-                logger.error(f"Error in event processing loop: {e}")
+                logger.error(f"Error in event worker {index}: {e}")
+            finally:
+                self._event_queue.task_done()
 
-    async def stop(self) -> None:
-        """イベントシステムを停止する"""
+    async def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """イベントシステムを停止する
+        
+        新しいイベントの受け付けを止め、キューに残ったイベントを
+        処理し終えてからワーカーを停止する。
+        
+        Args:
+            drain (bool): キューに残ったイベントを処理してから停止するか
+            timeout (Optional[float]): 処理待ちの最大時間（秒）
+        """
         self._active = False
+        if drain and self._workers:
+            try:
+                await asyncio.wait_for(self._event_queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Event system stopped with {self._event_queue.qsize()} events still queued")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
         logger.info("Event system stopped")
 
 # シングルトンインスタンスの作成
-event_system = EventSystem()
+event_system = EventSystem(admission=effect_admission)
+# 負荷制御の判定にイベントキューの長さを使う
+effect_admission.controller.queue_depth = event_system.queue_depth
+
+if __name__ == "__main__":
+    async def example_handler(event: Event):
+        print(f"Processing event: {event.type}")
 
-async def example_handler(event: Event):
-    print(f"Processing event: {event.type}")
+    async def main():
+        # ハンドラーの登録
+        event_system.register_handler("effect_activated", example_handler)
 
-# ハンドラーの登録
-await event_system.register_handler("effect_activated", example_handler)
+        # エフェクトの発動
+        await event_system.trigger_effect("effect_activated", {
+            "color": "blue",
+            "duration": 5,
+            "intensity": 0.8
+        })
 
-# エフェクトの発動
-await event_system.trigger_effect("effect_activated", {
-    "color": "blue",
-    "duration": 5,
-    "intensity": 0.8
-})
\ No newline at end of file
+    asyncio.run(main())
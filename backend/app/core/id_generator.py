@@ -0,0 +1,351 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 2024-01-01T00:00:00Z（ミリ秒）
+DEFAULT_EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 41
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# ワーカーIDを明示する環境変数（このプロセス専用。forkしたワーカーには引き継がない）
+WORKER_ID_ENV = "EFFECT_ID_WORKER_ID"
+# 自動で確保するワーカーIDの範囲を "start-end" で指定する環境変数（ホストごとに重ならない範囲を割り当てる）
+# ロックファイルはホスト内でしか排他できないため、自動で確保する場合は必須（単一ホストなら "0-1023"）
+WORKER_RANGE_ENV = "EFFECT_ID_WORKER_RANGE"
+# ワーカーIDのロックファイルを置くディレクトリを指定する環境変数（同じホストの全プロセスで共有する）
+WORKER_LOCK_DIR_ENV = "EFFECT_ID_WORKER_LOCK_DIR"
+
+
+class WorkerIdError(RuntimeError):
+    """一意なワーカーIDを決められない場合の例外"""
+
+
+def parse_worker_range(value: str) -> range:
+    """
+    "start-end" 形式のワーカーIDの範囲を解析する
+
+    Args:
+        value: 環境変数の値（両端を含む）
+
+    Returns:
+        range: ワーカーIDの範囲
+
+    Raises:
+        WorkerIdError: 形式が不正な場合
+    """
+    start, separator, end = value.partition("-")
+    try:
+        first, last = int(start), int(end if separator else start)
+    except ValueError:
+        raise WorkerIdError(f"Expected 'start-end' in {WORKER_RANGE_ENV}")
+    if not 0 <= first <= last <= MAX_WORKER_ID:
+        raise WorkerIdError(f"{WORKER_RANGE_ENV} must be within 0-{MAX_WORKER_ID}")
+    return range(first, last + 1)
+
+
+class WorkerIdLease:
+    """ロックファイルで確保するワーカーID
+
+    同じホストのプロセスは同じディレクトリの worker-<ID>.lock をロックして
+    IDを1つずつ確保するため、同時に動いているプロセス間でIDが重ならない。
+    ロックはプロセスの終了時にOSが解放する。ロックは他のホストには見えないため、
+    範囲は EFFECT_ID_WORKER_RANGE でホストごとに重ならないように割り当てる。
+    範囲を指定しない場合は全ホストが0から確保してIDが衝突するため、確保しない。
+    """
+
+    def __init__(self, directory: Optional[Path] = None, candidates: Optional[range] = None):
+        """
+        初期化
+
+        Args:
+            directory: ロックファイルのディレクトリ（省略時は EFFECT_ID_WORKER_LOCK_DIR または一時ディレクトリ）
+            candidates: 確保するワーカーIDの範囲（省略時は EFFECT_ID_WORKER_RANGE）
+        """
+        self.directory = Path(directory) if directory else None
+        self.candidates = candidates
+        self.worker_id: Optional[int] = None
+        self._file = None
+
+    def acquire(self) -> int:
+        """
+        空いているワーカーIDを確保する（確保済みの場合は同じIDを返す）
+
+        Returns:
+            int: ワーカーID
+
+        Raises:
+            WorkerIdError: ロックを使えない場合、範囲が指定されていない場合、
+                または範囲内のIDが全て使用中の場合
+        """
+        if self.worker_id is not None:
+            return self.worker_id
+        if fcntl is None:
+            raise WorkerIdError(f"Worker ID leases require fcntl; set {WORKER_ID_ENV} for each process")
+
+        directory = self.directory or Path(
+            os.getenv(WORKER_LOCK_DIR_ENV) or Path(tempfile.gettempdir()) / "effect-id-workers"
+        )
+        candidates = self.candidates
+        if candidates is None:
+            configured = os.getenv(WORKER_RANGE_ENV)
+            if not configured:
+                raise WorkerIdError(
+                    f"{WORKER_RANGE_ENV} is not set; assign each host a worker ID range that no other host uses "
+                    f"(e.g. 0-{MAX_WORKER_ID} on a single host), or set {WORKER_ID_ENV} per process"
+                )
+            candidates = parse_worker_range(configured)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for worker_id in candidates:
+            lock_file = open(directory / f"worker-{worker_id}.lock", "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._file = lock_file
+            self.worker_id = worker_id
+            logger.info(f"Acquired effect ID worker {worker_id} ({directory})")
+            return worker_id
+        raise WorkerIdError(f"All worker IDs {candidates.start}-{candidates.stop - 1} are in use in {directory}")
+
+    def release(self) -> None:
+        """確保したワーカーIDを解放する"""
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+        self._file = None
+        self.worker_id = None
+
+    def forget(self) -> None:
+        """fork前に確保したIDを手放す（ロックは親プロセスが持ち続けるため解除しない）"""
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self.worker_id = None
+
+
+# プロセス共通のワーカーIDの確保
+worker_id_lease = WorkerIdLease()
+
+# fork後の子プロセスの場合True（明示したワーカーIDは親プロセスのもの）
+_forked = False
+
+
+def default_worker_id() -> int:
+    """
+    ワーカーIDの既定値を決める
+
+    環境変数 EFFECT_ID_WORKER_ID があればそれを使う。なければロックファイルで
+    EFFECT_ID_WORKER_RANGE の範囲から空いているIDを確保する。明示したIDはそのプロセス専用のため、fork した
+    ワーカーでは使わない（全ワーカーが同じIDになり、IDが衝突する）。
+
+    Returns:
+        int: 0〜1023のワーカーID
+
+    Raises:
+        WorkerIdError: 一意なワーカーIDを決められない場合
+    """
+    configured = os.getenv(WORKER_ID_ENV)
+    if configured is None:
+        return worker_id_lease.acquire()
+    if _forked:
+        raise WorkerIdError(
+            f"{WORKER_ID_ENV} is inherited by every forked worker; "
+            f"set it per worker process or unset it to acquire worker IDs automatically"
+        )
+    try:
+        worker_id = int(configured)
+    except ValueError:
+        raise WorkerIdError(f"{WORKER_ID_ENV} must be an integer")
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise WorkerIdError(f"{WORKER_ID_ENV} must be between 0 and {MAX_WORKER_ID}")
+    return worker_id
+
+
+class SnowflakeIdGenerator:
+    """時刻順に並ぶ64ビットIDの生成器
+
+    上位から 41ビットのミリ秒時刻 / 10ビットのワーカーID / 12ビットの連番。
+    同じワーカーIDの生成器が同時に1つだけであれば衝突しない。
+    ワーカーIDを省略した場合は最初の生成時に default_worker_id() で決める。
+    時計が巻き戻っても最後に使った時刻から進め続けるため、IDは常に単調増加する。
+    1ミリ秒に4096個を超えた場合は次のミリ秒の番号を前借りする。
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[int] = None,
+        epoch_ms: int = DEFAULT_EPOCH_MS,
+        clock: Callable[[], int] = time.time_ns
+    ):
+        """
+        初期化
+
+        Args:
+            worker_id: ワーカーID（省略時は最初の生成時に default_worker_id() で決める）
+            epoch_ms: 時刻部分の基準（UNIXミリ秒）
+            clock: 現在時刻をナノ秒で返す関数
+        """
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self.epoch_ms = epoch_ms
+        self._clock = clock
+        self._worker_bits = None if worker_id is None else worker_id << SEQUENCE_BITS
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        """
+        IDを1つ生成する
+
+        Returns:
+            int: 64ビット整数のID
+        """
+        with self._lock:
+            if self._worker_bits is None:
+                self._assign_worker()
+            now_ms = self._clock() // 1_000_000 - self.epoch_ms
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | self._worker_bits | self._sequence
+
+    def next_ids(self, n: int) -> List[int]:
+        """
+        連続したIDをまとめて生成する
+
+        ロックは1回だけ取得し、必要な範囲を一度に予約する。
+
+        Args:
+            n: 生成する数
+
+        Returns:
+            List[int]: 昇順のIDのリスト
+        """
+        if n <= 0:
+            return []
+
+        ids: List[int] = []
+        shift = WORKER_BITS + SEQUENCE_BITS
+        with self._lock:
+            if self._worker_bits is None:
+                self._assign_worker()
+            now_ms = self._clock() // 1_000_000 - self.epoch_ms
+            if now_ms > self._last_ms:
+                ms, sequence = now_ms, 0
+            else:
+                ms, sequence = self._last_ms, self._sequence + 1
+
+            remaining = n
+            while remaining:
+                if sequence > MAX_SEQUENCE:
+                    ms, sequence = ms + 1, 0
+                count = min(remaining, MAX_SEQUENCE + 1 - sequence)
+                base = (ms << shift) | self._worker_bits
+                ids.extend(range(base | sequence, (base | sequence) + count))
+                sequence += count
+                remaining -= count
+
+            self._last_ms, self._sequence = ms, sequence - 1
+        return ids
+
+    def reset_worker(self, worker_id: Optional[int] = None) -> None:
+        """
+        ワーカーIDを変更し状態を初期化する（fork後の子プロセスで使う）
+
+        Args:
+            worker_id: 新しいワーカーID（省略時は次の生成時に default_worker_id() で決める）
+        """
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._worker_bits = None if worker_id is None else worker_id << SEQUENCE_BITS
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def assign_worker(self) -> int:
+        """
+        ワーカーIDを確定する
+
+        起動時に呼び、設定の誤りを最初のID生成時ではなく起動時に検出する。
+
+        Returns:
+            int: ワーカーID
+
+        Raises:
+            WorkerIdError: 一意なワーカーIDを決められない場合
+        """
+        with self._lock:
+            if self._worker_bits is None:
+                self._assign_worker()
+            return self.worker_id
+
+    def _assign_worker(self) -> None:
+        self.worker_id = default_worker_id()
+        self._worker_bits = self.worker_id << SEQUENCE_BITS
+
+    def timestamp_ms(self, generated_id: int) -> int:
+        """
+        IDに含まれる生成時刻を取得する
+
+        Args:
+            generated_id: このジェネレーターが生成したID
+
+        Returns:
+            int: UNIXミリ秒
+        """
+        return (generated_id >> (WORKER_BITS + SEQUENCE_BITS)) + self.epoch_ms
+
+
+def format_effect_id(generated_id: int) -> str:
+    """
+    エフェクトID文字列に変換する（固定長16進数のため文字列順でも時刻順に並ぶ）
+
+    Args:
+        generated_id: SnowflakeIdGeneratorが生成したID
+
+    Returns:
+        str: "effect_" + 16桁の16進数
+    """
+    return f"effect_{generated_id:016x}"
+
+
+# シングルトンインスタンスの作成
+effect_id_generator = SnowflakeIdGenerator()
+
+
+def _reset_after_fork() -> None:
+    # 親プロセスのワーカーIDを引き継ぐとIDが衝突するため、子プロセスでは最初の生成時に決め直す
+    global _forked
+    _forked = True
+    worker_id_lease.forget()
+    effect_id_generator.reset_worker()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
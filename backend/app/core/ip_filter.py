@@ -0,0 +1,339 @@
+import asyncio
+import ipaddress
+import logging
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# ルールファイルのパスを指定する環境変数
+IP_RULES_FILE_ENV = "IP_RULES_FILE"
+
+# ルールが1つも一致しない場合に適用する許可ルール（従来の許可リストと同じ）
+DEFAULT_ALLOW = ("127.0.0.0/8", "::1/128")
+
+# ノードに付くルール（同じプレフィックスに両方ある場合は拒否を優先する）
+NO_RULE = 0
+ALLOW = 1
+DENY = 2
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+# IPv4射影アドレスの範囲（::ffff:a.b.c.d）
+IPV4_MAPPED = ipaddress.IPv6Network("::ffff:0:0/96")
+
+
+class IPRuleError(ValueError):
+    """IPルールの形式が不正な場合の例外"""
+
+
+class PrefixTrie:
+    """アドレスのビット列を1ビットずつたどる二分トライ
+
+    ノードは子ノード番号とルールの型付き配列で表し、番号0を根とする。
+    検索はアドレス長（IPv4は32、IPv6は128）回以下の配列参照で終わるため、
+    ルール数に関係なく一定時間で最長一致のルールが求まる。
+    """
+
+    def __init__(self, width: int):
+        """
+        初期化
+
+        Args:
+            width: アドレスのビット数
+        """
+        self.width = width
+        self._zero = array("l", [0])
+        self._one = array("l", [0])
+        self._rules = array("b", [NO_RULE])
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def insert(self, value: int, prefixlen: int, rule: int) -> None:
+        """
+        プレフィックスにルールを設定する
+
+        Args:
+            value: ネットワークアドレスの整数値
+            prefixlen: プレフィックス長
+            rule: ALLOW または DENY
+        """
+        node = 0
+        for shift in range(self.width - 1, self.width - 1 - prefixlen, -1):
+            children = self._one if (value >> shift) & 1 else self._zero
+            child = children[node]
+            if not child:
+                child = len(self._rules)
+                self._zero.append(0)
+                self._one.append(0)
+                self._rules.append(NO_RULE)
+                children[node] = child
+            node = child
+        self._rules[node] = max(self._rules[node], rule)
+
+    def lookup(self, value: int) -> int:
+        """
+        アドレスに最も長く一致するプレフィックスのルールを求める
+
+        Args:
+            value: アドレスの整数値
+
+        Returns:
+            int: 一致したルール（なければ NO_RULE）
+        """
+        zero, one, rules = self._zero, self._one, self._rules
+        node = 0
+        matched = rules[0]
+        for shift in range(self.width - 1, -1, -1):
+            node = one[node] if (value >> shift) & 1 else zero[node]
+            if not node:
+                break
+            rule = rules[node]
+            if rule:
+                matched = rule
+        return matched
+
+
+class IPRuleSet:
+    """許可・拒否のCIDRルールをコンパイルしたもの（構築後は変更しない）
+
+    IPv4射影アドレスはIPv4アドレスとして判定するため、射影範囲を指すIPv6形式の
+    ルール（::ffff:10.0.0.0/104 など）はIPv4のトライに入れる。射影範囲全体を含む
+    より短いIPv6ルール（::/0 など）は、IPv4のどのルールにも一致しない場合に適用する。
+    """
+
+    def __init__(self, allow: Iterable[str] = (), deny: Iterable[str] = (), default_allow: bool = False):
+        """
+        初期化
+
+        Args:
+            allow: 許可するCIDR（単一アドレスも可）
+            deny: 拒否するCIDR
+            default_allow: どのルールにも一致しない場合に許可するならTrue
+
+        Raises:
+            IPRuleError: CIDRの形式が不正な場合
+        """
+        self.default_allow = default_allow
+        self._v4 = PrefixTrie(32)
+        self._v6 = PrefixTrie(128)
+        # 射影範囲全体を含むIPv6ルールのうち最長のもの（プレフィックス長, ルール）
+        self._mapped_cover: Tuple[int, int] = (-1, NO_RULE)
+        self.rule_count = 0
+        for rule, networks in ((ALLOW, allow), (DENY, deny)):
+            for network in networks:
+                self.add(network, rule)
+
+    def add(self, network: str, rule: int) -> None:
+        """
+        ルールを追加する
+
+        Args:
+            network: CIDR（例: "10.0.0.0/8"）
+            rule: ALLOW または DENY
+
+        Raises:
+            IPRuleError: CIDRの形式が不正な場合
+        """
+        try:
+            parsed: IPNetwork = ipaddress.ip_network(network.strip(), strict=False)
+        except ValueError as e:
+            raise IPRuleError(f"Invalid network {network!r}: {str(e)}")
+        if parsed.version == 4:
+            self._v4.insert(int(parsed.network_address), parsed.prefixlen, rule)
+        elif parsed.subnet_of(IPV4_MAPPED):
+            # 射影範囲内のルールは下位32ビットをIPv4のプレフィックスとして扱う
+            self._v4.insert(int(parsed.network_address) & 0xFFFFFFFF, parsed.prefixlen - 96, rule)
+        else:
+            self._v6.insert(int(parsed.network_address), parsed.prefixlen, rule)
+            if parsed.supernet_of(IPV4_MAPPED):
+                self._mapped_cover = max(self._mapped_cover, (parsed.prefixlen, rule))
+        self.rule_count += 1
+
+    def is_allowed(self, ip: str) -> bool:
+        """
+        アドレスが許可されるか判定する（最長一致のルールを適用する）
+
+        Args:
+            ip: IPアドレス
+
+        Returns:
+            bool: 許可される場合True（アドレスとして解釈できない場合はFalse）
+        """
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            # IPv4射影アドレス（::ffff:a.b.c.d）はIPv4のルールで判定する
+            address = address.ipv4_mapped
+        if address.version == 4:
+            rule = self._v4.lookup(int(address))
+            if rule == NO_RULE:
+                rule = self._mapped_cover[1]
+        else:
+            rule = self._v6.lookup(int(address))
+        if rule == NO_RULE:
+            return self.default_allow
+        return rule == ALLOW
+
+
+def parse_rules(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    ルールファイルの内容を許可・拒否のCIDRに分ける
+
+    1行に「allow <CIDR>」または「deny <CIDR>」を書く。# 以降はコメント。
+
+    Args:
+        lines: ルールファイルの各行
+
+    Returns:
+        Tuple[List[str], List[str]]: 許可するCIDRと拒否するCIDR
+
+    Raises:
+        IPRuleError: 行の形式が不正な場合
+    """
+    allow: List[str] = []
+    deny: List[str] = []
+    for number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) != 2 or parts[0].lower() not in ("allow", "deny"):
+            raise IPRuleError(f"Line {number}: expected 'allow <cidr>' or 'deny <cidr>'")
+        (allow if parts[0].lower() == "allow" else deny).append(parts[1])
+    return allow, deny
+
+
+class IPFilter:
+    """再読み込み可能なIP許可・拒否リスト
+
+    新しいルールセットは別に構築してから参照を差し替えるため、
+    読み込み中も判定は古いルールセットで一貫して行われる。
+    ルールファイルは watch で変更を監視し、各ワーカーで読み直す。
+    """
+
+    def __init__(self, rules: Optional[IPRuleSet] = None, path: Optional[Path] = None):
+        """
+        初期化
+
+        Args:
+            rules: 初期のルールセット（省略時は DEFAULT_ALLOW のみ許可）
+            path: ルールファイルのパス（reload_file で読み込む）
+        """
+        self._rules = rules if rules is not None else IPRuleSet(allow=DEFAULT_ALLOW)
+        self.path = Path(path) if path else None
+        self.version = 0
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def rule_count(self) -> int:
+        """現在のルール数"""
+        return self._rules.rule_count
+
+    def is_allowed(self, ip: str) -> bool:
+        """
+        アドレスが許可されるか判定する
+
+        Args:
+            ip: IPアドレス
+
+        Returns:
+            bool: 許可される場合True
+        """
+        return self._rules.is_allowed(ip)
+
+    def reload(self, allow: Iterable[str] = (), deny: Iterable[str] = (), default_allow: bool = False) -> int:
+        """
+        ルールを置き換える
+
+        Args:
+            allow: 許可するCIDR
+            deny: 拒否するCIDR
+            default_allow: どのルールにも一致しない場合に許可するならTrue
+
+        Returns:
+            int: 読み込んだルール数
+
+        Raises:
+            IPRuleError: CIDRの形式が不正な場合（現在のルールは変更しない）
+        """
+        rules = IPRuleSet(allow, deny, default_allow=default_allow)
+        with self._lock:
+            self._rules = rules
+            self.version += 1
+        logger.info(f"Loaded {rules.rule_count} IP rules (version {self.version})")
+        return rules.rule_count
+
+    def reload_file(self, path: Optional[Path] = None, default_allow: Optional[bool] = None) -> bool:
+        """
+        ルールファイルを読み込んでルールを置き換える
+
+        Args:
+            path: ルールファイルのパス（省略時は初期化時のパス）
+            default_allow: どのルールにも一致しない場合に許可するならTrue（省略時は現在の設定）
+
+        Returns:
+            bool: 読み込みに成功した場合True（失敗時は現在のルールを維持する）
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            return False
+        if default_allow is None:
+            default_allow = self._rules.default_allow
+        try:
+            stat = path.stat()
+            # 不正な内容でも同じファイルを繰り返し読まないよう、先に記録する
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            with path.open(encoding="utf-8") as f:
+                allow, deny = parse_rules(f)
+            self.reload(allow, deny, default_allow=default_allow)
+        except (OSError, IPRuleError) as e:
+            logger.error(f"Failed to load IP rules from {path}: {str(e)}")
+            return False
+        self.path = path
+        return True
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """
+        ルールファイルの変更監視を開始する（ファイルから読み込む場合のみ）
+
+        Args:
+            interval: 監視間隔（秒）
+        """
+        if self.path is not None and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+
+    async def stop(self) -> None:
+        """ルールファイルの変更監視を停止する"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == self._stat:
+                continue
+            await asyncio.to_thread(self.reload_file)
+
+
+# シングルトンインスタンスの作成
+ip_filter = IPFilter(path=os.getenv(IP_RULES_FILE_ENV))
+if ip_filter.path is not None:
+    ip_filter.reload_file()
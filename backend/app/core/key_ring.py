@@ -0,0 +1,301 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, MultiFernet
+
+logger = logging.getLogger(__name__)
+
+# 鍵ファイルのパスを指定する環境変数
+KEY_RING_FILE_ENV = "KEY_RING_FILE"
+# 署名鍵を "kid:secret,kid:secret" の形式で指定する環境変数（先頭が署名に使う鍵）
+SIGNING_KEYS_ENV = "JWT_SIGNING_KEYS"
+# データ暗号化のFernetキーをカンマ区切りで指定する環境変数（先頭が暗号化に使う鍵）
+ENCRYPTION_KEYS_ENV = "DATA_ENCRYPTION_KEYS"
+# 単一の署名鍵を指定する従来の設定（AuthConfig.SECRET_KEY）
+SECRET_KEY_ENV = "SECRET_KEY"
+
+# 単一の鍵に付ける鍵ID
+DEFAULT_KID = "default"
+
+
+class KeyRingError(ValueError):
+    """鍵の設定が不正な場合の例外"""
+
+
+def derive_encryption_key(secret: str) -> bytes:
+    """署名鍵からFernetキーを導出する（単一の署名鍵で暗号化鍵を設定しない場合に使う）"""
+    digest = hashlib.sha256(b"key-ring:fernet:" + secret.encode()).digest()
+    return base64.urlsafe_b64encode(digest)
+
+
+class _KeyState:
+    """1バージョン分の鍵（差し替えは参照の付け替え1回で行う）"""
+
+    def __init__(self, active_kid: str, signing_keys: Dict[str, str], encryption_keys: List[bytes]):
+        if not signing_keys:
+            raise KeyRingError("At least one signing key is required")
+        if active_kid not in signing_keys:
+            raise KeyRingError(f"Active key {active_kid!r} is not in the signing keys")
+        for kid, secret in signing_keys.items():
+            if not kid or not isinstance(kid, str) or not secret or not isinstance(secret, str):
+                raise KeyRingError("Signing keys must be non-empty strings")
+
+        if not encryption_keys:
+            raise KeyRingError("At least one encryption key is required")
+        try:
+            self.fernet = MultiFernet([Fernet(key) for key in encryption_keys])
+        except (ValueError, TypeError) as e:
+            raise KeyRingError(f"Invalid encryption key: {str(e)}")
+
+        self.active_kid = active_kid
+        self.signing_keys = dict(signing_keys)
+        self.fingerprint = hashlib.sha256(
+            json.dumps([active_kid, sorted(signing_keys.items()), [key.decode() for key in encryption_keys]]).encode()
+        ).hexdigest()
+
+
+def parse_signing_keys(value: str) -> Tuple[str, Dict[str, str]]:
+    """
+    "kid:secret,kid:secret" 形式の署名鍵を解析する
+
+    Args:
+        value: 環境変数の値
+
+    Returns:
+        Tuple[str, Dict[str, str]]: 署名に使う鍵ID（先頭）と、鍵IDごとの鍵
+
+    Raises:
+        KeyRingError: 形式が不正な場合
+    """
+    keys: Dict[str, str] = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(","))):
+        kid, separator, secret = entry.partition(":")
+        if not separator or not kid or not secret:
+            raise KeyRingError(f"Expected 'kid:secret' in {SIGNING_KEYS_ENV}")
+        keys[kid] = secret
+    if not keys:
+        raise KeyRingError(f"{SIGNING_KEYS_ENV} is empty")
+    return next(iter(keys)), keys
+
+
+class KeyRing:
+    """鍵IDで管理するJWT署名鍵とデータ暗号化鍵
+
+    鍵は鍵ファイル（KEY_RING_FILE）または環境変数から読み込むため、
+    同じ設定の全ワーカー・再起動後のプロセスで同じトークンを検証できる。
+    署名には有効な鍵（active_kid）だけを使い、検証はトークンヘッダーの kid で鍵を選ぶ。
+    古い鍵を残したまま新しい鍵を有効にすることで、発行済みトークンを失効させずに
+    鍵をローテーションできる。
+
+    鍵ファイルの形式（JSON）:
+        {
+            "active_kid": "2024-06",
+            "signing_keys": {"2024-06": "...", "2024-03": "..."},
+            "encryption_keys": ["<Fernetキー>", ...]
+        }
+    暗号化鍵は署名鍵と独立にローテーションする。署名鍵から導出すると、古い署名鍵を
+    削除した時点でその鍵で暗号化したデータを復号できなくなるため、鍵ファイルと
+    JWT_SIGNING_KEYS では encryption_keys（DATA_ENCRYPTION_KEYS）を必須とする。
+    単一の SECRET_KEY の場合だけ、暗号化鍵を省略するとその鍵から導出する。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        初期化
+
+        Args:
+            path: 鍵ファイルのパス（省略時は環境変数から読み込む）
+        """
+        self.path = Path(path) if path else None
+        self.version = 0
+        self._state: Optional[_KeyState] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[["KeyRing"], Any]] = []
+
+    @property
+    def active_kid(self) -> str:
+        """署名に使う鍵ID"""
+        return self._current().active_kid
+
+    @property
+    def kids(self) -> List[str]:
+        """検証に使える鍵ID"""
+        return list(self._current().signing_keys)
+
+    @property
+    def fernet(self) -> MultiFernet:
+        """データ暗号化用のFernet（先頭の鍵で暗号化し、全ての鍵で復号する）"""
+        return self._current().fernet
+
+    def signing_key(self, kid: Optional[str]) -> Optional[str]:
+        """
+        鍵IDに対応する署名鍵を取得する
+
+        Args:
+            kid: トークンヘッダーの鍵ID
+
+        Returns:
+            Optional[str]: 署名鍵（未知の鍵IDの場合None）
+        """
+        if not kid:
+            return None
+        return self._current().signing_keys.get(kid)
+
+    def active_key(self) -> Tuple[str, str]:
+        """
+        署名に使う鍵を取得する
+
+        Returns:
+            Tuple[str, str]: 鍵IDと署名鍵
+        """
+        state = self._current()
+        return state.active_kid, state.signing_keys[state.active_kid]
+
+    def add_listener(self, listener: Callable[["KeyRing"], Any]) -> None:
+        """
+        鍵が変わった時に呼ばれる関数を登録する
+
+        Args:
+            listener: 鍵リングを受け取る関数
+        """
+        self._listeners.append(listener)
+
+    def load(self) -> bool:
+        """
+        鍵を読み込む
+
+        読み込みに失敗した場合は現在の鍵を維持する（初回のみ例外を送出する）。
+
+        Returns:
+            bool: 鍵が変わった場合True
+
+        Raises:
+            KeyRingError: 初回の読み込みで設定が不正な場合
+        """
+        try:
+            state = self._read()
+        except (OSError, KeyRingError) as e:
+            if self._state is None:
+                raise KeyRingError(f"Failed to load signing keys: {str(e)}")
+            logger.error(f"Failed to reload signing keys, keeping version {self.version}: {str(e)}")
+            return False
+
+        with self._lock:
+            if self._state is not None and state.fingerprint == self._state.fingerprint:
+                return False
+            self._state = state
+            self.version += 1
+        logger.info(f"Loaded {len(state.signing_keys)} signing keys (active kid {state.active_kid}, version {self.version})")
+
+        for listener in self._listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                logger.error(f"Key ring listener failed: {str(e)}")
+        return True
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """
+        鍵ファイルの変更監視を開始する（ファイルから読み込む場合のみ）
+
+        Args:
+            interval: 監視間隔（秒）
+        """
+        if self.path is not None and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+
+    async def stop(self) -> None:
+        """鍵ファイルの変更監視を停止する"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == self._stat:
+                continue
+            await asyncio.to_thread(self.load)
+
+    def _current(self) -> _KeyState:
+        state = self._state
+        if state is None:
+            # 初回だけ読み込む（並行に生成した鍵が食い違わないようロック内で行う）
+            with self._lock:
+                if self._state is None:
+                    self.load()
+                state = self._state
+        return state
+
+    def _read(self) -> _KeyState:
+        if self.path is not None:
+            stat = self.path.stat()
+            content = self.path.read_text(encoding="utf-8")
+            # 不正な内容でも同じファイルを繰り返し読まないよう、先に記録する
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            try:
+                raw = json.loads(content)
+            except ValueError as e:
+                raise KeyRingError(f"Invalid key file {self.path}: {str(e)}")
+            if not isinstance(raw, dict) or not isinstance(raw.get("signing_keys"), dict):
+                raise KeyRingError("Key file must contain a 'signing_keys' object")
+            signing_keys = raw["signing_keys"]
+            active_kid = raw.get("active_kid") or next(iter(signing_keys), "")
+            encryption_keys = raw.get("encryption_keys")
+            if not isinstance(encryption_keys, list) or not encryption_keys:
+                raise KeyRingError("Key file must contain a non-empty 'encryption_keys' list")
+            if not all(isinstance(key, str) for key in encryption_keys):
+                raise KeyRingError("Encryption keys must be strings")
+            return _KeyState(active_kid, signing_keys, [key.encode() for key in encryption_keys])
+
+        encryption_keys = [
+            key.strip().encode() for key in os.getenv(ENCRYPTION_KEYS_ENV, "").split(",") if key.strip()
+        ]
+        configured = os.getenv(SIGNING_KEYS_ENV)
+        if configured:
+            active_kid, signing_keys = parse_signing_keys(configured)
+            if not encryption_keys:
+                raise KeyRingError(f"{ENCRYPTION_KEYS_ENV} is required when {SIGNING_KEYS_ENV} is set")
+        elif os.getenv(SECRET_KEY_ENV):
+            active_kid, signing_keys = DEFAULT_KID, {DEFAULT_KID: os.environ[SECRET_KEY_ENV]}
+            if not encryption_keys:
+                logger.warning(
+                    f"{ENCRYPTION_KEYS_ENV} is not set; data encrypted with the key derived from "
+                    f"{SECRET_KEY_ENV} will not decrypt after {SECRET_KEY_ENV} changes"
+                )
+                encryption_keys = [derive_encryption_key(signing_keys[DEFAULT_KID])]
+        else:
+            if self._state is not None:
+                # 生成した鍵は再読み込みで作り直さない
+                return self._state
+            logger.warning(
+                f"No signing keys configured ({KEY_RING_FILE_ENV}, {SIGNING_KEYS_ENV} or {SECRET_KEY_ENV}); "
+                "tokens issued by this process will not validate in other workers or after a restart"
+            )
+            active_kid, signing_keys = DEFAULT_KID, {DEFAULT_KID: secrets.token_urlsafe(32)}
+            if not encryption_keys:
+                encryption_keys = [derive_encryption_key(signing_keys[DEFAULT_KID])]
+
+        return _KeyState(active_kid, signing_keys, encryption_keys)
+
+
+# シングルトンインスタンスの作成
+key_ring = KeyRing(path=os.getenv(KEY_RING_FILE_ENV))
@@ -1,16 +1,38 @@
 import asyncio
 import logging
-from typing import Optional, Callable, Dict, Any
-from mctools import RCONClient
+import time
+from typing import Optional, Callable, Dict, Any, List, Union
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+from app.core.effect_coalescer import CoalescerStats, EffectCoalescer
+from app.core.rcon_client import AsyncRCONClient, MCToolsRCONClient
+from app.core.rcon_pipeline import EffectCommandPipeline, EffectSendResult
+from app.core.rcon_pool import PoolMetrics, RCONConnectionPool
+
 logger = logging.getLogger(__name__)
 
+# 利用可能なRCONトランスポート
+RCON_TRANSPORTS = {
+    "asyncio": AsyncRCONClient,
+    "mctools": MCToolsRCONClient,
+}
+
 class MinecraftConnection:
     """マインクラフトサーバーとの接続を管理するクラス"""
     
-    def __init__(self, host: str, port: int, password: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        batch_window: float = 0.005,
+        max_batch_size: int = 100,
+        transport: str = "asyncio",
+        timeout: float = 5.0,
+        pool_size: int = 4,
+        coalesce_window: float = 0.02
+    ):
         """
         初期化
         
@@ -18,13 +40,33 @@ class MinecraftConnection:
             host: マインクラフトサーバーのホスト名
             port: RCONポート
             password: RCONパスワード
+            batch_window: エフェクトコマンドをまとめる待ち時間（秒）
+            max_batch_size: 1回のパイプライン送信で書き込む最大コマンド数
+            transport: RCONトランスポート（"asyncio" または フォールバックの "mctools"）
+            timeout: RCONレスポンス待ちのタイムアウト（秒）
+            pool_size: 並列に使うRCONセッション数
+            coalesce_window: 同じ内容のエフェクトを1コマンドにまとめる待ち時間（秒）
         """
+        if transport not in RCON_TRANSPORTS:
+            raise ValueError(f"Unknown RCON transport: {transport}")
+
         self.host = host
         self.port = port
         self.password = password
-        self.rcon_client: Optional[RCONClient] = None
+        self.transport = transport
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.rcon_pool: Optional[RCONConnectionPool] = None
         self.ws_connection = None
         self.event_handlers: Dict[str, Callable] = {}
+        self.pipeline = EffectCommandPipeline(
+            self._execute_commands,
+            window=batch_window,
+            max_batch=max_batch_size,
+            max_in_flight=pool_size
+        )
+        # 同じタイプのエフェクトはウィンドウ内で統合してからパイプラインへ渡す
+        self.coalescer = EffectCoalescer(self._send_coalesced, window=coalesce_window)
 
     async def connect(self) -> bool:
         """
@@ -34,10 +76,15 @@ class MinecraftConnection:
             bool: 接続成功の場合True
         """
         try:
-            self.rcon_client = RCONClient(self.host, self.port)
-            success = self.rcon_client.login(self.password)
+            self.rcon_pool = RCONConnectionPool(
+                self._create_client,
+                self.password,
+                size=self.pool_size,
+                acquire_timeout=self.timeout
+            )
+            connected = await self.rcon_pool.start()
             
-            if success:
+            if connected:
                 logger.info(f"Successfully connected to Minecraft server at {self.host}:{self.port}")
                 return True
             else:
@@ -58,19 +105,16 @@ class MinecraftConnection:
         Returns:
             bool: 送信成功の場合True
         """
-        if not self.rcon_client:
+        if not self.is_connected():
             logger.error("Not connected to server")
             return False
 
         try:
-            # エフェクトコマンドの構築
-            command = self._build_effect_command(effect_data)
-            
-            # コマンド実行
-            response = self.rcon_client.command(command)
+            # 同タイプのエフェクトと統合してからパイプライン経由でコマンド実行
+            response = await self.coalescer.submit(effect_data)
             
             if response:
-                logger.info(f"Successfully sent effect: {effect_data['name']}")
+                logger.info(f"Successfully sent effect: {effect_data.get('name', effect_data.get('id'))}")
                 return True
             return False
 
@@ -78,6 +122,132 @@ class MinecraftConnection:
             logger.error(f"Error sending effect: {str(e)}")
             return False
 
+    async def send_effects(self, batch: List[Dict[str, Any]]) -> List[EffectSendResult]:
+        """
+        複数のエフェクトをまとめてマインクラフトサーバーに送信
+        
+        Args:
+            batch: エフェクトデータのリスト
+            
+        Returns:
+            List[EffectSendResult]: エフェクトごとの送信結果（入力と同じ順序）
+        """
+        if not self.is_connected():
+            logger.error("Not connected to server")
+            return [
+                EffectSendResult(effect=effect_data, success=False, error="Not connected to server")
+                for effect_data in batch
+            ]
+
+        results: List[EffectSendResult] = []
+        responses = await self.coalescer.submit_many(batch)
+        for effect_data, response in zip(batch, responses):
+            if isinstance(response, Exception):
+                results.append(EffectSendResult(effect=effect_data, success=False, error=str(response)))
+            else:
+                results.append(EffectSendResult(
+                    effect=effect_data,
+                    success=bool(response),
+                    response=response
+                ))
+
+        sent = sum(1 for result in results if result.success)
+        logger.info(f"Sent effect batch: {sent}/{len(batch)} succeeded")
+        return results
+
+    async def _send_coalesced(self, effects: List[Dict[str, Any]]) -> List[Union[str, None, Exception]]:
+        """
+        統合済みのエフェクトをコマンドに変換してパイプラインへ渡す
+        
+        Args:
+            effects: 統合済みのエフェクトデータのリスト
+            
+        Returns:
+            List[Union[str, None, Exception]]: エフェクトごとのレスポンスまたは例外（入力と同じ順序）
+        """
+        results: List[Union[str, None, Exception]] = [None] * len(effects)
+        commands: List[str] = []
+        positions: List[int] = []
+        for index, effect_data in enumerate(effects):
+            try:
+                commands.append(self._build_effect_command(effect_data))
+                positions.append(index)
+            except Exception as e:
+                results[index] = e
+
+        responses = await self.pipeline.submit_many(commands)
+        for index, response in zip(positions, responses):
+            results[index] = response
+        return results
+
+    async def _execute_commands(self, commands: List[str]) -> List[Optional[str]]:
+        """
+        コマンド列をパイプラインで送信する
+        
+        全パケットを連続で書き込み、レスポンスをリクエストIDで振り分ける。
+        
+        Args:
+            commands: 送信するコマンドのリスト
+            
+        Returns:
+            List[Optional[str]]: コマンドごとのレスポンス（入力と同じ順序）
+        """
+        if not self.rcon_pool:
+            raise ConnectionError("Not connected to server")
+
+        return await self.rcon_pool.command_batch(commands, timeout=self.timeout)
+
+    def is_connected(self) -> bool:
+        """
+        利用可能なRCONセッションがあるか確認
+        
+        Returns:
+            bool: 1つ以上のセッションが接続中の場合True
+        """
+        return self.rcon_pool is not None and self.rcon_pool.has_live_sessions()
+
+    def pool_metrics(self) -> Optional[PoolMetrics]:
+        """
+        RCONコネクションプールのメトリクスを取得
+        
+        Returns:
+            Optional[PoolMetrics]: 未接続の場合None
+        """
+        return self.rcon_pool.metrics() if self.rcon_pool else None
+
+    def rcon_latency(self, max_age: float = 5.0) -> Optional[float]:
+        """
+        RCONコマンド送信の平均レイテンシを取得
+        
+        負荷制御で送信が止まっている間に古い値で判断し続けないよう、
+        最後の送信から max_age 秒を過ぎた値は使わない。
+        
+        Args:
+            max_age: 有効とみなす経過時間（秒）
+            
+        Returns:
+            Optional[float]: 秒（有効な計測値がない場合None）
+        """
+        stats = self.pipeline.stats
+        if not stats.batches_sent or time.monotonic() - stats.last_sent_at > max_age:
+            return None
+        return stats.avg_latency_ms / 1000
+
+    def coalescer_stats(self) -> CoalescerStats:
+        """
+        エフェクト統合の統計を取得
+        
+        Returns:
+            CoalescerStats: 送信数と統合で省略した数
+        """
+        return self.coalescer.stats
+
+    def _create_client(self) -> Union[AsyncRCONClient, MCToolsRCONClient]:
+        """
+        設定されたトランスポートでRCONクライアントを生成
+        """
+        return RCON_TRANSPORTS[self.transport](self.host, self.port, timeout=self.timeout)
+
     async def listen_events(self, event_callback: Callable):
         """
         マインクラフトサーバーからのイベントをリッスン
@@ -128,8 +298,11 @@ class MinecraftConnection:
 
     async def close(self):
         """接続のクリーンアップ"""
-        if self.rcon_client:
-            self.rcon_client.stop()
+        await self.coalescer.close()
+        await self.pipeline.close()
+
+        if self.rcon_pool:
+            await self.rcon_pool.close()
         
         if self.ws_connection:
             await self.ws_connection.close()
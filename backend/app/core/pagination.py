@@ -0,0 +1,182 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+
+# 1ページあたりの既定件数と上限
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """カーソルやフィールド指定が不正な場合の例外"""
+
+
+def encode_cursor(last_id: Any) -> str:
+    """
+    ページ末尾のIDをカーソル文字列に変換する
+
+    Args:
+        last_id: ページ内の最後の要素のID
+
+    Returns:
+        str: URLセーフなカーソル
+    """
+    raw = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(
+    cursor: Optional[str],
+    id_type: Tuple[Type, ...] = (int,)
+) -> Optional[Any]:
+    """
+    カーソル文字列からIDを取り出す
+
+    取り出した値はSQLの条件にそのまま使われるため、IDの型でなければ不正なカーソルとする。
+
+    Args:
+        cursor: encode_cursorが返したカーソル
+        id_type: IDとして受け付ける型
+
+    Returns:
+        Optional[Any]: このIDより後の要素を返すべきID（先頭ページの場合None）
+
+    Raises:
+        PaginationError: カーソルが不正な場合
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise PaginationError(f"Invalid cursor: {cursor}")
+    # bool は int のサブクラスのため明示的に除外する
+    if isinstance(after, bool) or not isinstance(after, id_type):
+        raise PaginationError(f"Invalid cursor: {cursor}")
+    return after
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    required: Sequence[str] = ("id",)
+) -> Optional[List[str]]:
+    """
+    fieldsクエリパラメータを検証する
+
+    Args:
+        fields: カンマ区切りのフィールド名
+        allowed: 指定可能なフィールド名
+        required: 常に含めるフィールド名（カーソルの生成に必要なもの）
+
+    Returns:
+        Optional[List[str]]: 返すフィールド名（未指定の場合None）
+
+    Raises:
+        PaginationError: 未知のフィールドが指定された場合
+    """
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys([*required, *requested]))
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """ページサイズを1〜MAX_PAGE_SIZEに収める"""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def project(item: Any, fields: Optional[Sequence[str]]) -> Any:
+    """
+    要素から指定フィールドだけを取り出す
+
+    Args:
+        item: 辞書またはオブジェクト
+        fields: 取り出すフィールド名（Noneの場合はそのまま返す）
+
+    Returns:
+        Any: 射影した辞書
+    """
+    if fields is None:
+        return item
+    if isinstance(item, dict):
+        return {name: item.get(name) for name in fields}
+    return {name: getattr(item, name, None) for name in fields}
+
+
+def build_page(
+    rows: List[Any],
+    limit: int,
+    fields: Optional[Sequence[str]] = None,
+    id_field: str = "id"
+) -> Dict[str, Any]:
+    """
+    limit+1件まで取得した結果からページを組み立てる
+
+    Args:
+        rows: ID順に並んだ最大limit+1件の要素
+        limit: ページサイズ
+        fields: 返すフィールド名
+        id_field: カーソルに使うフィールド名
+
+    Returns:
+        Dict[str, Any]: {"items": [...], "next_cursor": str | None}
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        last_id = last.get(id_field) if isinstance(last, dict) else getattr(last, id_field)
+        next_cursor = encode_cursor(last_id)
+    return {
+        "items": [project(item, fields) for item in items],
+        "next_cursor": next_cursor
+    }
+
+
+def fetch_page_rows(
+    query: Any,
+    id_column: Any,
+    after: Optional[Any],
+    limit: int,
+    columns: Optional[Sequence[Any]] = None
+) -> List[Any]:
+    """
+    キーセット方式で最大limit+1件を取得する
+
+    OFFSETを使わずIDの範囲条件で絞り込むため、後ろのページでも
+    コストは一定になる。
+
+    Args:
+        query: SQLAlchemyのクエリ
+        id_column: 並び順とカーソルに使う一意な列
+        after: このIDより後の行を返す
+        limit: ページサイズ
+        columns: 読み込む列（指定した場合は行を辞書で返す）
+
+    Returns:
+        List[Any]: ORMオブジェクトまたは辞書のリスト
+    """
+    if after is not None:
+        query = query.filter(id_column > after)
+    if columns:
+        query = query.with_entities(*columns)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if columns:
+        return [dict(row._mapping) for row in rows]
+    return rows
+
+
+def bad_request(error: PaginationError) -> HTTPException:
+    """PaginationErrorを400レスポンスに変換する"""
+    return HTTPException(status_code=400, detail=str(error))
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# bcryptのコストを指定する環境変数
+BCRYPT_ROUNDS_ENV = "BCRYPT_ROUNDS"
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+class PasswordHasherBusy(Exception):
+    """ハッシュ処理の待ち行列が満杯の場合の例外"""
+
+
+class PasswordHasherTimeout(Exception):
+    """ハッシュ処理が制限時間内に終わらなかった場合の例外"""
+
+
+@dataclass
+class HasherMetrics:
+    """ハッシュ処理プールの統計"""
+    workers: int
+    in_flight: int
+    max_pending: int
+    completed: int
+    rejected: int
+    timed_out: int
+
+    @property
+    def saturation(self) -> float:
+        """実行中＋待機中の処理数をワーカー数で割った値（1を超えると待ちが発生している）"""
+        return self.in_flight / self.workers
+
+
+def default_rounds() -> int:
+    """環境変数 BCRYPT_ROUNDS、なければ既定のコストを返す"""
+    return int(os.getenv(BCRYPT_ROUNDS_ENV, DEFAULT_BCRYPT_ROUNDS))
+
+
+class PasswordHasher:
+    """bcryptのハッシュ化と検証を専用のスレッドプールで実行する
+
+    bcryptは計算中にGILを解放するため、スレッドでも並列に実行でき
+    イベントループを止めない。同時に受け付ける処理数には上限を設け、
+    超えた分は待たせずに PasswordHasherBusy で拒否する。
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: int = 64,
+        timeout: Optional[float] = 5.0,
+        rounds: Optional[int] = None
+    ):
+        """
+        初期化
+
+        Args:
+            workers: ハッシュ処理を行うスレッド数（省略時はCPU数、最大8）
+            max_queue: ワーカーの空きを待てる処理数
+            timeout: 1回の処理の待ち時間の上限（秒）
+            rounds: bcryptのコスト（省略時は default_rounds()）
+        """
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_pending = self.workers + max_queue
+        self.timeout = timeout
+        self.rounds = rounds if rounds is not None else default_rounds()
+        # コストを上げた場合、古いコストのハッシュは needs_update で検出できる
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=self.rounds)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    async def hash(self, password: str) -> str:
+        """
+        パスワードをハッシュ化する
+
+        Args:
+            password: 平文のパスワード
+
+        Returns:
+            str: bcryptハッシュ
+
+        Raises:
+            PasswordHasherBusy: 待ち行列が満杯の場合
+            PasswordHasherTimeout: 制限時間内に終わらなかった場合
+        """
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """
+        パスワードを検証する
+
+        Args:
+            password: 平文のパスワード
+            hashed: 保存済みのハッシュ
+
+        Returns:
+            bool: 一致した場合True
+
+        Raises:
+            PasswordHasherBusy: 待ち行列が満杯の場合
+            PasswordHasherTimeout: 制限時間内に終わらなかった場合
+        """
+        return await self._run(self.context.verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワードを検証し、ハッシュのコストが古ければ新しいハッシュも返す
+
+        Args:
+            password: 平文のパスワード
+            hashed: 保存済みのハッシュ
+
+        Returns:
+            Tuple[bool, Optional[str]]: 一致したか、保存し直すべき新しいハッシュ
+
+        Raises:
+            PasswordHasherBusy: 待ち行列が満杯の場合
+            PasswordHasherTimeout: 制限時間内に終わらなかった場合
+        """
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        """ハッシュが現在のコストより弱い設定で作られているか判定する"""
+        return self.context.needs_update(hashed)
+
+    def metrics(self) -> HasherMetrics:
+        """
+        プールの統計を取得する
+
+        Returns:
+            HasherMetrics: 実行中の処理数や拒否数
+        """
+        with self._lock:
+            return HasherMetrics(
+                workers=self.workers,
+                in_flight=self._in_flight,
+                max_pending=self.max_pending,
+                completed=self._completed,
+                rejected=self._rejected,
+                timed_out=self._timed_out
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        スレッドプールを停止する
+
+        Args:
+            wait: 実行中の処理の完了を待つ場合True
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy(f"Password hashing queue is full ({self.max_pending})")
+            self._in_flight += 1
+
+        # 待ち行列の長さは呼び出し元の待機ではなくスレッド側の完了で減らす
+        future: Future = self._executor.submit(func, *args)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            logger.warning(f"Password hashing timed out after {self.timeout}s")
+            raise PasswordHasherTimeout(f"Password hashing timed out after {self.timeout}s")
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if not future.cancelled():
+                self._completed += 1
+
+
+# シングルトンインスタンスの作成
+password_hasher = PasswordHasher()
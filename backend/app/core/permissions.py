@@ -0,0 +1,285 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.token_cache import default_token_cache_ttl
+from app.core.ttl_cache import CacheStats, TTLCache
+from app.models.user import Permission, User
+
+logger = logging.getLogger(__name__)
+
+# 全ての権限を持つマスク（スーパーユーザー用。どのビットとのANDも0にならない）
+ALL_PERMISSIONS = -1
+
+# コミット前の権限変更を保持するセッション情報のキー
+_PENDING_KEY = "permission_changes"
+
+
+class PermissionBits:
+    """(resource, action) の組を整数のビット位置に対応付ける
+
+    新しい組は初めて使われた時点で次のビットを割り当てる。
+    割り当て済みのビットは変わらないため、コンパイル済みのマスクは使い続けられる。
+    """
+
+    def __init__(self):
+        self._bits: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def bit(self, resource: str, action: str) -> int:
+        """
+        組のビットを取得する（未登録なら割り当てる）
+
+        Args:
+            resource: リソース名（例: "effects"）
+            action: アクション（例: "read"）
+
+        Returns:
+            int: 1ビットだけ立った整数
+        """
+        key = (resource, action)
+        bit = self._bits.get(key)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(key)
+                if bit is None:
+                    bit = 1 << len(self._bits)
+                    self._bits[key] = bit
+        return bit
+
+    def compile(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """
+        組の集合をマスクに変換する
+
+        Args:
+            pairs: (resource, action) の組
+
+        Returns:
+            int: 各組のビットを立てたマスク
+        """
+        mask = 0
+        for resource, action in pairs:
+            mask |= self.bit(resource, action)
+        return mask
+
+
+class UserPermissions:
+    """ユーザー1人分のコンパイル済み権限"""
+
+    __slots__ = ("user_id", "mask")
+
+    def __init__(self, user_id: int, mask: int):
+        self.user_id = user_id
+        self.mask = mask
+
+    def allows(self, bit: int) -> bool:
+        """ビットの権限を持つか判定する"""
+        return bool(self.mask & bit)
+
+    def __repr__(self) -> str:
+        return f"UserPermissions(user_id={self.user_id}, mask={self.mask:#x})"
+
+
+class PermissionMatrix:
+    """ユーザーごとのコンパイル済み権限のキャッシュ
+
+    未読み込みのユーザーは初回のチェック時にデータベースから構築する。
+    このプロセスでの権限の追加はコミット時にビットを立てて反映し、削除・変更の場合は
+    コミット時に該当ユーザーのマスクだけを読み直す。
+    他のワーカーでの変更はここには届かないため、マスクはトークンの検証キャッシュと
+    同じ時間（環境変数 TOKEN_CACHE_TTL）で破棄して読み直す。取り消された権限が
+    他のワーカーで使える時間も、取り消されたトークンと同じだけになる。
+    """
+
+    def __init__(
+        self,
+        bits: PermissionBits,
+        session_factory: Optional[Callable[[], Session]] = None,
+        maxsize: int = 10000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        初期化
+
+        Args:
+            bits: (resource, action) とビットの対応表
+            session_factory: 未読み込みのユーザーを読み込むセッションの生成関数
+            maxsize: 保持するユーザー数の上限
+            ttl: マスクの最大保持時間（秒。省略時は環境変数 TOKEN_CACHE_TTL）
+            clock: UNIX時刻を返す関数
+        """
+        self.bits = bits
+        self.session_factory = session_factory
+        self._users: TTLCache[UserPermissions] = TTLCache(
+            maxsize=maxsize,
+            ttl=default_token_cache_ttl() if ttl is None else ttl,
+            clock=clock
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def ttl(self) -> float:
+        """マスクの最大保持時間（秒）"""
+        return self._users.ttl
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """キャッシュの統計"""
+        return self._users.stats
+
+    def get(self, user_id: int) -> Optional[UserPermissions]:
+        """
+        読み込み済みのユーザーの権限を取得する
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            Optional[UserPermissions]: 未読み込み・期限切れの場合None
+        """
+        return self._users.get(user_id)
+
+    def load(self, user_id: int) -> UserPermissions:
+        """
+        ユーザーの権限を取得する（未読み込みならデータベースから構築する）
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            UserPermissions: ユーザーの権限（存在しないユーザーは権限なし）
+        """
+        permissions = self._users.get(user_id)
+        if permissions is not None:
+            return permissions
+        pairs, is_superuser = self._read(user_id)
+        return self.set_user(user_id, pairs, is_superuser=is_superuser)
+
+    def set_user(
+        self,
+        user_id: int,
+        pairs: Iterable[Tuple[str, str]],
+        is_superuser: bool = False
+    ) -> UserPermissions:
+        """
+        読み込んだ権限からユーザーのマスクを構築する
+
+        データベースから読み直した値のため、保持期限もここから数え直す。
+
+        Args:
+            user_id: ユーザーID
+            pairs: ユーザーの (resource, action) の組
+            is_superuser: スーパーユーザーの場合True（全ての権限を持つ）
+
+        Returns:
+            UserPermissions: ユーザーの権限
+        """
+        mask = ALL_PERMISSIONS if is_superuser else self.bits.compile(pairs)
+        permissions = UserPermissions(user_id, mask)
+        with self._lock:
+            self._users.put(user_id, permissions)
+        return permissions
+
+    def grant(self, user_id: int, resource: str, action: str) -> None:
+        """
+        読み込み済みのユーザーに権限を追加する
+
+        保持期限は延ばさない（他のワーカーでの変更を読み直す時期を変えないため）。
+
+        Args:
+            user_id: ユーザーID
+            resource: リソース名
+            action: アクション
+        """
+        bit = self.bits.bit(resource, action)
+        with self._lock:
+            permissions = self._users.get(user_id)
+            if permissions is not None and permissions.mask != ALL_PERMISSIONS:
+                permissions.mask |= bit
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        ユーザーのマスクを作り直す
+
+        未読み込み・期限切れのユーザーは次のチェックで読み込まれるため何もしない。
+
+        Args:
+            user_id: ユーザーID
+        """
+        if self._users.get(user_id) is None:
+            return
+        pairs, is_superuser = self._read(user_id)
+        self.set_user(user_id, pairs, is_superuser=is_superuser)
+
+    def clear(self) -> None:
+        """全ユーザーの権限を破棄する"""
+        self._users.clear()
+
+    def _read(self, user_id: int) -> Tuple[List[Tuple[str, str]], bool]:
+        """ユーザーの権限の組とスーパーユーザーかどうかを読み込む"""
+        if self.session_factory is None:
+            raise RuntimeError("PermissionMatrix.session_factory is not configured")
+        with self.session_factory() as db:
+            is_superuser = db.query(User.is_superuser).filter(User.id == user_id).scalar()
+            pairs = db.query(Permission.resource, Permission.action).filter(Permission.user_id == user_id).all()
+        return [tuple(pair) for pair in pairs], bool(is_superuser)
+
+
+# シングルトンインスタンスの作成
+permission_bits = PermissionBits()
+permission_matrix = PermissionMatrix(permission_bits)
+
+
+def _record_change(session: Optional[Session], change: Tuple[str, int, str, str]) -> None:
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append(change)
+
+
+@event.listens_for(Permission, "after_insert")
+def _on_permission_insert(mapper, connection, target: Permission) -> None:
+    _record_change(object_session(target), ("grant", target.user_id, target.resource, target.action))
+
+
+@event.listens_for(Permission, "after_update")
+@event.listens_for(Permission, "after_delete")
+def _on_permission_change(mapper, connection, target: Permission) -> None:
+    _record_change(object_session(target), ("rebuild", target.user_id, target.resource, target.action))
+
+
+@event.listens_for(User, "after_update")
+def _on_user_update(mapper, connection, target: User) -> None:
+    # スーパーユーザー権限の付与・剥奪だけを反映する（パスワード更新などでは作り直さない）
+    if inspect(target).attrs.is_superuser.history.has_changes():
+        _record_change(object_session(target), ("rebuild", target.id, "", ""))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_permission_changes(session: Session) -> None:
+    changes: List[Tuple[str, int, str, str]] = session.info.pop(_PENDING_KEY, [])
+    rebuild = set()
+    for kind, user_id, resource, action in changes:
+        if kind == "grant":
+            permission_matrix.grant(user_id, resource, action)
+        else:
+            rebuild.add(user_id)
+    for user_id in rebuild:
+        try:
+            permission_matrix.invalidate(user_id)
+        except Exception as e:
+            logger.error(f"Failed to rebuild permissions for user {user_id}: {str(e)}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_permission_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,382 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# キャッシュファイルの形式が変わった場合に上げる
+CACHE_FORMAT = 2
+# キャッシュファイルを置くディレクトリを指定する環境変数（省略時はユーザーのキャッシュディレクトリ）
+PRESET_CACHE_DIR_ENV = "PRESET_CACHE_DIR"
+# キャッシュディレクトリの権限（所有者だけが読み書きできる）
+CACHE_DIR_MODE = 0o700
+
+
+def default_cache_dir() -> Path:
+    """
+    キャッシュファイルを置くディレクトリを決める
+
+    他のユーザーが書き込める共有の一時ディレクトリは使わず、
+    PRESET_CACHE_DIR、なければ XDG_CACHE_HOME（省略時は ~/.cache）の下に置く。
+
+    Returns:
+        Path: キャッシュディレクトリ
+    """
+    configured = os.getenv(PRESET_CACHE_DIR_ENV)
+    if configured:
+        return Path(configured)
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "magic-effects" / "preset-cache"
+
+
+def default_cache_path(path: Path) -> Path:
+    """
+    プリセットファイルに対応するキャッシュファイルのパスを決める
+
+    配置先が読み取り専用でも書き込めるよう、プリセットファイルの隣ではなく
+    default_cache_dir に置く。同名のファイルが衝突しないよう、
+    ファイル名に元のパスのハッシュを含める。
+
+    Args:
+        path: プリセットファイルのパス
+
+    Returns:
+        Path: キャッシュファイルのパス
+    """
+    path_hash = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()[:12]
+    return default_cache_dir() / f"{Path(path).name}.{path_hash}.cache"
+
+
+def ensure_private_dir(directory: Path) -> bool:
+    """
+    ディレクトリを所有者専用の権限で作成し、他のユーザーが書き込めないことを確認する
+
+    Args:
+        directory: ディレクトリ
+
+    Returns:
+        bool: このプロセスのユーザーだけが書き込める場合True
+    """
+    try:
+        directory.mkdir(mode=CACHE_DIR_MODE, parents=True, exist_ok=True)
+        stat = directory.stat()
+    except OSError as e:
+        logger.warning(f"Preset cache directory {directory} is not available: {str(e)}")
+        return False
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        logger.warning(f"Preset cache directory {directory} is owned by another user; not using it")
+        return False
+    if stat.st_mode & 0o022:
+        logger.warning(f"Preset cache directory {directory} is writable by other users; not using it")
+        return False
+    return True
+
+
+class _CatalogState:
+    """1バージョン分のカタログ内容（差し替えは参照の付け替え1回で行う）"""
+
+    def __init__(self, fields: Tuple[str, ...], rows: List[Tuple[Any, ...]], from_cache: bool = False):
+        self.fields = fields
+        self.rows = rows
+        self.from_cache = from_cache
+        self.by_name: Dict[str, int] = {}
+        self.by_type: Dict[str, List[int]] = {}
+        self.materialized: Dict[int, Any] = {}
+        if rows:
+            name_at = fields.index("name")
+            type_at = fields.index("type")
+            for index, row in enumerate(rows):
+                self.by_name[row[name_at]] = index
+                self.by_type.setdefault(row[type_at], []).append(index)
+
+
+class PresetCatalog(Generic[T]):
+    """バージョン管理・インデックス付きのプリセットカタログ
+
+    プリセットファイルとモデルのスキーマ（および schema_version）のSHA-256をキーに、
+    検証済みのプリセットを列名＋行配列のコンパクトな形式でキャッシュファイルに保存する。
+    内容が変わっていなければ起動時にファイル全体を検証せず、キャッシュから復元する。
+    名前・タイプのインデックスで検索し、モデルへの変換は初回参照時に1度だけ行う。
+    キャッシュから復元した行も変換時にモデルと validator で検証し直し、
+    通らない行は除外してキャッシュを破棄する。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model: Type[T],
+        cache_path: Optional[Path] = None,
+        validator: Optional[Callable[[T], bool]] = None,
+        schema_version: str = ""
+    ):
+        """
+        初期化
+
+        Args:
+            path: プリセットファイル（JSON配列）のパス
+            model: プリセットのpydanticモデル
+            cache_path: 検証済みプリセットのキャッシュファイル（省略時は default_cache_path）
+            validator: モデル検証後に追加で行う検証（Falseのプリセットは除外）
+            schema_version: モデルの検証規則や validator を変更した場合に変える値（キャッシュのキーに含める）
+        """
+        self.path = Path(path)
+        self.cache_path = Path(cache_path) if cache_path else default_cache_path(self.path)
+        self._model = model
+        self._validator = validator
+        self._fields = tuple(model.model_fields)
+        self.model_hash = self._model_hash(schema_version)
+
+        self.version = 0
+        self.content_hash: Optional[str] = None
+        self._state = _CatalogState((), [])
+        self._stat: Optional[Tuple[int, int]] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[["PresetCatalog[T]"], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._state.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._state.by_name
+
+    def load(self, force: bool = False) -> bool:
+        """
+        プリセットファイルを読み込む
+
+        内容のハッシュが現在のバージョンと同じ場合は何もしない。
+        キャッシュファイルのハッシュが一致する場合は検証を省略する。
+
+        Args:
+            force: ハッシュが同じでも読み込み直す場合True
+
+        Returns:
+            bool: カタログが更新された場合True
+        """
+        try:
+            stat = self.path.stat()
+            content = self.path.read_bytes()
+        except OSError as e:
+            logger.error(f"Failed to read preset file {self.path}: {str(e)}")
+            return False
+
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash == self.content_hash and not force:
+            return False
+
+        cached = None if force else self._read_cache(content_hash)
+        if cached is not None:
+            fields, rows = cached
+            logger.info(f"Loaded {len(rows)} presets from cache ({content_hash[:12]})")
+        else:
+            try:
+                fields, rows = self._validate(json.loads(content))
+            except (ValueError, TypeError) as e:
+                logger.error(f"Failed to load effect presets: {str(e)}")
+                return False
+            self._write_cache(content_hash, fields, rows)
+            logger.info(f"Validated {len(rows)} presets ({content_hash[:12]})")
+
+        self._swap(content_hash, fields, rows, from_cache=cached is not None)
+        return True
+
+    def get(self, name: str) -> Optional[T]:
+        """
+        名前でプリセットを取得する
+
+        Args:
+            name: プリセット名
+
+        Returns:
+            Optional[T]: プリセット
+        """
+        state = self._state
+        index = state.by_name.get(name)
+        return None if index is None else self._materialize(state, index)
+
+    def by_type(self, effect_type: str) -> List[T]:
+        """
+        タイプでプリセットを取得する
+
+        Args:
+            effect_type: エフェクトタイプ
+
+        Returns:
+            List[T]: 該当するプリセット（ファイル内の順序）
+        """
+        state = self._state
+        presets = (self._materialize(state, index) for index in state.by_type.get(effect_type, ()))
+        return [preset for preset in presets if preset is not None]
+
+    def all(self) -> List[T]:
+        """全プリセットを取得する"""
+        state = self._state
+        presets = (self._materialize(state, index) for index in range(len(state.rows)))
+        return [preset for preset in presets if preset is not None]
+
+    def names(self) -> List[str]:
+        """プリセット名の一覧を取得する"""
+        return list(self._state.by_name)
+
+    def types(self) -> List[str]:
+        """プリセットに含まれるエフェクトタイプの一覧を取得する"""
+        return list(self._state.by_type)
+
+    def on_reload(self, listener: Callable[["PresetCatalog[T]"], Any]) -> None:
+        """
+        ホットリロード時に呼び出す関数を登録する
+
+        Args:
+            listener: カタログを受け取る関数（コルーチン関数も可）
+        """
+        self._listeners.append(listener)
+
+    async def watch(self, interval: float = 1.0) -> None:
+        """
+        ファイルの変更監視を開始する
+
+        更新時刻とサイズをポーリングし、変化があった場合だけ内容を読み直す。
+
+        Args:
+            interval: 監視間隔（秒）
+        """
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+
+    async def stop(self) -> None:
+        """ファイルの変更監視を停止する"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == self._stat:
+                continue
+            # 読み込みとJSONの検証はイベントループを止めないようスレッドで行う
+            if not await asyncio.to_thread(self.load):
+                continue
+            logger.info(f"Preset catalog reloaded: version {self.version}")
+            for listener in self._listeners:
+                try:
+                    result = listener(self)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Preset reload listener failed: {str(e)}")
+
+    def _validate(self, raw: Any) -> Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]:
+        if not isinstance(raw, list):
+            raise ValueError("Preset file must contain a JSON array")
+
+        fields = self._fields
+        rows: List[Tuple[Any, ...]] = []
+        for entry in raw:
+            try:
+                preset = self._model.model_validate(entry)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Skipping invalid preset {entry.get('name') if isinstance(entry, dict) else entry}: {str(e)}")
+                continue
+            if self._validator is not None and not self._validator(preset):
+                logger.warning(f"Skipping preset that failed validation: {getattr(preset, 'name', preset)}")
+                continue
+            rows.append(tuple(preset.model_dump(mode="json")[name] for name in fields))
+        return fields, rows
+
+    def _swap(
+        self,
+        content_hash: str,
+        fields: Tuple[str, ...],
+        rows: List[Tuple[Any, ...]],
+        from_cache: bool = False
+    ) -> None:
+        # 新しい内容を組み立ててから参照を付け替えるため、読み込み中の検索は旧バージョンを返す
+        self._state = _CatalogState(fields, rows, from_cache=from_cache)
+        self.content_hash = content_hash
+        self.version += 1
+
+    def _materialize(self, state: _CatalogState, index: int) -> Optional[T]:
+        if index in state.materialized:
+            return state.materialized[index]
+        values = dict(zip(state.fields, state.rows[index]))
+        try:
+            # キャッシュファイルの内容は信頼せず、モデルと validator で検証してから使う
+            preset = self._model.model_validate(values)
+            if self._validator is not None and not self._validator(preset):
+                raise ValueError("failed validation")
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Dropping cached preset {values.get('name')!r} that no longer validates: {str(e)}")
+            preset = None
+            if state.from_cache:
+                self._discard_cache()
+        state.materialized[index] = preset
+        return preset
+
+    def _model_hash(self, schema_version: str) -> str:
+        """モデルのスキーマと schema_version のハッシュ（検証規則の変更でキャッシュを無効にする）"""
+        try:
+            schema: Any = self._model.model_json_schema()
+        except (TypeError, ValueError):
+            schema = list(self._fields)
+        identity = {
+            "model": f"{self._model.__module__}.{self._model.__qualname__}",
+            "schema": schema,
+            "version": schema_version
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _read_cache(self, content_hash: str) -> Optional[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]]:
+        if not ensure_private_dir(self.cache_path.parent):
+            return None
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict):
+            return None
+        fields = tuple(cache.get("fields", ()))
+        rows = cache.get("rows")
+        if (
+            cache.get("format") != CACHE_FORMAT
+            or cache.get("hash") != content_hash
+            or cache.get("model") != self.model_hash
+            or fields != self._fields
+            or not isinstance(rows, list)
+            or not all(isinstance(row, list) and len(row) == len(fields) for row in rows)
+        ):
+            return None
+        return fields, [tuple(row) for row in rows]
+
+    def _discard_cache(self) -> None:
+        try:
+            self.cache_path.unlink()
+        except OSError:
+            pass
+
+    def _write_cache(self, content_hash: str, fields: Tuple[str, ...], rows: List[Tuple[Any, ...]]) -> None:
+        if not ensure_private_dir(self.cache_path.parent):
+            return
+        cache = {"format": CACHE_FORMAT, "hash": content_hash, "model": self.model_hash, "fields": fields, "rows": rows}
+        temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(cache, f, separators=(",", ":"))
+            os.replace(temp_path, self.cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write preset cache {self.cache_path}: {str(e)}")
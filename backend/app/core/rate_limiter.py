@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 判定に使うバケット（キーと制限値）の列
+Buckets = Sequence[Tuple[str, "RateLimit"]]
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """トークンバケットの設定"""
+    rate: float
+    burst: float
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.burst <= 0:
+            raise ValueError("rate and burst must be positive")
+
+
+# スコープごとの既定の制限（rate: 1秒あたりの補充数, burst: バケット容量）
+DEFAULT_LIMITS: Dict[str, RateLimit] = {
+    "user": RateLimit(rate=10.0, burst=20.0),
+    "api_key": RateLimit(rate=50.0, burst=100.0),
+    "effect_type": RateLimit(rate=100.0, burst=200.0),
+}
+
+
+class RateLimitExceeded(Exception):
+    """レート制限または負荷制御でリクエストを受け付けなかった場合の例外"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {scope}, retry after {retry_after:.2f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class RateLimitBackend(ABC):
+    """トークンバケットの状態を保持するバックエンド"""
+
+    @abstractmethod
+    async def acquire(self, buckets: Buckets, cost: float = 1.0) -> Tuple[float, Optional[int]]:
+        """
+        全バケットからトークンを取得する
+
+        1つでも不足していればどのバケットも消費しない。
+
+        Args:
+            buckets: 判定するバケット
+            cost: 消費するトークン数
+
+        Returns:
+            Tuple[float, Optional[int]]: 再試行までの秒数（許可の場合0）と、不足したバケットの位置
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """プロセス内のトークンバケット
+
+    判定は await を挟まずに完了するため、イベントループ上ではロックなしで
+    原子的に動作する。共有バックエンドと同じ判定を行うため、
+    開発環境や単一プロセス構成では共有バックエンドの代わりに使える。
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        """
+        初期化
+
+        Args:
+            max_keys: 保持するバケット数の目安（超えた場合は満タンのバケットを捨てる）
+            clock: 単調増加する時刻を返す関数
+        """
+        self.max_keys = max_keys
+        self._clock = clock
+        # キー -> [残りトークン, 最終更新時刻, 補充レート, 容量]
+        self._buckets: Dict[str, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def acquire(self, buckets: Buckets, cost: float = 1.0) -> Tuple[float, Optional[int]]:
+        return self.acquire_nowait(buckets, cost)
+
+    def acquire_nowait(self, buckets: Buckets, cost: float = 1.0) -> Tuple[float, Optional[int]]:
+        """acquire の同期版"""
+        now = self._clock()
+        states: List[Tuple[List[float], float]] = []
+        wait = 0.0
+        blocked: Optional[int] = None
+        for index, (key, limit) in enumerate(buckets):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [limit.burst, now, limit.rate, limit.burst]
+                self._buckets[key] = bucket
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            states.append((bucket, tokens))
+            if tokens < cost:
+                needed = (cost - tokens) / limit.rate
+                if needed > wait:
+                    wait, blocked = needed, index
+        if blocked is not None:
+            return wait, blocked
+
+        for (_, limit), (bucket, tokens) in zip(buckets, states):
+            bucket[0] = tokens - cost
+            bucket[1] = now
+            bucket[2] = limit.rate
+            bucket[3] = limit.burst
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return 0.0, None
+
+    def _prune(self, now: float) -> None:
+        # 満タンまで回復したバケットは初期状態と同じなので削除してよい
+        full = [
+            key for key, (tokens, stamp, rate, burst) in self._buckets.items()
+            if tokens + (now - stamp) * rate >= burst
+        ]
+        for key in full:
+            del self._buckets[key]
+        logger.debug(f"Pruned {len(full)} idle rate limit buckets")
+
+
+# 全バケットを1回の往復で判定・消費するスクリプト（時刻はRedisサーバーのものを使う）
+_REDIS_TOKEN_BUCKET = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local tokens = {}
+local wait = 0
+local blocked = 0
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', KEYS[i], 't', 's')
+    local available = tonumber(state[1]) or burst
+    local stamp = tonumber(state[2]) or now
+    available = math.min(burst, available + math.max(0, now - stamp) * rate)
+    tokens[i] = available
+    if available < cost and (cost - available) / rate > wait then
+        wait = (cost - available) / rate
+        blocked = i
+    end
+end
+if blocked > 0 then
+    return {tostring(wait), blocked}
+end
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', KEYS[i], 't', tostring(tokens[i] - cost), 's', tostring(now))
+    redis.call('PEXPIRE', KEYS[i], math.ceil(burst / rate * 1000) + 1000)
+end
+return {'0', 0}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Redisで複数プロセス間のトークンバケットを共有するバックエンド
+
+    判定はLuaスクリプトでサーバー側で原子的に行う。
+    バケットは満タンに戻る時間が過ぎると自動的に期限切れになる。
+    """
+
+    def __init__(self, client: Any):
+        """
+        初期化
+
+        Args:
+            client: redis.asyncio.Redis のクライアント
+        """
+        self._client = client
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, buckets: Buckets, cost: float = 1.0) -> Tuple[float, Optional[int]]:
+        keys = [key for key, _ in buckets]
+        args: List[Any] = [cost]
+        for _, limit in buckets:
+            args.extend((limit.rate, limit.burst))
+        wait, blocked = await self._script(keys=keys, args=args)
+        blocked = int(blocked)
+        return float(wait), (blocked - 1 if blocked else None)
+
+
+class RateLimiter:
+    """スコープ（ユーザー・APIキー・エフェクトタイプ等）ごとのレート制限"""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        prefix: str = "ratelimit"
+    ):
+        """
+        初期化
+
+        Args:
+            limits: スコープ名 -> 制限値（省略時は DEFAULT_LIMITS）
+            backend: バケットの保存先（省略時はプロセス内）
+            prefix: バケットのキーの接頭辞
+        """
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self.prefix = prefix
+
+    async def check(self, cost: float = 1.0, **identities: Optional[str]) -> None:
+        """
+        指定されたスコープの全バケットからトークンを取得する
+
+        Args:
+            cost: 消費するトークン数
+            identities: スコープ名 -> 識別子（Noneや制限のないスコープは判定しない）
+
+        Raises:
+            RateLimitExceeded: いずれかのバケットのトークンが不足している場合
+        """
+        scopes: List[str] = []
+        buckets: List[Tuple[str, RateLimit]] = []
+        for scope, identity in identities.items():
+            limit = self.limits.get(scope)
+            if identity is None or limit is None:
+                continue
+            scopes.append(scope)
+            buckets.append((f"{self.prefix}:{scope}:{identity}", limit))
+        if not buckets:
+            return
+
+        wait, blocked = await self.backend.acquire(buckets, cost)
+        if blocked is not None:
+            raise RateLimitExceeded(scopes[blocked], wait)
+
+
+class AdmissionController:
+    """システム全体の負荷に応じてリクエストを間引く
+
+    イベントキューの長さかRCONのレイテンシが閾値を超えている間は、
+    レート制限の残りに関係なく新しいリクエストを拒否する。
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: int = 8000,
+        max_latency: float = 0.5,
+        retry_after: float = 1.0,
+        queue_depth: Optional[Callable[[], int]] = None,
+        latency: Optional[Callable[[], Optional[float]]] = None
+    ):
+        """
+        初期化
+
+        Args:
+            max_queue_depth: 受け付けを止めるイベントキューの長さ
+            max_latency: 受け付けを止めるRCONのレイテンシ（秒）
+            retry_after: 拒否したクライアントに返す再試行までの秒数
+            queue_depth: 現在のイベントキューの長さを返す関数
+            latency: 現在のRCONレイテンシ（秒）を返す関数
+        """
+        self.max_queue_depth = max_queue_depth
+        self.max_latency = max_latency
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+        self.latency = latency
+        self.shed = 0
+
+    def check(self) -> None:
+        """
+        負荷が閾値を超えていないか確認する
+
+        Raises:
+            RateLimitExceeded: 負荷が閾値を超えている場合
+        """
+        if self.queue_depth is not None and self.queue_depth() >= self.max_queue_depth:
+            self.shed += 1
+            raise RateLimitExceeded("event_queue", self.retry_after)
+        if self.latency is not None:
+            latency = self.latency()
+            if latency is not None and latency >= self.max_latency:
+                self.shed += 1
+                raise RateLimitExceeded("rcon_latency", self.retry_after)
+
+
+@dataclass
+class AdmissionMetrics:
+    """エフェクト発動の受け付け統計"""
+    admitted: int = 0
+    rejected: Dict[str, int] = field(default_factory=dict)
+
+
+class EffectAdmission:
+    """エフェクト発動の受け付け判定（負荷制御＋スコープごとのレート制限）"""
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        controller: Optional[AdmissionController] = None
+    ):
+        """
+        初期化
+
+        Args:
+            limiter: スコープごとのレート制限
+            controller: システム全体の負荷制御
+        """
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.controller = controller if controller is not None else AdmissionController()
+        self.metrics = AdmissionMetrics()
+
+    async def admit(
+        self,
+        effect_type: str,
+        user: Optional[str] = None,
+        api_key: Optional[str] = None
+    ) -> None:
+        """
+        エフェクトの発動を受け付けるか判定する
+
+        負荷制御を先に判定し、過負荷の間はトークンを消費しない。
+
+        Args:
+            effect_type: エフェクトタイプ
+            user: ユーザーの識別子
+            api_key: APIキー（バケットのキーにはハッシュを使う）
+
+        Raises:
+            RateLimitExceeded: 受け付けない場合
+        """
+        try:
+            self.controller.check()
+            await self.limiter.check(
+                user=user,
+                api_key=hashlib.sha256(api_key.encode()).hexdigest()[:32] if api_key else None,
+                effect_type=effect_type
+            )
+        except RateLimitExceeded as e:
+            self.metrics.rejected[e.scope] = self.metrics.rejected.get(e.scope, 0) + 1
+            logger.debug(f"Rejected effect {effect_type}: {str(e)}")
+            raise
+        self.metrics.admitted += 1
+
+
+# シングルトンインスタンスの作成
+effect_admission = EffectAdmission()
@@ -0,0 +1,404 @@
+import asyncio
+import itertools
+import logging
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# RCONパケットタイプ
+SERVERDATA_RESPONSE_VALUE = 0
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_AUTH = 3
+
+# RCONのリクエストIDは符号付き32bit
+MAX_REQUEST_ID = 2 ** 31 - 1
+# サーバーが受け付けるパケットの最大長
+MAX_PACKET_LENGTH = 4096 + 10
+# 認証失敗時にサーバーが返すリクエストID
+AUTH_FAILED_ID = -1
+
+_HEADER = struct.Struct("<iii")
+
+
+class RCONError(Exception):
+    """RCON通信の基底例外"""
+
+
+class RCONAuthenticationError(RCONError):
+    """RCON認証に失敗した場合の例外"""
+
+
+class RCONTimeoutError(RCONError):
+    """RCONレスポンスがタイムアウトした場合の例外"""
+
+
+@dataclass
+class RCONPacket:
+    """RCONパケット"""
+    request_id: int
+    packet_type: int
+    payload: str
+
+    def encode(self) -> bytes:
+        """
+        パケットをバイト列に変換する
+
+        Returns:
+            bytes: 長さプレフィックス付きのパケット
+        """
+        body = self.payload.encode("utf-8") + b"\x00\x00"
+        return _HEADER.pack(len(body) + 8, self.request_id, self.packet_type) + body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "RCONPacket":
+        """
+        長さプレフィックスを除いたバイト列からパケットを復元する
+
+        Args:
+            data: リクエストID以降のバイト列
+
+        Returns:
+            RCONPacket: 復元されたパケット
+        """
+        request_id, packet_type = struct.unpack_from("<ii", data)
+        payload = data[8:].rstrip(b"\x00").decode("utf-8", errors="replace")
+        return cls(request_id, packet_type, payload)
+
+
+class _RequestIdAllocator:
+    """RCONリクエストIDを循環して払い出す"""
+
+    def __init__(self):
+        self._counter = itertools.count(1)
+
+    def next(self) -> int:
+        request_id = next(self._counter)
+        if request_id >= MAX_REQUEST_ID:
+            self._counter = itertools.count(1)
+            request_id = next(self._counter)
+        return request_id
+
+
+class AsyncRCONClient:
+    """asyncioネイティブのRCONクライアント
+
+    mctools.RCONClientと同じ操作（login / command / stop）を非同期で提供する。
+    受信は専用のリーダータスクが行い、レスポンスをリクエストIDで
+    待機中の呼び出しへ振り分けるため、複数のコマンドを同時に送信できる。
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        """
+        初期化
+
+        Args:
+            host: マインクラフトサーバーのホスト名
+            port: RCONポート
+            timeout: 接続・レスポンス待ちのデフォルトタイムアウト（秒）
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._request_ids = _RequestIdAllocator()
+        self._authenticated = False
+        # 受信途中のレスポンス断片
+        self._fragments: Dict[int, List[str]] = {}
+        # 終端パケットのID -> (待機Future, 対象コマンドのIDリスト)
+        self._sentinels: Dict[int, Tuple[asyncio.Future, List[int]]] = {}
+        # 認証リクエストのID -> 待機Future
+        self._auth_waiters: Dict[int, asyncio.Future] = {}
+
+    def is_connected(self) -> bool:
+        """ソケットが開いている場合True"""
+        return self._writer is not None and not self._writer.is_closing()
+
+    def is_authenticated(self) -> bool:
+        """認証済みの場合True"""
+        return self.is_connected() and self._authenticated
+
+    async def start(self) -> None:
+        """サーバーへのTCP接続を開く"""
+        if self.is_connected():
+            return
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout=self.timeout
+        )
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def login(self, password: str) -> bool:
+        """
+        RCON認証を行う
+
+        Args:
+            password: RCONパスワード
+
+        Returns:
+            bool: 認証成功の場合True
+        """
+        await self.start()
+        request_id = self._request_ids.next()
+        future = asyncio.get_running_loop().create_future()
+        self._auth_waiters[request_id] = future
+        try:
+            await self._write([RCONPacket(request_id, SERVERDATA_AUTH, password)])
+            self._authenticated = await self._wait(future, self.timeout)
+        finally:
+            self._auth_waiters.pop(request_id, None)
+        return self._authenticated
+
+    async def command(self, command: str, timeout: Optional[float] = None) -> str:
+        """
+        コマンドを実行する
+
+        Args:
+            command: 実行するコマンド
+            timeout: レスポンス待ちのタイムアウト（秒）
+
+        Returns:
+            str: サーバーからのレスポンス
+        """
+        responses = await self.command_batch([command], timeout=timeout)
+        return responses[0] or ""
+
+    async def command_batch(
+        self,
+        commands: List[str],
+        timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """
+        複数のコマンドを連続で書き込み、まとめてレスポンスを受け取る
+
+        全パケットの後に終端用のパケットを1つ送り、その応答が届いた時点で
+        各コマンドのレスポンスが揃ったとみなす。
+
+        Args:
+            commands: 実行するコマンドのリスト
+            timeout: レスポンス待ちのタイムアウト（秒）
+
+        Returns:
+            List[Optional[str]]: コマンドごとのレスポンス（入力と同じ順序）
+        """
+        if not self.is_authenticated():
+            raise RCONError("Not authenticated")
+
+        request_ids = [self._request_ids.next() for _ in commands]
+        sentinel_id = self._request_ids.next()
+        future = asyncio.get_running_loop().create_future()
+        for request_id in request_ids:
+            self._fragments[request_id] = []
+        self._sentinels[sentinel_id] = (future, request_ids)
+
+        packets = [
+            RCONPacket(request_id, SERVERDATA_EXECCOMMAND, command)
+            for request_id, command in zip(request_ids, commands)
+        ]
+        packets.append(RCONPacket(sentinel_id, SERVERDATA_RESPONSE_VALUE, ""))
+        try:
+            await self._write(packets)
+            return await self._wait(future, timeout if timeout is not None else self.timeout)
+        finally:
+            # タイムアウト・キャンセル時に遅れて届いたレスポンスは破棄する
+            self._sentinels.pop(sentinel_id, None)
+            for request_id in request_ids:
+                self._fragments.pop(request_id, None)
+
+    async def stop(self) -> None:
+        """接続を閉じる"""
+        self._authenticated = False
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_pending(RCONError("Connection closed"))
+
+    async def _write(self, packets: List[RCONPacket]) -> None:
+        if not self.is_connected():
+            raise RCONError("Not connected")
+        self._writer.write(b"".join(packet.encode() for packet in packets))
+        await self._writer.drain()
+
+    async def _wait(self, future: asyncio.Future, timeout: float):
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise RCONTimeoutError(f"No response from {self.host}:{self.port} within {timeout}s")
+
+    async def _read_loop(self) -> None:
+        """受信したパケットを待機中のリクエストへ振り分ける"""
+        try:
+            while True:
+                length_data = await self._reader.readexactly(4)
+                (length,) = struct.unpack("<i", length_data)
+                if length < 10 or length > MAX_PACKET_LENGTH:
+                    raise RCONError(f"Invalid packet length: {length}")
+                packet = RCONPacket.decode(await self._reader.readexactly(length))
+                self._dispatch(packet)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError:
+            logger.warning(f"RCON connection to {self.host}:{self.port} closed by server")
+            self._fail_pending(RCONError("Connection closed by server"))
+        except Exception as e:
+            logger.error(f"RCON read error: {str(e)}")
+            self._fail_pending(RCONError(str(e)))
+        finally:
+            self._authenticated = False
+            if self._writer and not self._writer.is_closing():
+                self._writer.close()
+
+    def _dispatch(self, packet: RCONPacket) -> None:
+        if packet.packet_type == SERVERDATA_AUTH_RESPONSE and self._auth_waiters:
+            if packet.request_id == AUTH_FAILED_ID:
+                for future in self._auth_waiters.values():
+                    if not future.done():
+                        future.set_result(False)
+                return
+            future = self._auth_waiters.get(packet.request_id)
+            if future and not future.done():
+                future.set_result(True)
+                return
+
+        if packet.request_id in self._fragments:
+            self._fragments[packet.request_id].append(packet.payload)
+            return
+
+        waiter = self._sentinels.get(packet.request_id)
+        if waiter:
+            future, request_ids = waiter
+            if not future.done():
+                future.set_result([
+                    "".join(self._fragments.get(request_id, [])) or None
+                    for request_id in request_ids
+                ])
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._auth_waiters.values():
+            if not future.done():
+                future.set_exception(error)
+        for future, _ in self._sentinels.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class MCToolsRCONClient:
+    """mctools.RCONClientを非同期インターフェースで包むフォールバック実装
+
+    ブロッキングI/Oはスレッドプール上で実行し、イベントループを止めない。
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        """
+        初期化
+
+        Args:
+            host: マインクラフトサーバーのホスト名
+            port: RCONポート
+            timeout: ソケットのタイムアウト（秒）
+        """
+        from mctools import RCONClient
+
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._client = RCONClient(host, port, timeout=timeout)
+        self._request_ids = _RequestIdAllocator()
+        # mctoolsのソケットは同時に1リクエストしか扱えない
+        self._lock = asyncio.Lock()
+
+    def is_connected(self) -> bool:
+        """ソケットが開いている場合True"""
+        return self._client.is_connected()
+
+    def is_authenticated(self) -> bool:
+        """認証済みの場合True"""
+        return self._client.is_authenticated()
+
+    async def login(self, password: str) -> bool:
+        """
+        RCON認証を行う
+
+        Args:
+            password: RCONパスワード
+
+        Returns:
+            bool: 認証成功の場合True
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._client.login, password)
+
+    async def command(self, command: str, timeout: Optional[float] = None) -> str:
+        """
+        コマンドを実行する
+
+        Args:
+            command: 実行するコマンド
+            timeout: 未使用（ソケットのタイムアウトが適用される）
+
+        Returns:
+            str: サーバーからのレスポンス
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._client.command, command)
+
+    async def command_batch(
+        self,
+        commands: List[str],
+        timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """
+        複数のコマンドを連続で書き込み、まとめてレスポンスを受け取る
+
+        Args:
+            commands: 実行するコマンドのリスト
+            timeout: 未使用（ソケットのタイムアウトが適用される）
+
+        Returns:
+            List[Optional[str]]: コマンドごとのレスポンス（入力と同じ順序）
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._command_batch_sync, commands)
+
+    async def stop(self) -> None:
+        """接続を閉じる"""
+        async with self._lock:
+            await asyncio.to_thread(self._client.stop)
+
+    def _command_batch_sync(self, commands: List[str]) -> List[Optional[str]]:
+        from mctools.packet import RCONPacket as MCToolsPacket
+
+        proto = self._client.proto
+        request_ids = [self._request_ids.next() for _ in commands]
+        for request_id, command in zip(request_ids, commands):
+            proto.send(MCToolsPacket(request_id, SERVERDATA_EXECCOMMAND, command))
+
+        sentinel_id = self._request_ids.next()
+        proto.send(MCToolsPacket(sentinel_id, SERVERDATA_RESPONSE_VALUE, ""))
+
+        fragments: Dict[int, List[str]] = {request_id: [] for request_id in request_ids}
+        while True:
+            packet = proto.read()
+            if packet.reqid == sentinel_id:
+                break
+            if packet.reqid in fragments:
+                fragments[packet.reqid].append(packet.payload)
+            elif packet.reqid == AUTH_FAILED_ID:
+                raise RCONAuthenticationError("RCON authentication is no longer valid")
+
+        return ["".join(fragments[request_id]) or None for request_id in request_ids]
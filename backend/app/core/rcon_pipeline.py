@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# バッチ送信時間の移動平均の重み
+LATENCY_SMOOTHING = 0.2
+
+# コマンド列を受け取り、各コマンドのレスポンスを同じ順序で返す実行関数
+CommandExecutor = Callable[[List[str]], Awaitable[List[Optional[str]]]]
+
+
+@dataclass
+class EffectSendResult:
+    """エフェクト1件ごとの送信結果"""
+    effect: Dict[str, Any]
+    success: bool
+    response: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineStats:
+    """パイプラインの送信統計"""
+    batches_sent: int = 0
+    commands_sent: int = 0
+    commands_failed: int = 0
+    largest_batch: int = 0
+    # バッチ送信にかかった時間の指数移動平均（ミリ秒）
+    avg_latency_ms: float = 0.0
+    # 最後にバッチを送信し終えた時刻（time.monotonic）
+    last_sent_at: float = 0.0
+
+
+@dataclass
+class _PendingCommand:
+    command: str
+    future: asyncio.Future = field(repr=False)
+
+
+class EffectCommandPipeline:
+    """RCONコマンドをまとめて送信するパイプライン
+
+    短いウィンドウの間に投入されたコマンドを1つのバッチにまとめ、
+    実行関数へ一括で渡す。実行関数は複数のRCONパケットを連続で書き込み、
+    レスポンスをリクエストIDで対応付ける想定。
+    """
+
+    def __init__(
+        self,
+        executor: CommandExecutor,
+        window: float = 0.005,
+        max_batch: int = 100,
+        max_in_flight: int = 1
+    ):
+        """
+        初期化
+
+        Args:
+            executor: バッチを実際に送信する関数
+            window: コマンドをまとめる待ち時間（秒）
+            max_batch: 1バッチあたりの最大コマンド数
+            max_in_flight: 同時に送信できるバッチ数
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self._executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = PipelineStats()
+        self._pending: List[_PendingCommand] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+        self._send_slots = asyncio.Semaphore(max_in_flight)
+
+    async def submit(self, command: str) -> Optional[str]:
+        """
+        コマンドをキューに追加し、レスポンスを待つ
+
+        Args:
+            command: 送信するコマンド
+
+        Returns:
+            Optional[str]: サーバーからのレスポンス
+        """
+        future = self._enqueue(command)
+        return await future
+
+    async def submit_many(self, commands: List[str]) -> List[Union[str, None, Exception]]:
+        """
+        複数のコマンドをまとめてキューに追加する
+
+        Args:
+            commands: 送信するコマンドのリスト
+
+        Returns:
+            List[Union[str, None, Exception]]: コマンドごとのレスポンスまたは例外
+        """
+        futures = [self._enqueue(command) for command in commands]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def flush(self) -> None:
+        """キューに残っているコマンドを即座に送信する"""
+        self._cancel_timer()
+        while self._pending:
+            await self._flush_batch()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """残りのコマンドを送信してパイプラインを閉じる"""
+        await self.flush()
+
+    def _enqueue(self, command: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingCommand(command, future))
+
+        if len(self._pending) >= self.max_batch:
+            # バッチが満杯なら待たずに送信
+            self._cancel_timer()
+            self._spawn_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.window, self._on_timer)
+        return future
+
+    def _on_timer(self) -> None:
+        self._flush_timer = None
+        self._spawn_flush()
+
+    def _cancel_timer(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _spawn_flush(self) -> None:
+        task = asyncio.create_task(self._flush_batch())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_batch(self) -> None:
+        """キューからバッチを取り出して送信する"""
+        async with self._send_slots:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if self._pending and self._flush_timer is None:
+                self._flush_timer = asyncio.get_running_loop().call_later(0, self._on_timer)
+            if not batch:
+                return
+
+            commands = [pending.command for pending in batch]
+            started = time.monotonic()
+            try:
+                responses = await self._executor(commands)
+            except Exception as e:
+                logger.error(f"Error sending command batch: {str(e)}")
+                self.stats.commands_failed += len(batch)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                return
+
+            finished = time.monotonic()
+            elapsed_ms = (finished - started) * 1000
+            self.stats.last_sent_at = finished
+            if self.stats.batches_sent:
+                self.stats.avg_latency_ms += LATENCY_SMOOTHING * (elapsed_ms - self.stats.avg_latency_ms)
+            else:
+                self.stats.avg_latency_ms = elapsed_ms
+            self.stats.batches_sent += 1
+            self.stats.commands_sent += len(batch)
+            self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+            responses = list(responses) + [None] * (len(batch) - len(responses))
+            for pending, response in zip(batch, responses):
+                if not pending.future.done():
+                    pending.future.set_result(response)
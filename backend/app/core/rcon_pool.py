@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 未接続のRCONクライアントを生成する関数
+ClientFactory = Callable[[], Any]
+
+
+class PoolClosedError(Exception):
+    """クローズ済みのプールを利用しようとした場合の例外"""
+
+
+@dataclass
+class PoolMetrics:
+    """コネクションプールのメトリクス"""
+    size: int
+    in_use: int
+    idle: int
+    reconnecting: int
+    reconnects: int
+    failed_probes: int
+    acquire_p99_ms: float
+
+
+class _PooledSession:
+    """プール内の1セッション"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Any = None
+        self.last_used = time.monotonic()
+
+
+class RCONConnectionPool:
+    """認証済みRCONセッションのコネクションプール
+
+    N本のセッションで負荷を分散し、アイドル中のセッションには定期的に
+    生存確認を行う。切断されたセッションは指数バックオフで再接続する。
+    """
+
+    def __init__(
+        self,
+        factory: ClientFactory,
+        password: str,
+        size: int = 4,
+        acquire_timeout: float = 5.0,
+        probe_interval: float = 15.0,
+        probe_timeout: float = 2.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        """
+        初期化
+
+        Args:
+            factory: 未接続のRCONクライアントを生成する関数
+            password: RCONパスワード
+            size: プールするセッション数
+            acquire_timeout: セッション取得の最大待ち時間（秒）
+            probe_interval: アイドルセッションの生存確認間隔（秒）
+            probe_timeout: 生存確認のタイムアウト（秒）
+            backoff_base: 再接続バックオフの初期値（秒）
+            backoff_max: 再接続バックオフの上限（秒）
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self._factory = factory
+        self._password = password
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._sessions = [_PooledSession(index) for index in range(size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._in_use: Set[int] = set()
+        self._reconnecting: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._probe_task: Optional[asyncio.Task] = None
+        self._acquire_times: Deque[float] = deque(maxlen=1024)
+        self._reconnects = 0
+        self._failed_probes = 0
+        self._closed = False
+
+    async def start(self) -> int:
+        """
+        全セッションの接続と認証を行う
+
+        接続に失敗したセッションはバックグラウンドで再接続を続ける。
+
+        Returns:
+            int: 接続に成功したセッション数
+        """
+        results = await asyncio.gather(
+            *(self._open_session(session) for session in self._sessions),
+            return_exceptions=True
+        )
+        connected = 0
+        for session, result in zip(self._sessions, results):
+            if result is True:
+                connected += 1
+                self._idle.put_nowait(session)
+            else:
+                if isinstance(result, Exception):
+                    logger.warning(f"RCON session {session.index} failed to connect: {str(result)}")
+                self._schedule_reconnect(session)
+
+        self._probe_task = asyncio.create_task(self._probe_loop())
+        logger.info(f"RCON pool started: {connected}/{self.size} sessions connected")
+        return connected
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """
+        セッションを1つ借りる
+
+        Yields:
+            認証済みのRCONクライアント
+        """
+        if self._closed:
+            raise PoolClosedError("RCON pool is closed")
+
+        started = time.perf_counter()
+        session = await self._get_live_session(started)
+        self._acquire_times.append(time.perf_counter() - started)
+        self._in_use.add(session.index)
+        try:
+            yield session.client
+        finally:
+            self._in_use.discard(session.index)
+            session.last_used = time.monotonic()
+            self._release(session)
+
+    async def command_batch(
+        self,
+        commands: List[str],
+        timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """
+        空いているセッションでコマンド列を送信する
+
+        Args:
+            commands: 実行するコマンドのリスト
+            timeout: レスポンス待ちのタイムアウト（秒）
+
+        Returns:
+            List[Optional[str]]: コマンドごとのレスポンス（入力と同じ順序）
+        """
+        async with self.acquire() as client:
+            return await client.command_batch(commands, timeout=timeout)
+
+    def metrics(self) -> PoolMetrics:
+        """
+        現在のプールメトリクスを取得する
+
+        Returns:
+            PoolMetrics: プールメトリクス
+        """
+        return PoolMetrics(
+            size=self.size,
+            in_use=len(self._in_use),
+            idle=self._idle.qsize(),
+            reconnecting=len(self._reconnecting),
+            reconnects=self._reconnects,
+            failed_probes=self._failed_probes,
+            acquire_p99_ms=self._acquire_percentile(0.99) * 1000
+        )
+
+    def has_live_sessions(self) -> bool:
+        """利用可能なセッションが1つ以上ある場合True"""
+        return not self._closed and len(self._reconnecting) < self.size
+
+    async def close(self) -> None:
+        """全セッションを閉じ、バックグラウンドタスクを停止する"""
+        self._closed = True
+        tasks = list(self._tasks)
+        if self._probe_task:
+            tasks.append(self._probe_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for session in self._sessions:
+            await self._close_client(session)
+        logger.info("RCON pool closed")
+
+    async def _get_live_session(self, started: float) -> _PooledSession:
+        while True:
+            remaining = self.acquire_timeout - (time.perf_counter() - started)
+            if remaining <= 0:
+                raise asyncio.TimeoutError("Timed out waiting for an RCON session")
+            session = await asyncio.wait_for(self._idle.get(), timeout=remaining)
+            if session.client is not None and session.client.is_authenticated():
+                return session
+            # 借りる前に切断されていたセッションは再接続に回す
+            self._schedule_reconnect(session)
+
+    def _release(self, session: _PooledSession) -> None:
+        if self._closed:
+            return
+        if session.client is not None and session.client.is_authenticated():
+            self._idle.put_nowait(session)
+        else:
+            self._schedule_reconnect(session)
+
+    async def _open_session(self, session: _PooledSession) -> bool:
+        await self._close_client(session)
+        client = self._factory()
+        try:
+            if not await client.login(self._password):
+                raise PermissionError("RCON authentication failed")
+        except BaseException:
+            # login() は接続後にタイムアウト・切断で失敗し得るため、どの経路でも接続を閉じる
+            try:
+                await client.stop()
+            except Exception as e:
+                logger.debug(f"Error closing RCON session {session.index}: {str(e)}")
+            raise
+        session.client = client
+        session.last_used = time.monotonic()
+        return True
+
+    async def _close_client(self, session: _PooledSession) -> None:
+        if session.client is None:
+            return
+        try:
+            await session.client.stop()
+        except Exception as e:
+            logger.debug(f"Error closing RCON session {session.index}: {str(e)}")
+        session.client = None
+
+    def _schedule_reconnect(self, session: _PooledSession) -> None:
+        if self._closed or session.index in self._reconnecting:
+            return
+        self._reconnecting.add(session.index)
+        task = asyncio.create_task(self._reconnect(session))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reconnect(self, session: _PooledSession) -> None:
+        """指数バックオフ（ジッター付き）でセッションを再接続する"""
+        attempt = 0
+        try:
+            while not self._closed:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                try:
+                    await self._open_session(session)
+                except Exception as e:
+                    attempt += 1
+                    logger.warning(f"RCON session {session.index} reconnect attempt {attempt} failed: {str(e)}")
+                    continue
+
+                self._reconnects += 1
+                self._reconnecting.discard(session.index)
+                self._idle.put_nowait(session)
+                logger.info(f"RCON session {session.index} reconnected")
+                return
+        finally:
+            self._reconnecting.discard(session.index)
+
+    async def _probe_loop(self) -> None:
+        """一定時間使われていないセッションの生存確認を行う"""
+        while not self._closed:
+            await asyncio.sleep(self.probe_interval)
+            threshold = time.monotonic() - self.probe_interval
+            for _ in range(self._idle.qsize()):
+                try:
+                    session = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if session.last_used > threshold:
+                    self._idle.put_nowait(session)
+                    continue
+                await self._probe(session)
+
+    async def _probe(self, session: _PooledSession) -> None:
+        self._in_use.add(session.index)
+        try:
+            # コマンドを含まないバッチは終端パケットの往復だけを行う
+            await session.client.command_batch([], timeout=self.probe_timeout)
+            session.last_used = time.monotonic()
+        except Exception as e:
+            self._failed_probes += 1
+            logger.warning(f"RCON session {session.index} failed liveness probe: {str(e)}")
+            await self._close_client(session)
+        finally:
+            self._in_use.discard(session.index)
+            self._release(session)
+
+    def _acquire_percentile(self, percentile: float) -> float:
+        if not self._acquire_times:
+            return 0.0
+        samples = sorted(self._acquire_times)
+        index = min(len(samples) - 1, int(len(samples) * percentile))
+        return samples[index]
@@ -1,25 +1,37 @@
 from datetime import datetime, timedelta
 import jwt
-from passlib.context import CryptContext
 from typing import Optional, Dict, Any
-import secrets
 from fastapi import Request, HTTPException
 import hashlib
-from cryptography.fernet import Fernet
+from cryptography.fernet import MultiFernet
+from app.core.ip_filter import ip_filter
+from app.core.key_ring import key_ring
+from app.core.password_hasher import password_hasher
+from app.core.token_cache import VerifiedTokenCache
 
 class SecurityManager:
     def __init__(self):
-        # パスワードハッシュ化のためのコンテキスト
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # パスワードハッシュ化のためのコンテキスト（リクエスト処理中は password_hasher 経由で使う）
+        self.pwd_context = password_hasher.context
+        self.password_hasher = password_hasher
         
-        # JWT設定
-        self.SECRET_KEY = secrets.token_urlsafe(32)
+        # JWT設定（署名鍵は全ワーカーで共有する鍵リングから鍵IDで選ぶ）
+        self.key_ring = key_ring
         self.ALGORITHM = "HS256"
         self.ACCESS_TOKEN_EXPIRE_MINUTES = 30
         
-        # 暗号化キーの生成
-        self.encryption_key = Fernet.generate_key()
-        self.cipher_suite = Fernet(self.encryption_key)
+        # 検証済みトークンのクレーム（有効期限は TOKEN_CACHE_TTL とトークンのexpの早い方）
+        self.token_cache = VerifiedTokenCache()
+        # 鍵が変わった場合は、削除された鍵で検証済みのトークンが残らないよう破棄する
+        self.key_ring.add_listener(lambda ring: self.token_cache.clear())
+        
+        # 接続元IPの許可・拒否リスト（IP_RULES_FILE から再読み込み可能）
+        self.ip_filter = ip_filter
+
+    @property
+    def cipher_suite(self) -> MultiFernet:
+        """データ暗号化用のFernet（鍵リングの先頭の鍵で暗号化し、全ての鍵で復号する）"""
+        return self.key_ring.fernet
 
     async def validate_request(self, request: Request) -> bool:
         """
@@ -97,10 +109,12 @@ class SecurityManager:
         expire = datetime.utcnow() + timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
         to_encode.update({"exp": expire})
         
+        kid, key = self.key_ring.active_key()
         encoded_jwt = jwt.encode(
             to_encode,
-            self.SECRET_KEY,
-            algorithm=self.ALGORITHM
+            key,
+            algorithm=self.ALGORITHM,
+            headers={"kid": kid}
         )
         return encoded_jwt
 
@@ -108,37 +122,93 @@ class SecurityManager:
         """
         トークンの検証
         
+        最近検証したトークンはキャッシュから返し、署名検証とデコードを省略する。
+        署名鍵はトークンヘッダーの kid で選ぶ。
+        
         Args:
             token: 検証するトークン
             
         Returns:
             Dict[str, Any]: デコードされたトークンデータ
+
+        Raises:
+            HTTPException: トークンが不正・期限切れ、または鍵IDが未知の場合（401）
         """
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        key = self.key_ring.signing_key(kid)
+        if key is None:
+            raise HTTPException(status_code=401, detail="Unknown signing key")
+
         try:
             decoded_token = jwt.decode(
                 token,
-                self.SECRET_KEY,
+                key,
                 algorithms=[self.ALGORITHM]
             )
-            return decoded_token
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token has expired")
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid token")
+        self.token_cache.put(token, decoded_token)
+        return decoded_token
+
+    def invalidate_token(self, token: str) -> None:
+        """
+        トークンを検証済みキャッシュから削除する
+        
+        このプロセスには即座に反映される。他のワーカーのキャッシュには
+        最大 token_cache.ttl 秒残る（VerifiedTokenCache を参照）。
+        
+        Args:
+            token: 無効化されたトークン
+        """
+        self.token_cache.invalidate(token)
 
     def is_allowed_ip(self, ip: str) -> bool:
         """
         IPアドレスのホワイトリスト検証
         
+        CIDRのプレフィックストライで判定するため、ルール数によらず一定時間で終わる。
+        
         Args:
             ip: 検証するIPアドレス
             
         Returns:
             bool: 検証結果
         """
-        # 実際の実装ではホワイトリストを設定
-        allowed_ips = ["127.0.0.1", "localhost"]
-        return ip in allowed_ips
+        return self.ip_filter.is_allowed(ip)
 
 # セキュリティマネージャーのインスタンスを作成
-security_manager = SecurityManager()
\ No newline at end of file
+security_manager = SecurityManager()
+
+async def get_password_hash(password: str) -> str:
+    """
+    パスワードをハッシュ化する（イベントループを止めないようスレッドプールで実行）
+    
+    Args:
+        password: 平文のパスワード
+        
+    Returns:
+        str: bcryptハッシュ
+    """
+    return await password_hasher.hash(password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """
+    パスワードを検証する（イベントループを止めないようスレッドプールで実行）
+    
+    Args:
+        password: 平文のパスワード
+        hashed_password: 保存済みのハッシュ
+        
+    Returns:
+        bool: 一致した場合True
+    """
+    return await password_hasher.verify(password, hashed_password)
\ No newline at end of file
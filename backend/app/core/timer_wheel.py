@@ -0,0 +1,129 @@
+import itertools
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class TimerWheel:
+    """ハッシュ化タイマーホイール
+
+    期限をtick単位に丸めてスロットに振り分ける。登録・取り消しはO(1)で、
+    1tickあたりの処理は該当スロットの要素数に比例する。
+    発火の遅れは最大で1tick分。
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 512,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初期化
+
+        Args:
+            tick: 1tickの長さ（秒）
+            slots: ホイールのスロット数
+            clock: 単調増加する時刻を返す関数
+        """
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+
+        self.tick = tick
+        self._clock = clock
+        self._slots: List[Dict[int, Tuple[int, Any]]] = [{} for _ in range(slots)]
+        self._locations: Dict[int, int] = {}
+        self._handles = itertools.count(1)
+        self._current_tick = self._to_tick(clock())
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, handle: int) -> bool:
+        return handle in self._locations
+
+    def schedule(self, delay: float, item: Any) -> int:
+        """
+        指定秒数後に発火する要素を登録する
+
+        Args:
+            delay: 発火までの秒数
+            item: 発火時に返す要素
+
+        Returns:
+            int: 取り消しに使うハンドル
+        """
+        ticks = max(1, math.ceil(delay / self.tick))
+        return self._insert(self._current_tick + ticks, item)
+
+    def schedule_at(self, deadline: float, item: Any) -> int:
+        """
+        clockの時刻で指定した期限に発火する要素を登録する
+
+        Args:
+            deadline: 発火時刻（clockと同じ基準）
+            item: 発火時に返す要素
+
+        Returns:
+            int: 取り消しに使うハンドル
+        """
+        return self._insert(max(self._current_tick + 1, math.ceil(deadline / self.tick)), item)
+
+    def cancel(self, handle: Optional[int]) -> bool:
+        """
+        登録を取り消す
+
+        Args:
+            handle: scheduleが返したハンドル
+
+        Returns:
+            bool: 取り消した場合True
+        """
+        slot_index = self._locations.pop(handle, None)
+        if slot_index is None:
+            return False
+        del self._slots[slot_index][handle]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[Any]:
+        """
+        現在時刻までホイールを進め、期限を迎えた要素を取り出す
+
+        Args:
+            now: 現在時刻（省略時はclock）
+
+        Returns:
+            List[Any]: 期限を迎えた要素（期限順）
+        """
+        target_tick = self._to_tick(self._clock() if now is None else now)
+        if target_tick <= self._current_tick:
+            return []
+
+        due: List[Tuple[int, int, Any]] = []
+        steps = min(target_tick - self._current_tick, len(self._slots))
+        for offset in range(1, steps + 1):
+            slot_index = (self._current_tick + offset) % len(self._slots)
+            slot = self._slots[slot_index]
+            if not slot:
+                continue
+            expired = [handle for handle, (deadline, _) in slot.items() if deadline <= target_tick]
+            for handle in expired:
+                deadline, item = slot.pop(handle)
+                del self._locations[handle]
+                due.append((deadline, handle, item))
+
+        self._current_tick = target_tick
+        due.sort(key=lambda entry: (entry[0], entry[1]))
+        return [item for _, _, item in due]
+
+    def _insert(self, deadline_tick: int, item: Any) -> int:
+        handle = next(self._handles)
+        slot_index = deadline_tick % len(self._slots)
+        self._slots[slot_index][handle] = (deadline_tick, item)
+        self._locations[handle] = slot_index
+        return handle
+
+    def _to_tick(self, timestamp: float) -> int:
+        return int(timestamp / self.tick)
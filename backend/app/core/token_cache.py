@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.ttl_cache import CacheStats, TTLCache
+
+# 検証済みトークンの最大保持時間（秒）を指定する環境変数
+TOKEN_CACHE_TTL_ENV = "TOKEN_CACHE_TTL"
+# 無効化が他のワーカーに反映されるまでの最大時間になるため短くする
+DEFAULT_TOKEN_CACHE_TTL = 5.0
+
+
+def default_token_cache_ttl() -> float:
+    """環境変数 TOKEN_CACHE_TTL、なければ既定の保持時間を返す"""
+    return float(os.getenv(TOKEN_CACHE_TTL_ENV, DEFAULT_TOKEN_CACHE_TTL))
+
+
+def token_digest(token: str) -> bytes:
+    """キャッシュのキーに使うトークンのダイジェスト（トークン自体はメモリに残さない）"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class VerifiedTokenCache:
+    """署名検証済みトークンのクレームを保持するLRUキャッシュ
+
+    エントリの有効期限は TTL とトークンの exp の早い方。
+    期限切れのトークンが検証をすり抜けないよう、参照時に必ず期限を確認する。
+
+    キャッシュはプロセスごとに持つため、invalidate() はこのプロセスにしか効かない。
+    他のワーカーでは無効化したトークンが最大 TTL 秒（既定5秒）受け付けられる。
+    この時間を許容できない場合は TOKEN_CACHE_TTL を短くする（0でキャッシュしない）。
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        """
+        初期化
+
+        Args:
+            maxsize: 保持するトークン数の上限
+            ttl: エントリの最大保持時間（秒）。省略時は default_token_cache_ttl()
+            clock: UNIX時刻を返す関数（exp と比較するため壁時計を使う）
+        """
+        self.ttl = default_token_cache_ttl() if ttl is None else ttl
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=self.ttl, clock=clock)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def stats(self) -> CacheStats:
+        """キャッシュの統計"""
+        return self._cache.stats
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        検証済みのクレームを取得する
+
+        Args:
+            token: JWTトークン
+
+        Returns:
+            Optional[Dict[str, Any]]: クレームのコピー（未検証・期限切れの場合None）
+        """
+        claims = self._cache.get(token_digest(token))
+        return None if claims is None else dict(claims)
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        検証済みのクレームを保存する
+
+        Args:
+            token: 署名を検証したJWTトークン
+            claims: デコードしたクレーム
+        """
+        exp = claims.get("exp")
+        expires_at = exp if isinstance(exp, (int, float)) else None
+        self._cache.put(token_digest(token), dict(claims), expires_at=expires_at)
+
+    def invalidate(self, token: str) -> bool:
+        """
+        トークンのエントリを削除する（このプロセスのキャッシュのみ）
+
+        Args:
+            token: JWTトークン
+
+        Returns:
+            bool: 削除した場合True
+        """
+        return self._cache.invalidate(token_digest(token))
+
+    def clear(self) -> None:
+        """全エントリを削除する（署名鍵を変更した場合など）"""
+        self._cache.clear()
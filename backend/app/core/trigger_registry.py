@@ -0,0 +1,300 @@
+import asyncio
+import bisect
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.condition_compiler import ConditionCompileError, TriggerIndex, trigger_index
+from app.core.trigger_scheduler import SCHEDULE_CONDITION_TYPES
+from app.models.trigger import Trigger, TriggerType, query_triggers
+
+logger = logging.getLogger(__name__)
+
+# トリガーの変更を受け取る関数（削除時はNoneが渡される）
+ChangeListener = Callable[[str, Optional[Trigger]], None]
+
+
+class TriggerRegistry:
+    """プロセス内に保持するトリガーのレジストリ
+
+    起動時に全トリガーを条件・アクションごと一括で読み込み、以降は
+    作成・更新・削除のたびに該当トリガーだけを読み直す。一覧の取得や
+    イベントとの照合ではデータベースにアクセスしない。
+    変更は購読者（スケジューラーなど）に通知される。
+    """
+
+    def __init__(self):
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._triggers: Dict[str, Trigger] = {}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        # ページネーション用のID昇順リスト
+        self._order: List[int] = []
+        self._listeners: List[ChangeListener] = []
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def __contains__(self, trigger_id: Any) -> bool:
+        return str(trigger_id) in self._triggers
+
+    @property
+    def loaded(self) -> bool:
+        """起動時の読み込みが完了している場合True"""
+        return self._session_factory is not None
+
+    async def load(self, session_factory: Callable[[], Session]) -> int:
+        """
+        全トリガーを読み込みレジストリを構築する
+
+        クエリはイベントループを止めないようスレッドで実行し、
+        レジストリの更新と購読者への通知はイベントループ上で行う。
+
+        Args:
+            session_factory: データベースセッションを生成する関数
+
+        Returns:
+            int: 読み込んだトリガー数
+        """
+        triggers = await asyncio.to_thread(self._fetch_all, session_factory)
+
+        self._session_factory = session_factory
+        self._triggers.clear()
+        self._snapshots.clear()
+        self._order.clear()
+        for trigger in triggers:
+            self._store(trigger)
+        self.version += 1
+        for trigger in triggers:
+            self._notify(str(trigger.id), trigger)
+        logger.info(f"Loaded {len(triggers)} triggers into registry")
+        return len(triggers)
+
+    async def refresh(self, trigger_id: Any) -> Optional[Trigger]:
+        """
+        1件のトリガーを読み直して反映する
+
+        作成・更新・削除の後に呼び出す。存在しない場合はレジストリから削除する。
+        クエリはイベントループを止めないようスレッドで実行する。
+
+        Args:
+            trigger_id: 変更されたトリガーのID
+
+        Returns:
+            Optional[Trigger]: 読み直したトリガー（削除済みの場合None）
+        """
+        if self._session_factory is None:
+            return None
+        try:
+            key = int(trigger_id)
+        except (TypeError, ValueError):
+            self.remove(trigger_id)
+            return None
+
+        trigger = await asyncio.to_thread(self._fetch_one, self._session_factory, key)
+        if trigger is None:
+            self.remove(trigger_id)
+            return None
+
+        self._store(trigger)
+        self.version += 1
+        self._notify(str(trigger.id), trigger)
+        return trigger
+
+    def remove(self, trigger_id: Any) -> bool:
+        """
+        トリガーをレジストリから削除する
+
+        Args:
+            trigger_id: トリガーID
+
+        Returns:
+            bool: 削除した場合True
+        """
+        key = str(trigger_id)
+        trigger = self._triggers.pop(key, None)
+        if trigger is None:
+            return False
+        self._snapshots.pop(key, None)
+        index = bisect.bisect_left(self._order, trigger.id)
+        if index < len(self._order) and self._order[index] == trigger.id:
+            del self._order[index]
+        self.version += 1
+        self._notify(key, None)
+        return True
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """
+        変更通知を購読する
+
+        Args:
+            listener: トリガーIDと変更後のトリガー（削除時None）を受け取る関数
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def get(self, trigger_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        トリガーを辞書形式で取得する
+
+        Args:
+            trigger_id: トリガーID
+
+        Returns:
+            Optional[Dict[str, Any]]: 条件・アクションを含むトリガー
+        """
+        return self._snapshots.get(str(trigger_id))
+
+    def list(self, active_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        トリガーの一覧を辞書形式で取得する
+
+        返される辞書はレジストリと共有されるため、変更しないこと。
+
+        Args:
+            active_only: 有効なトリガーだけを返す場合True
+
+        Returns:
+            List[Dict[str, Any]]: 条件・アクションを含むトリガーのリスト
+        """
+        snapshots = self._snapshots.values()
+        if active_only:
+            return [snapshot for snapshot in snapshots if snapshot["is_active"]]
+        return list(snapshots)
+
+    def page(
+        self,
+        after: Optional[int],
+        limit: int,
+        trigger_type: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        ID順に最大limit件のトリガーを辞書形式で取得する
+
+        Args:
+            after: このIDより後のトリガーを返す
+            limit: 取得する最大件数
+            trigger_type: 絞り込むトリガーの種類（TriggerType または値の文字列）
+            is_active: 絞り込む有効状態
+
+        Returns:
+            List[Dict[str, Any]]: 条件・アクションを含むトリガーのリスト
+        """
+        trigger_type = getattr(trigger_type, "value", trigger_type)
+        start = 0 if after is None else bisect.bisect_right(self._order, after)
+        items: List[Dict[str, Any]] = []
+        for index in range(start, len(self._order)):
+            snapshot = self._snapshots[str(self._order[index])]
+            if trigger_type is not None and snapshot["type"] != trigger_type:
+                continue
+            if is_active is not None and snapshot["is_active"] != is_active:
+                continue
+            items.append(snapshot)
+            if len(items) >= limit:
+                break
+        return items
+
+    def active(self, trigger_type: Optional[TriggerType] = None) -> List[Trigger]:
+        """
+        有効なトリガーを取得する
+
+        Args:
+            trigger_type: 絞り込むトリガーの種類（TriggerType または値の文字列）
+
+        Returns:
+            List[Trigger]: 条件・アクションを読み込み済みのトリガー
+        """
+        # 別のモジュールパスから読み込まれた列挙型でも一致するよう、値で比較する
+        type_value = getattr(trigger_type, "value", trigger_type)
+        return [
+            trigger for trigger in self._triggers.values()
+            if trigger.is_active and (type_value is None or trigger.type.value == type_value)
+        ]
+
+    @staticmethod
+    def _fetch_all(session_factory: Callable[[], Session]) -> List[Trigger]:
+        with session_factory() as db:
+            return query_triggers(db).all()
+
+    @staticmethod
+    def _fetch_one(session_factory: Callable[[], Session], key: int) -> Optional[Trigger]:
+        with session_factory() as db:
+            return query_triggers(db).filter(Trigger.id == key).one_or_none()
+
+    def _store(self, trigger: Trigger) -> None:
+        key = str(trigger.id)
+        snapshot = trigger.to_dict()
+        snapshot["conditions"] = [condition.to_dict() for condition in trigger.conditions]
+        snapshot["actions"] = trigger_actions(trigger)
+        if key not in self._triggers:
+            bisect.insort(self._order, trigger.id)
+        self._triggers[key] = trigger
+        self._snapshots[key] = snapshot
+
+    def _notify(self, trigger_id: str, trigger: Optional[Trigger]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(trigger_id, trigger)
+            except Exception as e:
+                logger.error(f"Trigger registry listener failed for {trigger_id}: {str(e)}")
+
+
+def trigger_actions(trigger: Trigger) -> List[Dict[str, Any]]:
+    """トリガーのアクションを実行順の辞書で取得する"""
+    return sorted(
+        (action.to_dict() for action in trigger.actions),
+        key=lambda action: action["order"] or 0
+    )
+
+
+def event_condition(trigger: Trigger) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    イベントで発火するトリガーのイベントタイプと条件を取り出す
+
+    スケジュール以外の最初の条件の condition_type をイベントタイプとし、
+    同じタイプの条件の parameters をすべて満たす場合に発火する。
+
+    Args:
+        trigger: 条件を読み込み済みのトリガー
+
+    Returns:
+        Optional[Tuple[str, Dict[str, Any]]]: イベントタイプと条件（TIMEトリガーなどはNone）
+    """
+    if trigger.type == TriggerType.TIME:
+        return None
+    conditions = [
+        condition for condition in trigger.conditions
+        if condition.condition_type not in SCHEDULE_CONDITION_TYPES
+    ]
+    if not conditions:
+        return None
+    event_type = conditions[0].condition_type
+    parameters = [condition.parameters or {} for condition in conditions if condition.condition_type == event_type]
+    return event_type, parameters[0] if len(parameters) == 1 else {"$and": parameters}
+
+
+def index_trigger(trigger_id: str, trigger: Optional[Trigger], index: TriggerIndex = trigger_index) -> None:
+    """
+    レジストリの変更をトリガーインデックスに反映する（レジストリの購読者として登録する）
+
+    Args:
+        trigger_id: トリガーID
+        trigger: 変更後のトリガー（削除時None）
+        index: 反映先のインデックス
+    """
+    condition = event_condition(trigger) if trigger is not None and trigger.is_active else None
+    if condition is None:
+        index.remove(trigger_id)
+        return
+    event_type, parameters = condition
+    try:
+        index.upsert(trigger_id, parameters, event_type=event_type, payload=trigger_actions(trigger))
+    except ConditionCompileError as e:
+        index.remove(trigger_id)
+        logger.warning(f"Trigger {trigger_id} has an invalid condition and will not fire: {str(e)}")
+
+
+# シングルトンインスタンスの作成
+trigger_registry = TriggerRegistry()
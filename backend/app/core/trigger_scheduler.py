@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# スケジュールを表す条件のcondition_type
+SCHEDULE_CONDITION_TYPES = ("schedule", "time")
+
+# アクション（TriggerAction.to_dict()の形式）を実行する関数
+ActionDispatcher = Callable[[Any, Dict[str, Any]], Awaitable[Any]]
+
+
+class ScheduleError(ValueError):
+    """スケジュール指定が不正な場合の例外"""
+
+
+class Schedule(ABC):
+    """発火時刻を計算するスケジュールの基底クラス"""
+
+    @abstractmethod
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        """
+        指定時刻より後の次の発火時刻を返す
+
+        Args:
+            moment: 基準時刻（UTC）
+
+        Returns:
+            Optional[datetime]: 次の発火時刻。これ以上発火しない場合None
+        """
+
+
+@dataclass
+class IntervalSchedule(Schedule):
+    """一定間隔で発火するスケジュール"""
+    seconds: float
+    anchor: datetime
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        if moment < self.anchor:
+            return self.anchor
+        elapsed = (moment - self.anchor).total_seconds()
+        # 遅延した場合は取りこぼした回をまとめて飛ばし、基準時刻からのずれを蓄積させない
+        periods = int(elapsed // self.seconds) + 1
+        return self.anchor + timedelta(seconds=periods * self.seconds)
+
+
+@dataclass
+class OnceSchedule(Schedule):
+    """指定時刻に1回だけ発火するスケジュール"""
+    at: datetime
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        return self.at if self.at > moment else None
+
+
+class CronSchedule(Schedule):
+    """5フィールド（分 時 日 月 曜日）のcron式によるスケジュール"""
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression: cron式（"*", "*/n", "a-b", "a-b/n", カンマ区切りに対応）
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression must have 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(value, low, high)
+            for value, (low, high) in zip(fields, self._RANGES)
+        ]
+        # cronの曜日は日曜=0、datetime.weekday()は月曜=0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(value: str, low: int, high: int) -> Set[int]:
+        result: Set[int] = set()
+        for part in value.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ScheduleError(f"Invalid cron step: {value}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ScheduleError(f"Cron value out of range: {value}")
+            result.update(range(start, end + 1, step))
+        return result
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        # 日と曜日の両方が指定された場合はどちらかに一致すればよい（cronの仕様）
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        return None
+
+
+def parse_schedule(parameters: Dict[str, Any], now: Optional[datetime] = None) -> Schedule:
+    """
+    条件パラメータからスケジュールを生成する
+
+    対応する形式:
+        {"interval_seconds": 60, "start_at": "2024-01-01T00:00:00+00:00"}
+        {"cron": "*/5 * * * *"}
+        {"at": "2024-01-01T12:00:00+00:00"}
+
+    Args:
+        parameters: EventCondition.parameters
+        now: 現在時刻（UTC）
+
+    Returns:
+        Schedule: スケジュール
+
+    Raises:
+        ScheduleError: 指定が不正な場合
+    """
+    now = now or datetime.now(timezone.utc)
+    try:
+        if "cron" in parameters:
+            return CronSchedule(str(parameters["cron"]))
+        if "interval_seconds" in parameters:
+            seconds = float(parameters["interval_seconds"])
+            if seconds <= 0:
+                raise ScheduleError("interval_seconds must be positive")
+            anchor = _parse_datetime(parameters["start_at"]) if parameters.get("start_at") else now
+            return IntervalSchedule(seconds=seconds, anchor=anchor)
+        if "at" in parameters:
+            return OnceSchedule(at=_parse_datetime(parameters["at"]))
+    except (TypeError, ValueError) as e:
+        if isinstance(e, ScheduleError):
+            raise
+        raise ScheduleError(str(e))
+    raise ScheduleError("Schedule requires one of: cron, interval_seconds, at")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+@dataclass
+class ScheduledTrigger:
+    """スケジューラーに登録されたTIMEトリガー"""
+    trigger_id: Any
+    schedule: Schedule
+    actions: List[Dict[str, Any]]
+    next_run_at: Optional[datetime] = None
+    handle: Optional[int] = None
+    fired: int = 0
+    running: Set[asyncio.Task] = field(default_factory=set, repr=False)
+
+
+class TimeTriggerScheduler:
+    """TriggerType.TIME のトリガーを発火させるスケジューラー
+
+    起動時に一度だけ有効なTIMEトリガーを読み込み、以降は作成・更新・削除の
+    たびに差分を反映する。発火時刻はタイマーホイールで管理するため、
+    tickごとのデータベース問い合わせは発生しない。
+    """
+
+    def __init__(
+        self,
+        dispatch_action: ActionDispatcher,
+        tick: float = 0.1,
+        slots: int = 4096
+    ):
+        """
+        初期化
+
+        Args:
+            dispatch_action: アクションを実行する関数（trigger_id, action辞書を受け取る）
+            tick: スケジューラーの分解能（秒）。発火の遅れはこの値以内に収まる
+            slots: タイマーホイールのスロット数
+        """
+        self._dispatch_action = dispatch_action
+        self._wheel = TimerWheel(tick=tick, slots=slots)
+        self._triggers: Dict[Any, ScheduledTrigger] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def load(self, triggers: Iterable[Any]) -> int:
+        """
+        トリガーをまとめて登録する
+
+        Args:
+            triggers: Triggerモデル（conditions / actions を読み込み済み）
+
+        Returns:
+            int: 登録されたTIMEトリガー数
+        """
+        loaded = 0
+        for trigger in triggers:
+            if self.upsert(trigger):
+                loaded += 1
+        logger.info(f"Loaded {loaded} time triggers")
+        return loaded
+
+    def upsert(self, trigger: Any) -> bool:
+        """
+        トリガーを登録または更新する
+
+        有効なTIMEトリガー以外が渡された場合は登録を解除する。
+
+        Args:
+            trigger: Triggerモデル（conditions / actions を読み込み済み）
+
+        Returns:
+            bool: スケジュールに登録された場合True
+        """
+        from app.models.trigger import TriggerType
+
+        trigger_id = str(trigger.id)
+        self.remove(trigger_id)
+        if trigger.type != TriggerType.TIME or not trigger.is_active:
+            return False
+
+        parameters = next(
+            (condition.parameters for condition in trigger.conditions
+             if condition.condition_type in SCHEDULE_CONDITION_TYPES),
+            None
+        )
+        if parameters is None:
+            logger.warning(f"Time trigger {trigger_id} has no schedule condition")
+            return False
+
+        try:
+            schedule = parse_schedule(parameters)
+        except ScheduleError as e:
+            logger.error(f"Invalid schedule for trigger {trigger_id}: {str(e)}")
+            return False
+
+        actions = sorted((action.to_dict() for action in trigger.actions), key=lambda action: action["order"] or 0)
+        scheduled = ScheduledTrigger(trigger_id=trigger_id, schedule=schedule, actions=actions)
+        self._triggers[trigger_id] = scheduled
+        return self._schedule_next(scheduled, datetime.now(timezone.utc))
+
+    def remove(self, trigger_id: Any) -> bool:
+        """
+        トリガーの登録を解除する
+
+        Args:
+            trigger_id: トリガーID
+
+        Returns:
+            bool: 解除した場合True
+        """
+        scheduled = self._triggers.pop(str(trigger_id), None)
+        if scheduled is None:
+            return False
+        self._wheel.cancel(scheduled.handle)
+        return True
+
+    def apply_change(self, trigger_id: Any, trigger: Optional[Any]) -> None:
+        """
+        トリガーレジストリの変更通知を反映する
+
+        Args:
+            trigger_id: 変更されたトリガーのID
+            trigger: 変更後のトリガー（削除時None）
+        """
+        if trigger is None:
+            self.remove(trigger_id)
+        else:
+            self.upsert(trigger)
+
+    def get(self, trigger_id: Any) -> Optional[ScheduledTrigger]:
+        """登録済みのトリガーを取得する"""
+        return self._triggers.get(str(trigger_id))
+
+    async def start(self) -> None:
+        """スケジューラーのループを開始する"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Time trigger scheduler started")
+
+    async def stop(self) -> None:
+        """スケジューラーのループを停止する"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        running = [task for scheduled in self._triggers.values() for task in scheduled.running]
+        await asyncio.gather(*running, return_exceptions=True)
+        logger.info("Time trigger scheduler stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._wheel.tick)
+            try:
+                self.fire_due()
+            except Exception as e:
+                logger.error(f"Error in time trigger scheduler: {str(e)}")
+
+    def fire_due(self, now: Optional[float] = None) -> int:
+        """
+        期限を迎えたトリガーを発火させる
+
+        Args:
+            now: 単調時刻（省略時は現在時刻）
+
+        Returns:
+            int: 発火したトリガー数
+        """
+        fired = 0
+        wall_now = datetime.now(timezone.utc)
+        for trigger_id in self._wheel.advance(now):
+            scheduled = self._triggers.get(trigger_id)
+            if scheduled is None:
+                continue
+            scheduled.handle = None
+            scheduled.fired += 1
+            fired += 1
+            task = asyncio.create_task(self._run_actions(scheduled))
+            scheduled.running.add(task)
+            task.add_done_callback(scheduled.running.discard)
+            # 次回は予定時刻を基準に計算し、遅れを次回以降に持ち越さない
+            self._schedule_next(scheduled, max(wall_now, scheduled.next_run_at or wall_now))
+        return fired
+
+    def _schedule_next(self, scheduled: ScheduledTrigger, after: datetime) -> bool:
+        next_run_at = scheduled.schedule.next_after(after)
+        scheduled.next_run_at = next_run_at
+        if next_run_at is None:
+            return False
+        delay = (next_run_at - datetime.now(timezone.utc)).total_seconds()
+        scheduled.handle = self._wheel.schedule_at(time.monotonic() + delay, scheduled.trigger_id)
+        return True
+
+    async def _run_actions(self, scheduled: ScheduledTrigger) -> None:
+        """トリガーのアクションをorder順に実行する"""
+        for action in scheduled.actions:
+            try:
+                await self._dispatch_action(scheduled.trigger_id, action)
+            except Exception as e:
+                logger.error(f"Action {action.get('id')} of trigger {scheduled.trigger_id} failed: {str(e)}")
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """キャッシュの統計"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class TTLCache(Generic[V]):
+    """エントリごとに有効期限を持つ、スレッドセーフなLRUキャッシュ
+
+    期限切れのエントリは参照時に削除する。容量を超えた場合は
+    最も長く参照されていないエントリから捨てる。
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, clock: Callable[[], float] = time.time):
+        """
+        初期化
+
+        Args:
+            maxsize: 保持するエントリ数の上限
+            ttl: エントリの最大保持時間（秒）
+            clock: 時刻を返す関数（有効期限と同じ基準の時刻）
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        有効期限内の値を取得する
+
+        Args:
+            key: キー
+
+        Returns:
+            Optional[V]: 値（ない場合・期限切れの場合None）
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V, expires_at: Optional[float] = None) -> None:
+        """
+        値を保存する
+
+        Args:
+            key: キー
+            value: 値
+            expires_at: 値自体の有効期限（TTLより早い場合はこちらを使う）
+        """
+        now = self._clock()
+        deadline = now + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        if deadline <= now:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        エントリを削除する
+
+        Args:
+            key: キー
+
+        Returns:
+            bool: 削除した場合True
+        """
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+            if removed:
+                self.stats.invalidations += 1
+            return removed
+
+    def invalidate_where(self, predicate: Callable[[V], bool]) -> int:
+        """
+        条件に一致する値のエントリをまとめて削除する
+
+        Args:
+            predicate: 削除する値でTrueを返す関数
+
+        Returns:
+            int: 削除したエントリ数
+        """
+        with self._lock:
+            keys: List[Hashable] = [key for key, (value, _) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            self.stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """全エントリを削除する"""
+        with self._lock:
+            self._entries.clear()
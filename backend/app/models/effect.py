@@ -1,8 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from app.database.base import Base
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 
 class Effect(Base):
     """エフェクトモデル
@@ -90,4 +90,92 @@ class EffectParameter(Base):
             "min_value": self.min_value,
             "max_value": self.max_value,
             "unit": self.unit
-        }
\ No newline at end of file
+        }
+
+def serialize_effects(
+    db: Session,
+    effect_ids: Optional[Iterable[int]] = None,
+    include_presets: bool = True,
+    after: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """エフェクトをまとめて辞書に変換する
+
+    ORMオブジェクトを組み立てず、エフェクト・パラメータ・プリセットを
+    それぞれ1回の集合クエリで取得してから辞書を組み立てる。
+    件数に関わらず発行されるSELECTは最大3回。
+
+    Args:
+        db: データベースセッション
+        effect_ids: 対象のエフェクトID（省略時は全件）
+        include_presets: 各エフェクトに "presets" を含める場合True
+        after: このIDより後のエフェクトだけを返す（キーセットページネーション）
+        limit: 返すエフェクト数の上限
+
+    Returns:
+        List[Dict[str, Any]]: Effect.to_dict()と同じ形式の辞書のリスト（ID順）
+    """
+    effect_query = db.query(
+        Effect.id, Effect.name, Effect.type, Effect.description,
+        Effect.created_at, Effect.updated_at
+    )
+    if effect_ids is not None:
+        effect_ids = list(effect_ids)
+        if not effect_ids:
+            return []
+        effect_query = effect_query.filter(Effect.id.in_(effect_ids))
+    if after is not None:
+        effect_query = effect_query.filter(Effect.id > after)
+    effect_query = effect_query.order_by(Effect.id)
+    if limit is not None:
+        effect_query = effect_query.limit(limit)
+
+    effects: Dict[int, Dict[str, Any]] = {}
+    for row in effect_query:
+        effects[row.id] = {
+            "id": row.id,
+            "name": row.name,
+            "type": row.type,
+            "description": row.description,
+            "parameters": [],
+            "created_at": row.created_at,
+            "updated_at": row.updated_at
+        }
+        if include_presets:
+            effects[row.id]["presets"] = []
+    if not effects:
+        return []
+
+    ids = list(effects)
+    parameter_rows = db.query(
+        EffectParameter.id, EffectParameter.effect_id, EffectParameter.name,
+        EffectParameter.type, EffectParameter.default_value, EffectParameter.min_value,
+        EffectParameter.max_value, EffectParameter.unit
+    ).filter(EffectParameter.effect_id.in_(ids)).order_by(EffectParameter.id)
+    for row in parameter_rows:
+        effects[row.effect_id]["parameters"].append({
+            "id": row.id,
+            "effect_id": row.effect_id,
+            "name": row.name,
+            "type": row.type,
+            "default_value": row.default_value,
+            "min_value": row.min_value,
+            "max_value": row.max_value,
+            "unit": row.unit
+        })
+
+    if include_presets:
+        preset_rows = db.query(
+            EffectPreset.id, EffectPreset.name, EffectPreset.effect_id,
+            EffectPreset.settings, EffectPreset.created_at
+        ).filter(EffectPreset.effect_id.in_(ids)).order_by(EffectPreset.id)
+        for row in preset_rows:
+            effects[row.effect_id]["presets"].append({
+                "id": row.id,
+                "name": row.name,
+                "effect_id": row.effect_id,
+                "settings": row.settings,
+                "created_at": row.created_at
+            })
+
+    return list(effects.values())
@@ -1,9 +1,9 @@
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, JSON, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Query, Session, relationship, selectinload
 from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
 from enum import Enum as PyEnum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 
 from app.database import Base
 
@@ -28,6 +28,8 @@ class Trigger(Base):
     description = Column(String(1000))
     type = Column(Enum(TriggerType), nullable=False)
     is_active = Column(Boolean, default=True)
+    # 所有ユーザー（migrations/0001_trigger_owner.sql で追加。既存のトリガーはNULL）
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -43,6 +45,7 @@ class Trigger(Base):
             "description": self.description,
             "type": self.type.value,
             "is_active": self.is_active,
+            "user_id": self.user_id,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
@@ -93,4 +96,104 @@ class TriggerAction(Base):
             "parameters": self.parameters,
             "order": self.order,
             "created_at": self.created_at
-        }
\ No newline at end of file
+        }
+
+def query_triggers(db: Session) -> Query:
+    """条件とアクションを一括で読み込むトリガーのクエリを返す
+
+    Args:
+        db: データベースセッション
+
+    Returns:
+        Query: トリガーのクエリ
+    """
+    return db.query(Trigger).options(
+        selectinload(Trigger.conditions),
+        selectinload(Trigger.actions)
+    )
+
+# 一覧で返すトリガーのカラム（fields= で指定可能な名前 -> カラム）
+TRIGGER_COLUMNS = {
+    "id": Trigger.id,
+    "name": Trigger.name,
+    "description": Trigger.description,
+    "type": Trigger.type,
+    "is_active": Trigger.is_active,
+    "user_id": Trigger.user_id,
+    "created_at": Trigger.created_at,
+    "updated_at": Trigger.updated_at,
+}
+
+# fields= で指定可能なトリガーのフィールド（カラムと、別クエリで読み込む関連）
+TRIGGER_FIELDS = (*TRIGGER_COLUMNS, "conditions", "actions")
+
+def serialize_triggers(
+    db: Session,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    trigger_type: Optional[TriggerType] = None,
+    is_active: Optional[bool] = None,
+    user_id: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """トリガーをID順のキーセットページネーションで辞書に変換する
+
+    指定されたフィールドのカラムだけをSELECTし、ORMオブジェクトは組み立てない。
+    条件・アクションは指定された場合だけ、それぞれ1回の集合クエリで読み込む。
+    件数に関わらず発行されるSELECTは最大3回。
+
+    Args:
+        db: データベースセッション
+        after: このIDより後のトリガーだけを返す
+        limit: 返すトリガー数の上限
+        trigger_type: 絞り込むトリガーの種類
+        is_active: 絞り込む有効状態
+        user_id: 絞り込む所有ユーザー
+        fields: 返すフィールド（省略時は全て。"id" は常に含める）
+
+    Returns:
+        List[Dict[str, Any]]: Trigger.to_dict()と同じ形式の辞書のリスト（ID順）
+    """
+    names = list(TRIGGER_FIELDS) if fields is None else list(dict.fromkeys(["id", *fields]))
+    columns = [name for name in names if name in TRIGGER_COLUMNS]
+
+    query = db.query(*[TRIGGER_COLUMNS[name] for name in columns])
+    if trigger_type is not None:
+        query = query.filter(Trigger.type == trigger_type)
+    if is_active is not None:
+        query = query.filter(Trigger.is_active == is_active)
+    if user_id is not None:
+        query = query.filter(Trigger.user_id == user_id)
+    if after is not None:
+        query = query.filter(Trigger.id > after)
+    query = query.order_by(Trigger.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    triggers: Dict[int, Dict[str, Any]] = {}
+    for row in query:
+        item = dict(row._mapping)
+        if "type" in item and item["type"] is not None:
+            item["type"] = item["type"].value
+        triggers[item["id"]] = item
+    if not triggers:
+        return []
+
+    ids = list(triggers)
+    if "conditions" in names:
+        for item in triggers.values():
+            item["conditions"] = []
+        condition_rows = db.query(EventCondition).filter(
+            EventCondition.trigger_id.in_(ids)
+        ).order_by(EventCondition.id)
+        for condition in condition_rows:
+            triggers[condition.trigger_id]["conditions"].append(condition.to_dict())
+    if "actions" in names:
+        for item in triggers.values():
+            item["actions"] = []
+        action_rows = db.query(TriggerAction).filter(
+            TriggerAction.trigger_id.in_(ids)
+        ).order_by(TriggerAction.order, TriggerAction.id)
+        for action in action_rows:
+            triggers[action.trigger_id]["actions"].append(action.to_dict())
+    return list(triggers.values())
@@ -1,13 +1,11 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Query, Session, joinedload, relationship
 from sqlalchemy.sql import func
 from pydantic import BaseModel
 from app.database import Base
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.password_hasher import password_hasher
 
 class User(Base):
     """ユーザーモデル"""
@@ -32,18 +30,46 @@ class User(Base):
 
     def set_password(self, password):
         """パスワードをハッシュ化して保存"""
-        self.hashed_password = pwd_context.hash(password)
+        self.hashed_password = password_hasher.context.hash(password)
 
     def verify_password(self, password):
         """パスワードの検証"""
-        return pwd_context.verify(password, self.hashed_password)
+        return password_hasher.context.verify(password, self.hashed_password)
+
+    async def set_password_async(self, password: str) -> None:
+        """
+        パスワードをハッシュ化して保存する（ハッシュ化は password_hasher のスレッドで実行）
+
+        Raises:
+            PasswordHasherBusy: 待ち行列が満杯の場合
+            PasswordHasherTimeout: 制限時間内に終わらなかった場合
+        """
+        self.hashed_password = await password_hasher.hash(password)
+
+    async def verify_password_async(self, password: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワードを検証する（検証は password_hasher のスレッドで実行）
+
+        hashed_password は変更しない。新しいハッシュが返された場合は、呼び出し元が
+        hashed_password に設定してコミットする。
+
+        Returns:
+            Tuple[bool, Optional[str]]: 一致したか、古いコストのハッシュを置き換える新しいハッシュ
+
+        Raises:
+            PasswordHasherBusy: 待ち行列が満杯の場合
+            PasswordHasherTimeout: 制限時間内に終わらなかった場合
+        """
+        return await password_hasher.verify_and_update(password, self.hashed_password)
 
 class ApiKey(Base):
     """APIキーモデル"""
     __tablename__ = "api_keys"
 
     id = Column(Integer, primary_key=True, index=True)
-    key = Column(String, unique=True, index=True)
+    # キーの先頭の識別子（検索用）とシークレット部分の鍵付きハッシュ。平文のキーは保存しない
+    prefix = Column(String(16), unique=True, index=True)
+    key_hash = Column(String(64))
     user_id = Column(Integer, ForeignKey("users.id"))
     name = Column(String)
     is_active = Column(Boolean, default=True)
@@ -66,6 +92,24 @@ class Permission(Base):
     # リレーションシップ
     user = relationship("User", back_populates="permissions")
 
+def query_api_key_by_prefix(db: Session, prefix: str) -> Query:
+    """APIキーを所有ユーザーと権限ごと読み込むクエリを返す
+
+    ユーザーはJOINで、権限はselectinで読み込むため、SELECTは2回で済む。
+
+    Args:
+        db: データベースセッション
+        prefix: APIキーの識別子
+
+    Returns:
+        Query: APIキーのクエリ
+    """
+    return (
+        db.query(ApiKey)
+        .options(joinedload(ApiKey.user).selectinload(User.permissions))
+        .filter(ApiKey.prefix == prefix)
+    )
+
 # Pydanticモデル（APIレスポンス用）
 class UserBase(BaseModel):
     email: str
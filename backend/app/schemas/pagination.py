@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+class Page(BaseModel):
+    """カーソルページネーションのレスポンススキーマ"""
+    items: List[Any] = Field(..., description="ページ内の要素（fields指定時は指定フィールドのみ）")
+    next_cursor: Optional[str] = Field(None, description="次のページのカーソル（最終ページの場合null）")
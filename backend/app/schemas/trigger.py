@@ -34,4 +34,11 @@ class TriggerResponse(TriggerBase):
     last_triggered: Optional[datetime] = Field(None, description="最後にトリガーが実行された日時")
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# ルーターのレスポンスモデル
+Trigger = TriggerResponse
+
+class Message(BaseModel):
+    """処理結果のメッセージ"""
+    message: str
@@ -0,0 +1,65 @@
+"""
+稼働中エフェクトのメモリ使用量ベンチマーク
+
+create_particle_effect / create_light_effect の辞書をそのまま保持した場合と、
+ActiveEffectStore に格納した場合の1エフェクトあたりのメモリを比較する。
+
+実行方法（backendディレクトリで）:
+    python -m benchmarks.bench_effect_store
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.effect_engine import EffectEngine  # noqa: E402
+from app.core.effect_store import ActiveEffectStore  # noqa: E402
+
+
+def measure(label: str, build: Callable[[], Any], count: int) -> None:
+    """構築したオブジェクトが保持するメモリを計測して表示する"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    retained = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {(after - before) / count:8.1f} B/effect  ({(after - before) / 1e6:7.1f} MB total)")
+    del retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    engine = EffectEngine(seed=0)
+    effects: List[Dict[str, Any]] = [
+        engine.create_particle_effect() if index % 2 else engine.create_light_effect({'color': '#FF8800'})
+        for index in range(args.count)
+    ]
+
+    def as_dicts() -> Dict[str, Dict[str, Any]]:
+        # エフェクト辞書のコピーを保持（IDの文字列はどちらの方式でも共有される）
+        return {effect["id"]: {**effect, "parameters": dict(effect["parameters"])} for effect in effects}
+
+    def as_store() -> ActiveEffectStore:
+        store = ActiveEffectStore()
+        for effect in effects:
+            store.add(effect)
+        return store
+
+    measure("dict per effect", as_dicts, args.count)
+    measure("ActiveEffectStore", as_store, args.count)
+
+    store = as_store()
+    sample = effects[1]
+    assert store.view(sample["id"]).to_dict() == sample, "view must match the original dict"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+EffectEngineのエフェクト生成ベンチマーク
+
+テンプレートキャッシュ導入前の生成処理（毎回パラメータをマージして
+辞書を組み立てる方式）と、現在のEffectEngineを比較する。
+
+実行方法（backendディレクトリで）:
+    python -m benchmarks.bench_effect_templates
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.effect_engine import EffectEngine, EffectParameters  # noqa: E402
+
+
+def legacy_create_particle_effect(engine: EffectEngine, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """テンプレートキャッシュ導入前の create_particle_effect と同じ処理"""
+    default = engine.default_parameters['particle']
+    if parameters:
+        params = EffectParameters(
+            color=parameters.get('color', default.color),
+            duration=parameters.get('duration', default.duration),
+            intensity=parameters.get('intensity', default.intensity)
+        )
+    else:
+        params = default
+    effect = {
+        'type': 'particle',
+        'id': engine._generate_effect_id(),
+        'parameters': {
+            'color': params.color,
+            'duration': params.duration,
+            'intensity': params.intensity,
+            'particles_count': random.randint(10, 50)
+        }
+    }
+    engine.logger.info(f"Created particle effect: {effect['id']}")
+    return effect
+
+
+def measure(label: str, create: Callable[[], Any], iterations: int) -> None:
+    """1エフェクトあたりの時間と確保メモリを計測して表示する"""
+    for _ in range(min(iterations, 1000)):
+        create()
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        create()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    results = [create() for _ in range(iterations)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    print(
+        f"{label:<28} {elapsed / iterations * 1e6:8.2f} us/effect "
+        f"{(after - before) / iterations:8.1f} B/effect (retained)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--log-level", default="INFO", help="本番と同じログレベルで計測する（出力は破棄）")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=args.log_level,
+        handlers=[logging.StreamHandler(open(os.devnull, "w"))],
+        force=True
+    )
+
+    engine = EffectEngine()
+    custom = {'color': '#FF0000', 'intensity': 0.5}
+
+    measure("legacy (defaults)", lambda: legacy_create_particle_effect(engine), args.iterations)
+    measure("template (defaults)", engine.create_particle_effect, args.iterations)
+    measure("legacy (custom)", lambda: legacy_create_particle_effect(engine, custom), args.iterations)
+    measure("template (custom)", lambda: engine.create_particle_effect(custom), args.iterations)
+    print(f"template cache: {engine.template_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+IP許可リスト判定のベンチマーク
+
+ランダムに生成したCIDRルール（IPv4/IPv6混在）を IPRuleSet に読み込み、
+構築時間・ノード数・1判定あたりの時間を計測する。比較として、ネットワークの
+リストを先頭から調べる線形探索の判定時間も少数のアドレスで計測する。
+
+実行方法（backendディレクトリで）:
+    python -m benchmarks.bench_ip_filter
+    python -m benchmarks.bench_ip_filter --rules 100000 --lookups 200000
+"""
+import argparse
+import ipaddress
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.ip_filter import IPRuleSet  # noqa: E402
+
+
+def random_rules(count: int, rng: random.Random) -> Tuple[List[str], List[str]]:
+    """許可9割・拒否1割のCIDRを生成する（IPv6は4分の1）"""
+    allow: List[str] = []
+    deny: List[str] = []
+    for index in range(count):
+        if index % 4 == 0:
+            prefixlen = rng.randint(32, 64)
+            network = ipaddress.IPv6Network((rng.getrandbits(128), prefixlen), strict=False)
+        else:
+            prefixlen = rng.randint(16, 32)
+            network = ipaddress.IPv4Network((rng.getrandbits(32), prefixlen), strict=False)
+        (deny if index % 10 == 0 else allow).append(str(network))
+    return allow, deny
+
+
+def random_addresses(count: int, networks: List[str], rng: random.Random) -> List[str]:
+    """半分はルール内、半分は任意のアドレスを生成する"""
+    addresses: List[str] = []
+    for index in range(count):
+        if index % 2:
+            network = ipaddress.ip_network(rng.choice(networks))
+            offset = rng.randrange(network.num_addresses) if network.num_addresses > 1 else 0
+            addresses.append(str(network.network_address + offset))
+        elif index % 4 == 0:
+            addresses.append(str(ipaddress.IPv6Address(rng.getrandbits(128))))
+        else:
+            addresses.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+    return addresses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--linear-lookups", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    allow, deny = random_rules(args.rules, rng)
+    addresses = random_addresses(args.lookups, allow + deny, rng)
+
+    started = time.perf_counter()
+    rules = IPRuleSet(allow, deny)
+    built = time.perf_counter() - started
+    nodes = len(rules._v4) + len(rules._v6)
+    print(f"rules={rules.rule_count}  build={built:.2f} s  trie nodes={nodes}")
+
+    started = time.perf_counter()
+    allowed = sum(1 for address in addresses if rules.is_allowed(address))
+    elapsed = time.perf_counter() - started
+    print(f"{'prefix trie':<12} {elapsed / len(addresses) * 1e6:10.2f} us/lookup  (allowed {allowed}/{len(addresses)})")
+
+    # 従来の方式に近い線形探索（ルール数に比例して遅くなる）
+    networks = [ipaddress.ip_network(network) for network in allow]
+    sample = addresses[:args.linear_lookups]
+    started = time.perf_counter()
+    for address in sample:
+        parsed = ipaddress.ip_address(address)
+        any(parsed in network for network in networks)
+    elapsed = time.perf_counter() - started
+    print(f"{'linear scan':<12} {elapsed / len(sample) * 1e6:10.2f} us/lookup  ({len(sample)} lookups)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+ログイン（パスワード検証）スループットのベンチマーク
+
+イベントループ上で直接 bcrypt を検証した場合と、PasswordHasher のスレッドプールで
+検証した場合について、同時実行数ごとのスループットとイベントループの最大停止時間を比較する。
+
+実行方法（backendディレクトリで）:
+    python -m benchmarks.bench_password_hasher
+    python -m benchmarks.bench_password_hasher --rounds 10 --logins 256
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.password_hasher import PasswordHasher  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """イベントループが予定より遅れて起床した最大時間（秒）を計測する"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(login: Callable[[], Awaitable[bool]], logins: int, concurrency: int) -> Tuple[float, float]:
+    """同時実行数を制限してログインを実行し、スループットと最大ループ停止時間を返す"""
+    slots = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    async def one() -> None:
+        async with slots:
+            assert await login()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return logins / elapsed, await lag_task
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(workers=args.workers, max_queue=max(args.concurrency), timeout=None, rounds=args.rounds)
+    hashed = hasher.context.hash(PASSWORD)
+
+    async def inline_login() -> bool:
+        # 従来の実装: リクエスト処理中に同期的に検証する
+        return hasher.context.verify(PASSWORD, hashed)
+
+    async def pooled_login() -> bool:
+        return await hasher.verify(PASSWORD, hashed)
+
+    print(f"bcrypt rounds={args.rounds}, workers={hasher.workers}, logins={args.logins}")
+    print(f"{'mode':<8} {'concurrency':>11} {'logins/s':>10} {'max loop lag':>14}")
+    for concurrency in args.concurrency:
+        for mode, login in (("inline", inline_login), ("pool", pooled_login)):
+            throughput, lag = await run(login, args.logins, concurrency)
+            print(f"{mode:<8} {concurrency:>11} {throughput:>10.1f} {lag * 1000:>11.1f} ms")
+
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,4 @@
+-- トリガーに所有ユーザーを追加する（GET /triggers/list は所有ユーザーで絞り込む）
+-- 既存のトリガーは所有者なし（NULL）のまま残るため、必要に応じて user_id を設定すること
+ALTER TABLE triggers ADD COLUMN user_id INTEGER REFERENCES users (id);
+CREATE INDEX ix_triggers_user_id ON triggers (user_id);
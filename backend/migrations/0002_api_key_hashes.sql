@@ -0,0 +1,10 @@
+-- APIキーを平文（key）ではなく識別子（prefix）とシークレットの鍵付きハッシュ（key_hash）で保存する
+-- 平文のキーは新しい形式（mk_<識別子>_<シークレット>）ではないため変換できない。
+-- 既存のキーは無効化して行（所有者・名前・有効期限）だけを残し、
+-- ApiKeyManager.reissue() で所有者ごとに発行し直すこと（新しいキーは発行時に1度だけ表示される）
+ALTER TABLE api_keys ADD COLUMN prefix VARCHAR(16);
+ALTER TABLE api_keys ADD COLUMN key_hash VARCHAR(64);
+UPDATE api_keys SET is_active = FALSE WHERE prefix IS NULL;
+CREATE UNIQUE INDEX ix_api_keys_prefix ON api_keys (prefix);
+DROP INDEX ix_api_keys_key;
+ALTER TABLE api_keys DROP COLUMN key;
@@ -0,0 +1,132 @@
+import importlib.util
+import sys
+import types
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+
+# backendディレクトリから app パッケージを読み込む
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# __init__ がツリーにないモジュール（config, database, parameter など）を読み込むパッケージ。
+# 個々のモジュールをテストできるよう、__init__ を実行せずにパッケージとして登録する
+PACKAGES_WITHOUT_INIT = ("app", "app.core", "app.models", "app.schemas")
+
+
+def _register_package(name: str) -> types.ModuleType:
+    package = types.ModuleType(name)
+    package.__path__ = [str(BACKEND_DIR.joinpath(*name.split(".")))]
+    sys.modules[name] = package
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, package)
+    return package
+
+
+def _register_missing(name: str, **attrs: Any) -> None:
+    """ツリーにないモジュールの代わりを登録する（実物がある場合は何もしない）"""
+    parent, _, child = name.rpartition(".")
+    if parent not in sys.modules:
+        _register_missing(parent)
+    if name in sys.modules or importlib.util.find_spec(name) is not None:
+        return
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    setattr(sys.modules[parent], child, module)
+
+
+def _install_baseline_stand_ins() -> None:
+    for name in PACKAGES_WITHOUT_INIT:
+        _register_package(name)
+
+    try:
+        from sqlalchemy.orm import declarative_base
+    except ImportError:
+        base = None
+    else:
+        base = declarative_base()
+
+    def get_db():
+        raise RuntimeError("app.core.database is not available in tests; override get_db")
+
+    async def get_current_user():
+        raise RuntimeError("app.core.auth is not available in tests; override get_current_user")
+
+    _register_missing("app.core.config", settings=types.SimpleNamespace(), get_settings=types.SimpleNamespace)
+    _register_missing("app.core.database", Base=base, SessionLocal=None, get_db=get_db)
+    _register_missing("app.core.auth", get_current_user=get_current_user)
+    _register_missing("app.database", Base=base)
+    _register_missing("app.database.base", Base=base)
+    _register_missing("app.services.trigger_service", TriggerService=type("TriggerService", (), {}))
+    _register_missing("app.services.effect_service", EffectService=type("EffectService", (), {}))
+    _register_missing("app.services.auth_service", AuthService=type("AuthService", (), {}))
+
+
+_install_baseline_stand_ins()
+
+
+class QueryCountExceeded(AssertionError):
+    """発行されたクエリ数が上限を超えた場合の例外"""
+
+
+@dataclass
+class QueryCounter:
+    """ブロック内で発行されたSQL文の記録"""
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(bind: Any) -> Iterator[QueryCounter]:
+    """
+    ブロック内で発行されたSQL文を数える
+
+    Args:
+        bind: 監視対象のEngineまたはConnection
+
+    Yields:
+        QueryCounter: 発行されたSQL文の記録
+    """
+    from sqlalchemy import event
+
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def _assert_max_queries(bind: Any, limit: int) -> Iterator[QueryCounter]:
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(counter.statements)
+        raise QueryCountExceeded(f"Expected at most {limit} queries, got {counter.count}:\n{statements}")
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    ブロック内のクエリ数が上限以下であることを検証するコンテキストマネージャー
+
+    N+1クエリの再発を検出するために使う::
+
+        with assert_max_queries(engine, 3):
+            serialize_effects(db)
+    """
+    return _assert_max_queries
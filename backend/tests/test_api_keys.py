@@ -0,0 +1,145 @@
+import ast
+import asyncio
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+api_keys = pytest.importorskip("app.core.api_keys")
+
+from app.core import token_cache  # noqa: E402
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+MIGRATIONS_DIR = APP_DIR.parent / "migrations"
+
+
+def make_manager(monkeypatch, rows):
+    lookups = []
+
+    def query(db, prefix):
+        lookups.append(prefix)
+        return SimpleNamespace(one_or_none=lambda: rows.get(prefix))
+
+    monkeypatch.setattr(api_keys, "query_api_key_by_prefix", query)
+
+    @contextmanager
+    def session_factory():
+        yield object()
+
+    now = [1_000_000.0]
+    manager = api_keys.ApiKeyManager(secret=b"secret", session_factory=session_factory, clock=lambda: now[0])
+    return manager, lookups, now
+
+
+def make_row(manager, prefix, secret, is_active=True):
+    user = SimpleNamespace(id=7, username="alice", is_active=True, is_superuser=False, permissions=[])
+    return SimpleNamespace(
+        id=1,
+        prefix=prefix,
+        key_hash=manager.hash_secret(secret),
+        is_active=is_active,
+        user=user,
+        expires_at=None
+    )
+
+
+def test_unknown_prefix_is_cached_negatively(monkeypatch):
+    manager, lookups, now = make_manager(monkeypatch, {})
+    raw_key = "mk_0123456789ab_secret"
+
+    assert asyncio.run(manager.authenticate(raw_key)) is None
+    assert asyncio.run(manager.authenticate(raw_key)) is None
+    assert lookups == ["0123456789ab"]
+
+    now[0] += 10
+    assert asyncio.run(manager.authenticate(raw_key)) is None
+    assert lookups == ["0123456789ab", "0123456789ab"]
+
+
+def test_inactive_key_is_cached_negatively(monkeypatch):
+    rows = {}
+    manager, lookups, _ = make_manager(monkeypatch, rows)
+    rows["0123456789ab"] = make_row(manager, "0123456789ab", "secret", is_active=False)
+
+    for _ in range(3):
+        assert asyncio.run(manager.authenticate("mk_0123456789ab_secret")) is None
+    assert len(lookups) == 1
+
+
+def test_valid_key_is_cached(monkeypatch):
+    rows = {}
+    manager, lookups, _ = make_manager(monkeypatch, rows)
+    rows["0123456789ab"] = make_row(manager, "0123456789ab", "secret")
+
+    principal = asyncio.run(manager.authenticate("mk_0123456789ab_secret"))
+    assert principal is not None and principal.username == "alice"
+    assert asyncio.run(manager.authenticate("mk_0123456789ab_wrong")) is None
+    assert asyncio.run(manager.authenticate("mk_0123456789ab_secret")) == principal
+    assert len(lookups) == 1
+
+
+def test_auth_package_imports_from_the_app_root():
+    # core.* と app.core.* は別のモジュールとして読み込まれ、シングルトンが2つになる
+    tree = ast.parse((APP_DIR / "api" / "auth" / "__init__.py").read_text(encoding="utf-8"))
+    modules = [node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom) and node.level == 0]
+    assert [module for module in modules if module.startswith("core")] == []
+
+
+def test_principal_cache_uses_the_token_cache_ttl(monkeypatch):
+    monkeypatch.setenv(token_cache.TOKEN_CACHE_TTL_ENV, "2")
+    rows = {}
+    manager, lookups, now = make_manager(monkeypatch, rows)
+    rows["0123456789ab"] = make_row(manager, "0123456789ab", "secret")
+    assert manager.ttl == 2.0
+
+    assert asyncio.run(manager.authenticate("mk_0123456789ab_secret")) is not None
+    # 別のワーカーでの無効化はTTLが過ぎるまで反映されない
+    rows["0123456789ab"].is_active = False
+    assert asyncio.run(manager.authenticate("mk_0123456789ab_secret")) is not None
+
+    now[0] += 2
+    assert asyncio.run(manager.authenticate("mk_0123456789ab_secret")) is None
+    assert len(lookups) == 2
+
+
+def test_migration_keeps_legacy_keys_for_reissue():
+    sqlite3 = pytest.importorskip("sqlite3")
+    db = sqlite3.connect(":memory:")
+    db.executescript("""
+        CREATE TABLE api_keys (id INTEGER PRIMARY KEY, key VARCHAR, user_id INTEGER, name VARCHAR,
+                               is_active BOOLEAN, created_at DATETIME, expires_at DATETIME);
+        CREATE UNIQUE INDEX ix_api_keys_key ON api_keys (key);
+        INSERT INTO api_keys (key, user_id, name, is_active) VALUES ('legacy-plaintext', 1, 'ci', 1);
+    """)
+    db.executescript((MIGRATIONS_DIR / "0002_api_key_hashes.sql").read_text(encoding="utf-8"))
+
+    columns = [row[1] for row in db.execute("PRAGMA table_info(api_keys)")]
+    assert "key" not in columns and {"prefix", "key_hash"} <= set(columns)
+    assert db.execute("SELECT user_id, name, is_active, prefix FROM api_keys").fetchall() == [(1, "ci", 0, None)]
+
+
+def test_reissue_replaces_a_legacy_key():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    from app.models.user import ApiKey, User
+
+    engine = sqlalchemy.create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    manager = api_keys.ApiKeyManager(secret=b"secret", session_factory=session_factory)
+    with session_factory() as db:
+        db.add(User(id=1, username="alice", email="a@example.com", is_active=True))
+        legacy = ApiKey(user_id=1, name="ci", is_active=False)
+        db.add(legacy)
+        db.commit()
+
+        replacement, raw_key = manager.reissue(db, legacy)
+        assert (replacement.user_id, replacement.name) == (1, "ci")
+
+    principal = asyncio.run(manager.authenticate(raw_key))
+    assert principal is not None and principal.key_id == replacement.id
+    engine.dispose()
@@ -0,0 +1,126 @@
+import pytest
+
+from app.core.condition_compiler import ANY_EVENT_TYPE, ConditionCompileError, TriggerIndex, compile_condition
+
+
+@pytest.mark.parametrize("condition, data, expected", [
+    ({"kind": "join"}, {"kind": "join"}, True),
+    ({"kind": "join"}, {"kind": "quit"}, False),
+    ({"player.level": {"$gte": 10}}, {"player": {"level": 12}}, True),
+    ({"player.level": {"$gte": 10}}, {"player": "steve"}, False),
+    ({"count": {"$gt": 1, "$lt": 5}}, {"count": 5}, False),
+    ({"count": {"$gt": 1}}, {"count": "many"}, False),
+    ({"count": {"$ne": 3}}, {}, True),
+    ({"kind": {"$in": ["join", "quit"]}}, {"kind": "quit"}, True),
+    ({"kind": {"$nin": ["join"]}}, {}, True),
+    ({"tag": {"$exists": False}}, {"tag": None}, False),
+    ({"tags": {"$contains": "vip"}}, {"tags": ["vip", "new"]}, True),
+    ({"message": {"$regex": "^!help"}}, {"message": "!help me"}, True),
+    ({"message": {"$regex": "^!help"}}, {"message": 1}, False),
+    ({"$or": [{"kind": "join"}, {"kind": "quit"}]}, {"kind": "quit"}, True),
+    ({"$and": [{"kind": "join"}, {"$not": {"vip": True}}]}, {"kind": "join", "vip": True}, False),
+    ({"event_type": "chat"}, {"event_type": "other"}, True),
+    (None, {}, True),
+])
+def test_compiled_conditions(condition, data, expected):
+    assert compile_condition(condition)(data) is expected
+
+
+@pytest.mark.parametrize("condition", [
+    {"kind": {"$like": "j%"}},
+    {"$xor": []},
+    {"$or": {"kind": "join"}},
+    {"kind": {"$in": "join"}},
+    {"message": {"$regex": "("}},
+    ["kind"],
+])
+def test_invalid_conditions_are_rejected(condition):
+    with pytest.raises(ConditionCompileError):
+        compile_condition(condition)
+
+
+def counting(condition, calls, trigger_id):
+    predicate = compile_condition(condition)
+
+    def check(data):
+        calls.append(trigger_id)
+        return predicate(data)
+    return check
+
+
+def test_only_indexed_candidates_are_evaluated():
+    index = TriggerIndex()
+    calls = []
+    for trigger_id, kind in enumerate(["join", "quit", "chat"]):
+        condition = {"kind": kind, "count": {"$gte": 1}}
+        index.upsert(trigger_id, condition, event_type="player", predicate=counting(condition, calls, trigger_id))
+
+    matched = index.match("player", {"kind": "quit", "count": 2})
+    assert [compiled.trigger_id for compiled in matched] == [1]
+    # 等価フィールドが一致しないトリガーの述語は評価しない
+    assert calls == [1]
+    assert index.match("player", {"kind": "quit", "count": 0}) == []
+    assert index.match("player", {"count": 2}) == []
+
+
+def test_in_conditions_are_indexed_by_every_value():
+    index = TriggerIndex()
+    compiled = index.upsert("t", {"kind": {"$in": ["join", "quit"]}}, event_type="player")
+    assert (compiled.index_field, compiled.index_values) == ("kind", ["join", "quit"])
+
+    assert [item.trigger_id for item in index.match("player", {"kind": "join"})] == ["t"]
+    assert [item.trigger_id for item in index.match("player", {"kind": "quit"})] == ["t"]
+    assert index.match("player", {"kind": "chat"}) == []
+
+
+def test_unindexable_conditions_are_always_candidates():
+    index = TriggerIndex()
+    compiled = index.upsert("t", {"count": {"$gt": 3}, "tags": ["a"]}, event_type="player")
+    assert compiled.index_field is None
+
+    assert [item.trigger_id for item in index.match("player", {"count": 4, "tags": ["a"]})] == ["t"]
+    assert index.match("player", {"count": 2, "tags": ["a"]}) == []
+
+
+def test_event_type_routing():
+    index = TriggerIndex()
+    index.upsert("typed", {"event_type": "chat", "kind": "say"})
+    index.upsert("any", {"kind": "say"})
+    assert index.upsert("explicit", {"event_type": "chat"}, event_type="block").event_type == "block"
+
+    assert sorted(item.trigger_id for item in index.match("chat", {"kind": "say"})) == ["any", "typed"]
+    assert [item.trigger_id for item in index.match("player", {"kind": "say"})] == ["any"]
+    assert index.upsert("any", {"kind": "say"}).event_type == ANY_EVENT_TYPE
+
+
+def test_upsert_replaces_and_remove_clears_the_index():
+    index = TriggerIndex()
+    index.upsert("t", {"kind": "join"}, event_type="player", payload="old")
+    index.upsert("t", {"kind": "quit"}, event_type="player", payload="new")
+
+    assert len(index) == 1
+    assert index.match("player", {"kind": "join"}) == []
+    assert [item.payload for item in index.match("player", {"kind": "quit"})] == ["new"]
+
+    assert index.remove("t") is True
+    assert index.remove("t") is False
+    assert "t" not in index
+    assert index.match("player", {"kind": "quit"}) == []
+    # 空になったバケットは残らない
+    assert index._buckets == {}
+
+
+def test_triggers_sharing_a_field_keep_the_getter_until_the_last_is_removed():
+    index = TriggerIndex()
+    index.upsert("a", {"kind": "join"}, event_type="player")
+    index.upsert("b", {"kind": "join"}, event_type="player")
+    index.remove("a")
+
+    assert [item.trigger_id for item in index.match("player", {"kind": "join"})] == ["b"]
+
+
+def test_unhashable_event_values_do_not_break_matching():
+    index = TriggerIndex()
+    index.upsert("t", {"kind": "join"}, event_type="player")
+
+    assert index.match("player", {"kind": ["join"]}) == []
@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("websockets")
+magic_effects = pytest.importorskip("app.api.magic_effects")
+
+from app.core.effect_engine import EffectEngine  # noqa: E402
+from app.core.effect_lifecycle import EFFECT_EXPIRED_EVENT, EffectLifecycleManager  # noqa: E402
+from app.core.event_system import EventSystem  # noqa: E402
+from app.core.id_generator import SnowflakeIdGenerator  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self, succeeds=True):
+        self.sent = []
+        self.succeeds = succeeds
+
+    async def send_effect(self, effect):
+        self.sent.append(effect)
+        return self.succeeds
+
+
+def make_engine(system, clock):
+    return EffectEngine(
+        seed=0,
+        id_generator=SnowflakeIdGenerator(worker_id=1),
+        lifecycle=EffectLifecycleManager(event_system=system, clock=clock)
+    )
+
+
+def test_triggered_effect_is_activated_and_expiry_reaches_listeners(monkeypatch):
+    async def scenario():
+        now = [0.0]
+        system = EventSystem()
+        engine = make_engine(system, lambda: now[0])
+        connection = FakeConnection()
+        monkeypatch.setattr(magic_effects, "effect_engine", engine)
+        monkeypatch.setattr(magic_effects, "minecraft_connection", connection)
+        expired = []
+        await system.add_listener(EFFECT_EXPIRED_EVENT, expired.append)
+        await magic_effects.setup_effect_handlers(system)
+
+        await system.trigger_effect("particle", {"effect_type": "particle", "duration": 2.0})
+        [effect] = connection.sent
+        assert engine.get_active_effect(effect["id"]) is not None
+
+        now[0] = 5.0
+        assert engine.lifecycle.expire_due() == [effect["id"]]
+        await asyncio.sleep(0)
+        await asyncio.gather(*engine.lifecycle._emit_tasks)
+        return effect, expired
+
+    effect, expired = asyncio.run(scenario())
+    assert [event.data["effect_id"] for event in expired] == [effect["id"]]
+    assert expired[0].data["reason"] == "expired"
+
+
+def test_effect_that_fails_to_send_is_not_left_active(monkeypatch):
+    async def scenario():
+        system = EventSystem()
+        engine = make_engine(system, lambda: 0.0)
+        monkeypatch.setattr(magic_effects, "effect_engine", engine)
+        monkeypatch.setattr(magic_effects, "minecraft_connection", FakeConnection(succeeds=False))
+        await magic_effects.setup_effect_handlers(system)
+
+        await system.trigger_effect("light", {"duration": 2.0})
+        return engine
+
+    engine = asyncio.run(scenario())
+    assert engine.lifecycle.active() == []
+
+
+def test_trigger_system_listens_on_the_shared_event_system():
+    triggers = pytest.importorskip("app.api.event_triggers")
+    from app.core.event_system import event_system
+
+    assert triggers.EventTriggerSystem().event_system is event_system
+
+
+class FakeMinecraftConnection:
+    instances = []
+
+    def __init__(self, host, port, password):
+        self.host, self.port, self.password = host, port, password
+        self.closed = False
+        FakeMinecraftConnection.instances.append(self)
+
+    async def connect(self):
+        return True
+
+    def rcon_latency(self, max_age=5.0):
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+def test_minecraft_connection_uses_the_configured_password_and_is_closed(monkeypatch):
+    settings = SimpleNamespace(MINECRAFT_HOST="mc.local", MINECRAFT_RCON_PASSWORD="secret")
+    monkeypatch.setattr(magic_effects, "get_settings", lambda: settings)
+    monkeypatch.setattr(magic_effects, "MinecraftConnection", FakeMinecraftConnection)
+    monkeypatch.setattr(magic_effects, "effect_engine", None)
+    monkeypatch.setattr(magic_effects, "minecraft_connection", None)
+    monkeypatch.setattr(magic_effects.effect_admission.controller, "latency", None)
+
+    async def scenario():
+        connection = await magic_effects.setup_minecraft_connection()
+        assert magic_effects.effect_admission.controller.latency == connection.rcon_latency
+        await magic_effects.shutdown_event()
+        return connection
+
+    connection = asyncio.run(scenario())
+    assert (connection.host, connection.port, connection.password) == ("mc.local", 25575, "secret")
+    assert connection.closed
+
+
+def test_minecraft_connection_requires_a_password(monkeypatch):
+    monkeypatch.setattr(magic_effects, "get_settings", lambda: SimpleNamespace())
+    monkeypatch.setattr(magic_effects, "minecraft_connection", None)
+    monkeypatch.setattr(magic_effects, "MinecraftConnection", FakeMinecraftConnection)
+
+    with pytest.raises(ValueError):
+        asyncio.run(magic_effects.setup_minecraft_connection())
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.core.effect_coalescer import EffectCoalescer, effect_content_key
+
+
+def make_effect(effect_id, effect_type="particle", **parameters):
+    return {"id": effect_id, "type": effect_type, "parameters": parameters}
+
+
+class RecordingSender:
+    """送信されたエフェクト列を記録し、エフェクトIDをレスポンスとして返す"""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, effects):
+        self.batches.append([dict(effect, parameters=dict(effect["parameters"])) for effect in effects])
+        if self.error is not None:
+            raise self.error
+        return [f"ok:{effect['id']}" for effect in effects]
+
+
+def test_content_key_ignores_the_effect_id_and_parameter_order():
+    first = make_effect("a", duration=5, intensity=2)
+    second = {"id": "b", "type": "particle", "parameters": {"intensity": 2, "duration": 5}}
+
+    assert effect_content_key(first) == effect_content_key(second)
+    assert effect_content_key(first) != effect_content_key(make_effect("c", duration=6, intensity=2))
+    assert effect_content_key(first) != effect_content_key(make_effect("d", "sound", duration=5, intensity=2))
+
+
+def test_identical_effects_are_sent_once_and_share_the_response():
+    sender = RecordingSender()
+
+    async def scenario():
+        coalescer = EffectCoalescer(sender, window=0.01)
+        return coalescer, await asyncio.gather(
+            coalescer.submit(make_effect("a", duration=5)),
+            coalescer.submit(make_effect("b", duration=5)),
+            coalescer.submit(make_effect("c", duration=5))
+        )
+
+    coalescer, responses = asyncio.run(scenario())
+    assert responses == ["ok:a", "ok:a", "ok:a"]
+    assert sender.batches == [[make_effect("a", duration=5)]]
+    stats = coalescer.stats
+    assert (stats.submitted, stats.sent, stats.duplicates, stats.suppressed) == (3, 1, 2, 2)
+
+
+def test_effects_of_the_same_type_keep_their_own_parameters():
+    sender = RecordingSender()
+    effects = [
+        make_effect("a", duration=5, intensity=1),
+        make_effect("b", duration=30, intensity=1),
+        make_effect("c", duration=5, intensity=9)
+    ]
+
+    async def scenario():
+        coalescer = EffectCoalescer(sender, window=0.01)
+        return coalescer, await coalescer.submit_many(effects)
+
+    coalescer, responses = asyncio.run(scenario())
+    # タイプが同じでも duration や intensity は指定どおりに送信される
+    assert responses == ["ok:a", "ok:b", "ok:c"]
+    assert sender.batches == [effects]
+    assert coalescer.stats.duplicates == 0
+
+
+def test_submitted_effects_are_not_modified():
+    sender = RecordingSender()
+    effect = make_effect("a", duration=5)
+
+    async def scenario():
+        coalescer = EffectCoalescer(sender, window=0.01)
+        await coalescer.submit(effect)
+
+    asyncio.run(scenario())
+    assert sender.batches[0][0] is not effect
+    assert effect == make_effect("a", duration=5)
+
+
+def test_sender_errors_reach_every_grouped_caller():
+    sender = RecordingSender(error=ConnectionError("rcon down"))
+
+    async def scenario():
+        coalescer = EffectCoalescer(sender, window=0.01)
+        return await coalescer.submit_many([make_effect("a"), make_effect("b"), make_effect("c", "sound")])
+
+    responses = asyncio.run(scenario())
+    assert len(responses) == 3
+    assert all(isinstance(response, ConnectionError) for response in responses)
+
+
+def test_flush_sends_without_waiting_for_the_window():
+    sender = RecordingSender()
+
+    async def scenario():
+        coalescer = EffectCoalescer(sender, window=10.0)
+        pending = asyncio.ensure_future(coalescer.submit(make_effect("a")))
+        await asyncio.sleep(0)
+        await coalescer.close()
+        return await asyncio.wait_for(pending, timeout=1.0)
+
+    assert asyncio.run(scenario()) == "ok:a"
+    assert len(sender.batches) == 1
+
+
+def test_missing_responses_resolve_to_none():
+    async def short_sender(effects):
+        return ["ok"]
+
+    async def scenario():
+        coalescer = EffectCoalescer(short_sender, window=0.01)
+        return await coalescer.submit_many([make_effect("a"), make_effect("b", "sound")])
+
+    assert asyncio.run(scenario()) == ["ok", None]
+
+
+def test_negative_window_is_rejected():
+    with pytest.raises(ValueError):
+        EffectCoalescer(RecordingSender(), window=-1)
@@ -0,0 +1,102 @@
+import pytest
+
+from app.core.effect_engine import EffectEngine
+from app.core.id_generator import SnowflakeIdGenerator
+
+
+def make_engine():
+    return EffectEngine(seed=0, id_generator=SnowflakeIdGenerator(worker_id=1))
+
+
+def test_templates_are_cached_per_parameter_set():
+    engine = make_engine()
+    engine.create_particle_effect({'color': '#FF0000'})
+    engine.create_particle_effect({'color': '#FF0000'})
+    engine.create_particle_effect({'color': '#00FF00'})
+
+    info = engine.template_cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_template_key_distinguishes_equal_values_of_different_types():
+    engine = make_engine()
+    # 1 == 1.0 == True でも、呼び出し元が渡した型のまま返す
+    for value in (1, 1.0, True):
+        effect = engine.create_light_effect({'duration': value})
+        assert type(effect['parameters']['duration']) is type(value)
+    assert engine.template_cache_info().misses == 3
+
+
+def test_unhashable_parameters_bypass_the_cache():
+    engine = make_engine()
+    effect = engine.create_particle_effect({'color': ['#FF0000']})
+
+    assert effect['parameters']['color'] == ['#FF0000']
+    assert engine.template_cache_info().currsize == 0
+
+
+def test_returned_effects_do_not_share_the_cached_template():
+    engine = make_engine()
+    first = engine.create_sound_effect({'intensity': 0.5})
+    first['parameters']['volume'] = 0.0
+    first['parameters']['extra'] = True
+
+    second = engine.create_sound_effect({'intensity': 0.5})
+    assert second['parameters']['volume'] == 0.5
+    assert 'extra' not in second['parameters']
+    assert second['id'] != first['id']
+
+
+def test_bulk_effects_are_copied_when_iterated():
+    engine = make_engine()
+    batch = engine.create_effects_bulk('particle', 3, {'color': '#123456'})
+    effects = list(batch)
+    effects[0]['parameters']['color'] = 'changed'
+
+    assert batch.fixed['color'] == '#123456'
+    assert [effect['parameters']['color'] for effect in effects[1:]] == ['#123456', '#123456']
+    assert engine.create_particle_effect({'color': '#123456'})['parameters']['color'] == '#123456'
+
+
+def test_bulk_effects_match_the_single_effect_format():
+    engine = make_engine()
+    batch = engine.create_effects_bulk('particle', 200, {'color': '#123456', 'duration': 2.0})
+    effects = list(batch)
+
+    assert len(batch) == len(effects) == 200
+    assert len({effect['id'] for effect in effects}) == 200
+    single = engine.create_particle_effect({'color': '#123456', 'duration': 2.0})
+    assert all(effect.keys() == single.keys() for effect in effects)
+    assert all(effect['parameters'].keys() == single['parameters'].keys() for effect in effects)
+    counts = [effect['parameters']['particles_count'] for effect in effects]
+    assert all(type(count) is int and 10 <= count <= 50 for count in counts)
+
+
+def test_bulk_random_values_are_reproducible_with_a_seed():
+    engine = make_engine()
+    first = engine.create_effects_bulk('sound', 50, seed=42)
+    second = engine.create_effects_bulk('sound', 50, seed=42)
+    unseeded = engine.create_effects_bulk('sound', 50)
+
+    assert list(first.random_values) == list(second.random_values)
+    assert list(unseeded.random_values) != list(first.random_values)
+    assert all(200 <= value <= 2000 for value in first.random_values)
+    # IDはシードに関係なく毎回新しく払い出す
+    assert set(first.ids).isdisjoint(second.ids)
+
+
+def test_bulk_columns_keep_shared_parameters_as_scalars():
+    engine = make_engine()
+    columns = engine.create_effects_bulk('light', 3, {'intensity': 0.4}).columns()
+
+    assert len(columns['id']) == len(columns['radius']) == 3
+    assert (columns['intensity'], columns['duration'], columns['color']) == (0.4, 1.5, '#FFFF00')
+
+
+def test_bulk_rejects_invalid_arguments():
+    engine = make_engine()
+    assert list(engine.create_effects_bulk('particle', 0)) == []
+    with pytest.raises(ValueError):
+        engine.create_effects_bulk('particle', -1)
+    with pytest.raises(ValueError):
+        engine.create_effects_bulk('smoke', 1)
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.core.effect_lifecycle import (
+    EFFECT_EXPIRED_EVENT,
+    EffectCapacityError,
+    EffectLifecycleManager,
+    EvictionPolicy,
+)
+from app.core.event_system import EventSystem
+
+
+def make_effect(effect_id, duration=2, effect_type="particle"):
+    return {"type": effect_type, "id": effect_id, "parameters": {"color": "#ff8800", "duration": duration, "intensity": 0.5}}
+
+
+def make_manager(**options):
+    now = [0.0]
+    events = EventSystem()
+    expired = []
+    events.register_handler(EFFECT_EXPIRED_EVENT, lambda event: expired.append(event.data))
+    manager = EffectLifecycleManager(event_system=events, tick=1.0, slots=8, clock=lambda: now[0], **options)
+    return manager, now, expired
+
+
+def run_and_publish(manager, action):
+    """イベントループ上で action を実行し、effect_expired の発行を待つ"""
+    async def scenario():
+        result = action()
+        await asyncio.gather(*manager._emit_tasks)
+        return result
+
+    return asyncio.run(scenario())
+
+
+def test_effects_expire_after_their_duration():
+    manager, now, expired = make_manager()
+    manager.register(make_effect("short", duration=2))
+    manager.register(make_effect("long", duration=5))
+
+    now[0] = 1.0
+    assert run_and_publish(manager, manager.expire_due) == []
+    now[0] = 2.0
+    assert run_and_publish(manager, manager.expire_due) == ["short"]
+    assert "short" not in manager and "long" in manager
+
+    now[0] = 6.0
+    assert run_and_publish(manager, manager.expire_due) == ["long"]
+    assert len(manager) == 0
+    assert [(data["effect_id"], data["reason"]) for data in expired] == [("short", "expired"), ("long", "expired")]
+    assert expired[0]["effect"]["parameters"]["duration"] == 2
+    assert manager.metrics().expired == 2
+
+
+def test_explicit_duration_overrides_the_parameters():
+    manager, now, _ = make_manager()
+    manager.register(make_effect("a", duration=60), duration=1)
+    manager.register(make_effect("forever", duration=60), duration=0)
+
+    now[0] = 1000.0
+    assert run_and_publish(manager, manager.expire_due) == ["a"]
+    # duration が0以下のエフェクトは終了しない
+    assert [view["id"] for view in manager.active()] == ["forever"]
+
+
+def test_re_registering_restarts_the_timer():
+    manager, now, expired = make_manager()
+    manager.register(make_effect("a", duration=2))
+    now[0] = 1.0
+    assert run_and_publish(manager, manager.expire_due) == []
+    manager.register(make_effect("a", duration=3))
+
+    now[0] = 3.0
+    assert run_and_publish(manager, manager.expire_due) == []
+    now[0] = 4.0
+    assert run_and_publish(manager, manager.expire_due) == ["a"]
+    assert len(expired) == 1
+
+
+def test_cancelled_effects_do_not_expire_later():
+    manager, now, expired = make_manager()
+    manager.register(make_effect("a", duration=2))
+
+    assert run_and_publish(manager, lambda: manager.cancel("a")) is True
+    assert manager.cancel("a") is False
+    now[0] = 5.0
+    assert run_and_publish(manager, manager.expire_due) == []
+    assert [data["reason"] for data in expired] == ["cancelled"]
+    assert (manager.metrics().cancelled, manager.metrics().expired) == (1, 0)
+
+
+def test_oldest_effect_is_evicted_at_capacity():
+    manager, now, expired = make_manager(max_active=2)
+    manager.register(make_effect("a"))
+    manager.register(make_effect("b"))
+
+    run_and_publish(manager, lambda: manager.register(make_effect("c")))
+    assert [view["id"] for view in manager.active()] == ["b", "c"]
+    assert [(data["effect_id"], data["reason"]) for data in expired] == [("a", "evicted")]
+
+    # 退去したエフェクトのタイマーは取り消されている
+    now[0] = 5.0
+    assert sorted(run_and_publish(manager, manager.expire_due)) == ["b", "c"]
+
+
+def test_reject_policy_refuses_new_effects_at_capacity():
+    manager, _, _ = make_manager(max_active=1, eviction=EvictionPolicy.REJECT)
+    manager.register(make_effect("a"))
+
+    with pytest.raises(EffectCapacityError):
+        manager.register(make_effect("b"))
+    # 登録済みのエフェクトの更新は上限に数えない
+    manager.register(make_effect("a", duration=9))
+    assert manager.get("a")["parameters"]["duration"] == 9
+
+
+def test_expiry_loop_runs_until_stopped():
+    async def scenario():
+        events = EventSystem()
+        expired = []
+        events.register_handler(EFFECT_EXPIRED_EVENT, lambda event: expired.append(event.data["effect_id"]))
+        manager = EffectLifecycleManager(event_system=events, tick=0.01)
+        await manager.start()
+        manager.register(make_effect("a", duration=0.02))
+        for _ in range(100):
+            if expired:
+                break
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return manager, expired
+
+    manager, expired = asyncio.run(scenario())
+    assert expired == ["a"]
+    assert manager._task is None
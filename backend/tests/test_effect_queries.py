@@ -0,0 +1,62 @@
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database.base import Base  # noqa: E402
+from app.models.effect import Effect, EffectParameter, EffectPreset, serialize_effects  # noqa: E402
+
+EFFECT_COUNT = 30
+
+
+@pytest.fixture
+def engine():
+    engine = sqlalchemy.create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine,
+        tables=[Effect.__table__, EffectParameter.__table__, EffectPreset.__table__]
+    )
+    with Session(engine) as db:
+        for index in range(EFFECT_COUNT):
+            effect = Effect(name=f"effect-{index}", type="particle", description=None)
+            effect.parameters = [
+                EffectParameter(name="intensity", type="number", default_value="0.5", min_value=0, max_value=1),
+                EffectParameter(name="color", type="color", default_value="#FFFFFF"),
+            ]
+            effect.presets = [EffectPreset(name=f"preset-{index}", settings={"intensity": 0.8})]
+            db.add(effect)
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def test_serialize_effects_uses_constant_queries(engine, assert_max_queries):
+    with Session(engine) as db:
+        with assert_max_queries(engine, 3):
+            rows = serialize_effects(db, include_presets=True)
+
+    with Session(engine) as db:
+        expected = []
+        for effect in db.query(Effect).order_by(Effect.id):
+            item = effect.to_dict()
+            item["presets"] = [preset.to_dict() for preset in effect.presets]
+            expected.append(item)
+
+    assert len(rows) == EFFECT_COUNT
+    assert rows == expected
+
+
+def test_lazy_to_dict_is_caught_as_n_plus_one(engine, assert_max_queries):
+    with Session(engine) as db:
+        with pytest.raises(AssertionError):
+            with assert_max_queries(engine, 3):
+                [effect.to_dict() for effect in db.query(Effect)]
+
+
+def test_serialize_effects_pages_by_id(engine, assert_max_queries):
+    with Session(engine) as db:
+        with assert_max_queries(engine, 2):
+            rows = serialize_effects(db, include_presets=False, after=10, limit=5)
+    assert [row["id"] for row in rows] == [11, 12, 13, 14, 15]
+    assert all("presets" not in row and len(row["parameters"]) == 2 for row in rows)
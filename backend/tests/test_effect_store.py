@@ -0,0 +1,55 @@
+import pytest
+
+from app.core.effect_store import ActiveEffectStore, EffectRecord, pack_color
+
+
+def exact(value):
+    """値と型を再帰的に比較するための表現"""
+    if isinstance(value, dict):
+        return {key: exact(item) for key, item in value.items()}
+    return (type(value), value)
+
+
+@pytest.mark.parametrize("effect", [
+    {"type": "particle", "id": "a", "parameters": {"color": "#ff8800", "duration": 60, "intensity": 0.5, "particles_count": 12}},
+    {"type": "particle", "id": "b", "parameters": {"color": "#FF8800", "duration": 1.5, "intensity": 1, "particles_count": 12.0}},
+    {"type": "sound", "id": "c", "parameters": {"volume": 0.8, "duration": 2, "frequency": 440}},
+    {"type": "light", "id": "d", "parameters": {"color": "#123456", "intensity": 0.9, "duration": 1.5, "radius": 2.5}},
+])
+def test_view_returns_the_added_values(effect):
+    store = ActiveEffectStore()
+    store.add(effect)
+
+    assert store.get(effect["id"]) is not None
+    assert exact(store.view(effect["id"]).to_dict()) == exact(effect)
+    assert exact(EffectRecord.from_dict(effect).to_dict()) == exact(effect)
+
+
+@pytest.mark.parametrize("effect", [
+    # 大文字・小文字が混在した色
+    {"type": "particle", "id": "a", "parameters": {"color": "#Ff8800", "duration": 1.0, "intensity": 0.5, "particles_count": 12}},
+    # 型付き列にないパラメータ
+    {"type": "light", "id": "b", "parameters": {"color": "#FFFFFF", "intensity": 0.9, "duration": 1.5, "radius": 2.5, "pulse": True}},
+    # 色のないパーティクル
+    {"type": "particle", "id": "c", "parameters": {"duration": 1.0, "intensity": 0.5, "particles_count": 12}},
+    # bool は数値として扱わない
+    {"type": "sound", "id": "d", "parameters": {"volume": True, "duration": 2.0, "frequency": 440.0}},
+    # 不正な色
+    {"type": "particle", "id": "e", "parameters": {"color": "#-12345", "duration": 1.0, "intensity": 0.5, "particles_count": 12}},
+])
+def test_effects_that_cannot_round_trip_are_kept_as_is(effect):
+    store = ActiveEffectStore()
+    store.add(effect)
+
+    assert store.get(effect["id"]) is None
+    assert store.view(effect["id"]).to_dict() == effect
+
+
+@pytest.mark.parametrize("color", ["#-12345", "#+12345", "#1_2345", "# 12345", "#GGGGGG", "FF0000", "#FFF", None])
+def test_pack_color_rejects_invalid_colors(color):
+    with pytest.raises(ValueError):
+        pack_color(color)
+
+
+def test_pack_color():
+    assert pack_color("#ff8800") == pack_color("#FF8800") == 0xFF8800
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.core.event_queue import EventPriority, LaneQueue, default_priority
+from app.core.event_system import Event
+
+
+def event(event_type, index=0, priority=None, **data):
+    return Event(type=event_type, data={"index": index, **data}, priority=priority)
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_default_priority_order():
+    assert default_priority(event("user_action", severity="critical", priority=EventPriority.LOW)) == EventPriority.LOW
+    assert default_priority(event("user_action", severity="critical")) == EventPriority.CRITICAL
+    assert default_priority(event("system_alert")) == EventPriority.HIGH
+    assert default_priority(event("user_action")) == EventPriority.LOW
+    assert default_priority(event("particle")) == EventPriority.NORMAL
+
+
+def test_critical_events_are_always_taken_first():
+    queue = LaneQueue()
+    for index in range(3):
+        queue.put_nowait(event("system_alert", index))
+    queue.put_nowait(event("particle", severity="critical"))
+
+    assert queue.get_nowait().data["severity"] == "critical"
+    queue.put_nowait(event("sound", priority=EventPriority.CRITICAL))
+    assert queue.get_nowait().type == "sound"
+    assert [item.type for item in drain(queue)] == ["system_alert"] * 3
+
+
+def test_lanes_are_served_by_weighted_round_robin():
+    queue = LaneQueue(lane_weights={EventPriority.HIGH: 2, EventPriority.NORMAL: 1, EventPriority.LOW: 1})
+    for index in range(4):
+        queue.put_nowait(event("user_action", index))
+        queue.put_nowait(event("particle", index))
+        queue.put_nowait(event("system_alert", index))
+
+    priorities = [default_priority(item).name for item in drain(queue)]
+    # HIGHが2回、NORMALとLOWが1回ずつ順番に取り出され、LOWも飢餓状態にならない
+    assert priorities[:8] == ["HIGH", "HIGH", "NORMAL", "LOW"] * 2
+    assert priorities[8:] == ["NORMAL", "LOW", "NORMAL", "LOW"]
+
+
+def test_event_types_take_turns_within_a_lane():
+    queue = LaneQueue()
+    for index in range(3):
+        queue.put_nowait(event("particle", index))
+    queue.put_nowait(event("sound", 0))
+    queue.put_nowait(event("light", 0))
+
+    items = drain(queue)
+    # 大量のparticleがあっても他のタイプは後回しにされない
+    assert [item.type for item in items] == ["particle", "sound", "light", "particle", "particle"]
+    assert [item.data["index"] for item in items if item.type == "particle"] == [0, 1, 2]
+
+
+def test_drop_one_takes_the_oldest_event_of_the_busiest_type_in_the_lowest_lane():
+    queue = LaneQueue()
+    queue.put_nowait(event("system_alert", 0))
+    queue.put_nowait(event("particle", 0))
+    queue.put_nowait(event("user_action", 0))
+    queue.put_nowait(event("user_action", 1))
+    queue.put_nowait(event("user_login", 0, priority=EventPriority.LOW))
+
+    dropped = queue.drop_one()
+    assert (dropped.type, dropped.data["index"]) == ("user_action", 0)
+    assert queue.qsize() == 4
+
+    queue.drop_one()
+    queue.drop_one()
+    # LOWレーンが空になると次に優先度の低いレーンから捨てる
+    assert queue.drop_one().type == "particle"
+    assert [item.type for item in drain(queue)] == ["system_alert"]
+
+
+def test_drop_one_on_an_empty_queue_raises():
+    queue = LaneQueue()
+    with pytest.raises(asyncio.QueueEmpty):
+        queue.drop_one()
+
+
+def test_drop_one_frees_space_and_finishes_the_task():
+    async def scenario():
+        queue = LaneQueue(maxsize=2)
+        queue.put_nowait(event("particle", 0))
+        queue.put_nowait(event("particle", 1))
+        assert queue.full()
+
+        queue.drop_one()
+        queue.put_nowait(event("particle", 2))
+        for _ in range(2):
+            await queue.get()
+            queue.task_done()
+        # 捨てたイベントも完了扱いになるため join() が返る
+        await asyncio.wait_for(queue.join(), timeout=1.0)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.metrics()["normal"].dropped == 1
+
+
+def test_metrics_are_reported_per_lane():
+    queue = LaneQueue()
+    queue.put_nowait(event("particle", 0))
+    queue.put_nowait(event("particle", 1))
+    queue.put_nowait(event("sound", 0))
+    queue.put_nowait(event("system_alert", 0))
+    queue.get_nowait()
+
+    metrics = queue.metrics()
+    assert set(metrics) == {"critical", "high", "normal", "low"}
+    assert (metrics["high"].enqueued, metrics["high"].dequeued, metrics["high"].depth) == (1, 1, 0)
+    assert metrics["normal"].depth == 3
+    assert metrics["normal"].depth_by_type == {"particle": 2, "sound": 1}
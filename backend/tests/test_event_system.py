@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.event_system import BackpressurePolicy, DispatchMode, Event, EventQueueFullError, EventSystem
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5.0))
+
+
+def test_wait_all_collects_every_handler_result():
+    async def ok(event):
+        return event.data["value"]
+
+    async def broken(event):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        events = EventSystem()
+        events.register_handler("tick", ok)
+        events.register_handler("tick", broken)
+        return await events.process_event(Event(type="tick", data={"value": 3}))
+
+    dispatch = run(scenario())
+    assert dispatch.pending == 0
+    ok_result, broken_result = dispatch.results
+    assert ok_result.succeeded and ok_result.result == 3
+    assert not broken_result.succeeded
+    assert isinstance(broken_result.error, RuntimeError)
+    assert not broken_result.timed_out
+
+
+def test_fire_and_forget_returns_before_handlers_finish():
+    finished = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(event):
+            await release.wait()
+            finished.append(event.type)
+
+        events = EventSystem()
+        events.register_handler("tick", slow)
+        dispatch = await events.process_event(Event(type="tick", data={}), mode=DispatchMode.FIRE_AND_FORGET)
+        assert dispatch.pending == 1 and dispatch.results == []
+        release.set()
+        while events._background_tasks:
+            await asyncio.sleep(0)
+        return dispatch
+
+    run(scenario())
+    assert finished == ["tick"]
+
+
+def test_wait_first_n_returns_the_fastest_handlers():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fast(event):
+            return "fast"
+
+        async def slow(event):
+            await release.wait()
+            return "slow"
+
+        events = EventSystem()
+        events.register_handler("tick", slow)
+        events.register_handler("tick", fast)
+        dispatch = await events.process_event(Event(type="tick", data={}), mode=DispatchMode.WAIT_FIRST_N, first_n=1)
+        release.set()
+        return dispatch
+
+    dispatch = run(scenario())
+    assert [result.result for result in dispatch.results] == ["fast"]
+    assert dispatch.pending == 1
+
+
+def test_async_handler_timeout_is_reported():
+    async def stuck(event):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        events = EventSystem(handler_timeout=0.05)
+        events.register_handler("tick", stuck)
+        return await events.process_event(Event(type="tick", data={}))
+
+    result, = run(scenario()).results
+    assert result.timed_out
+    assert not result.succeeded
+
+
+def test_sync_handlers_run_off_the_event_loop_with_a_timeout():
+    loop_thread = threading.get_ident()
+    handler_threads = []
+
+    def blocking(event):
+        handler_threads.append(threading.get_ident())
+        time.sleep(0.2)
+
+    async def scenario():
+        events = EventSystem(handler_timeout=0.05)
+        events.register_handler("tick", blocking)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        dispatch = await events.process_event(Event(type="tick", data={}))
+        task.cancel()
+        return dispatch, ticks
+
+    dispatch, ticks = run(scenario())
+    assert dispatch.results[0].timed_out
+    assert handler_threads and handler_threads[0] != loop_thread
+    # ハンドラーの実行中もイベントループは動き続ける
+    assert ticks >= 2
+
+
+def test_nested_inline_publish_does_not_exhaust_the_handler_slots():
+    seen = []
+
+    async def scenario():
+        events = EventSystem(max_concurrency=1)
+
+        async def outer(event):
+            depth = event.data["depth"]
+            seen.append(depth)
+            if depth < 3:
+                await events.publish(Event(type="nested", data={"depth": depth + 1}))
+
+        events.register_handler("nested", outer)
+        await events.publish(Event(type="nested", data={"depth": 0}))
+
+    run(scenario())
+    assert seen == [0, 1, 2, 3]
+
+
+def test_nested_publish_returns_the_slot_to_the_caller():
+    async def scenario():
+        events = EventSystem(max_concurrency=2)
+
+        async def outer(event):
+            await events.publish(Event(type="inner", data={}))
+
+        async def inner(event):
+            return None
+
+        events.register_handler("outer", outer)
+        events.register_handler("inner", inner)
+        await events.publish(Event(type="outer", data={}))
+        return events._handler_slots._value
+
+    assert run(scenario()) == 2
+
+
+def test_trigger_effect_dispatches_each_event_once():
+    async def scenario():
+        events = EventSystem(worker_count=2)
+        seen = []
+        events.register_handler("particle", lambda event: seen.append(event.data["parameters"]["n"]))
+        # ワーカーの起動前はその場で処理する
+        await events.trigger_effect("particle", {"n": 0})
+        await events.start()
+        for n in range(1, 4):
+            await events.trigger_effect("particle", {"n": n})
+        await events.stop()
+        return seen
+
+    assert sorted(run(scenario())) == [0, 1, 2, 3]
+
+
+def test_stop_drains_the_queue_before_stopping_the_workers():
+    async def scenario():
+        events = EventSystem(worker_count=1)
+        seen = []
+
+        async def slow(event):
+            await asyncio.sleep(0.01)
+            seen.append(event.data["n"])
+
+        events.register_handler("tick", slow)
+        await events.start()
+        for n in range(3):
+            await events.publish(Event(type="tick", data={"n": n}))
+        queued = events.queue_depth()
+        await events.stop()
+        return queued, seen, events._workers
+
+    queued, seen, workers = run(scenario())
+    assert queued >= 2
+    assert seen == [0, 1, 2]
+    assert workers == []
+
+
+async def fill_queue(events, release):
+    """唯一のワーカーを止めた状態で、長さ1のキューを満杯にする"""
+    async def stuck(event):
+        await release.wait()
+
+    events.register_handler("tick", stuck)
+    await events.start()
+    await events.publish(Event(type="tick", data={"n": 0}))
+    await asyncio.sleep(0)
+    await events.publish(Event(type="tick", data={"n": 1}))
+
+
+def test_full_queue_follows_the_backpressure_policy():
+    async def scenario(policy):
+        events = EventSystem(worker_count=1, queue_size=1, backpressure=policy)
+        release = asyncio.Event()
+        await fill_queue(events, release)
+        try:
+            if policy == BackpressurePolicy.REJECT:
+                with pytest.raises(EventQueueFullError):
+                    await events.publish(Event(type="tick", data={"n": 2}))
+                return events.dropped_events, None
+            accepted = await events.publish(Event(type="tick", data={"n": 2}), block=False)
+            queued = [event.data["n"] for event in events._event_queue._queue]
+            return events.dropped_events, (accepted, queued)
+        finally:
+            release.set()
+            await events.stop()
+
+    assert run(scenario(BackpressurePolicy.REJECT)) == (0, None)
+    assert run(scenario(BackpressurePolicy.DROP_OLDEST)) == (1, (True, [2]))
+    # BLOCKでも block=False の発行は待たずに捨てる
+    assert run(scenario(BackpressurePolicy.BLOCK)) == (1, (False, [1]))
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from app.api import event_triggers  # noqa: E402
+from app.core.condition_compiler import TriggerIndex  # noqa: E402
+from app.core.event_system import ALL_EVENTS, Event, EventSystem  # noqa: E402
+
+# 自分が発行したエフェクトイベントにも一致するトリガー
+SELF_MATCHING_ACTION = {"action_type": "effect", "parameters": {"effect_type": "sparkle"}}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = TriggerIndex()
+    index.upsert(1, {"event_type": "sparkle"}, payload=[SELF_MATCHING_ACTION])
+    monkeypatch.setattr(event_triggers, "trigger_index", index)
+    return index
+
+
+def make_system(events, seen):
+    system = event_triggers.EventTriggerSystem()
+    system.event_system = events
+
+    async def record(event):
+        seen.append((event.type, event.source))
+
+    events.register_handler(ALL_EVENTS, system.handle_event)
+    events.register_handler(ALL_EVENTS, record)
+    return system
+
+
+async def wait_for_events(seen, count):
+    # 停止を始めると新しいイベントは受け付けられないため、先に処理を待つ
+    while len(seen) < count:
+        await asyncio.sleep(0.01)
+
+
+def test_trigger_effects_are_not_matched_again(index):
+    seen = []
+
+    async def scenario():
+        events = EventSystem(worker_count=1, queue_size=10)
+        make_system(events, seen)
+        await events.start()
+        await events.publish(Event(type="sparkle", data={}))
+        await wait_for_events(seen, 2)
+        # 照合し直していればここで3件目以降が処理される
+        await asyncio.sleep(0.05)
+        await events.stop(timeout=1.0)
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5.0))
+    assert seen == [("sparkle", None), ("sparkle", event_triggers.TRIGGER_EVENT_SOURCE)]
+
+
+def test_trigger_effects_do_not_block_a_full_queue(index):
+    seen = []
+
+    async def scenario():
+        events = EventSystem(worker_count=1, queue_size=1)
+        make_system(events, seen)
+        await events.start()
+        # 2件目はワーカーが1件目を取り出すまで待ち、1件目の処理中はキューが満杯になる
+        await events.publish(Event(type="sparkle", data={}))
+        await events.publish(Event(type="other", data={}))
+        await wait_for_events(seen, 2)
+        await events.stop(timeout=1.0)
+        return events
+
+    events = asyncio.run(asyncio.wait_for(scenario(), timeout=5.0))
+    assert seen == [("sparkle", None), ("other", None)]
+    assert events.dropped_events == 1
+
+
+def test_inline_dispatch_does_not_wait_for_trigger_effects(index):
+    seen = []
+
+    async def scenario():
+        events = EventSystem(max_concurrency=1)
+        make_system(events, seen)
+        await events.publish(Event(type="sparkle", data={}))
+        # 派生したイベントは元のイベントのハンドラーが枠を返してから処理される
+        while events._background_tasks:
+            await asyncio.sleep(0)
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5.0))
+    assert seen == [("sparkle", None), ("sparkle", event_triggers.TRIGGER_EVENT_SOURCE)]
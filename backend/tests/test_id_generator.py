@@ -0,0 +1,97 @@
+import pytest
+
+from app.core import id_generator as id_module
+from app.core.id_generator import (
+    SnowflakeIdGenerator,
+    WorkerIdError,
+    WorkerIdLease,
+    default_worker_id,
+    parse_worker_range,
+)
+
+pytestmark = pytest.mark.skipif(id_module.fcntl is None, reason="worker ID leases require fcntl")
+
+
+def test_leases_in_the_same_directory_get_distinct_worker_ids(tmp_path):
+    leases = [WorkerIdLease(tmp_path, range(0, 4)) for _ in range(4)]
+    try:
+        assert sorted(lease.acquire() for lease in leases) == [0, 1, 2, 3]
+        with pytest.raises(WorkerIdError):
+            WorkerIdLease(tmp_path, range(0, 4)).acquire()
+    finally:
+        for lease in leases:
+            lease.release()
+
+
+def test_released_worker_id_can_be_acquired_again(tmp_path):
+    first = WorkerIdLease(tmp_path, range(7, 8))
+    assert first.acquire() == 7
+    first.release()
+
+    second = WorkerIdLease(tmp_path, range(7, 8))
+    assert second.acquire() == 7
+    second.release()
+
+
+def test_generator_acquires_worker_id_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.delenv(id_module.WORKER_ID_ENV, raising=False)
+    lease = WorkerIdLease(tmp_path, range(3, 5))
+    monkeypatch.setattr(id_module, "worker_id_lease", lease)
+    generator = SnowflakeIdGenerator()
+    assert generator.worker_id is None
+
+    generated = generator.next_id()
+    try:
+        assert generator.worker_id == 3
+        assert (generated >> id_module.SEQUENCE_BITS) & id_module.MAX_WORKER_ID == 3
+    finally:
+        lease.release()
+
+
+def test_configured_worker_id_is_not_used_after_fork(monkeypatch):
+    monkeypatch.setenv(id_module.WORKER_ID_ENV, "12")
+    assert default_worker_id() == 12
+
+    # fork した全ワーカーが同じ環境変数を引き継ぐため、子プロセスでは使わない
+    monkeypatch.setattr(id_module, "_forked", True)
+    with pytest.raises(WorkerIdError):
+        default_worker_id()
+
+
+@pytest.mark.parametrize("value", ["abc", "5-2", "0-1024", "-1"])
+def test_invalid_worker_range(value):
+    with pytest.raises(WorkerIdError):
+        parse_worker_range(value)
+
+
+def test_worker_range_is_inclusive():
+    assert parse_worker_range("16-31") == range(16, 32)
+    assert parse_worker_range("5") == range(5, 6)
+
+
+def test_lease_requires_a_worker_range(tmp_path, monkeypatch):
+    monkeypatch.delenv(id_module.WORKER_RANGE_ENV, raising=False)
+    # 範囲がなければ全ホストが0から確保してしまうため、確保せずに失敗する
+    with pytest.raises(WorkerIdError):
+        WorkerIdLease(tmp_path).acquire()
+
+    monkeypatch.setenv(id_module.WORKER_RANGE_ENV, "8-9")
+    lease = WorkerIdLease(tmp_path)
+    try:
+        assert lease.acquire() == 8
+    finally:
+        lease.release()
+
+
+def test_assign_worker_reports_configuration_errors_up_front(tmp_path, monkeypatch):
+    monkeypatch.delenv(id_module.WORKER_ID_ENV, raising=False)
+    monkeypatch.delenv(id_module.WORKER_RANGE_ENV, raising=False)
+    monkeypatch.setattr(id_module, "worker_id_lease", WorkerIdLease(tmp_path))
+    generator = SnowflakeIdGenerator()
+
+    with pytest.raises(WorkerIdError):
+        generator.assign_worker()
+
+    monkeypatch.setenv(id_module.WORKER_ID_ENV, "5")
+    assert generator.assign_worker() == 5
+    assert (generator.next_id() >> id_module.SEQUENCE_BITS) & id_module.MAX_WORKER_ID == 5
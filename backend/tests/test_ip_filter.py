@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+from app.core.ip_filter import IPFilter, IPRuleSet
+
+
+def test_ipv4_rules_apply_to_mapped_addresses():
+    rules = IPRuleSet(allow=["10.0.0.0/8"], deny=["10.1.0.0/16"])
+
+    assert rules.is_allowed("::ffff:10.2.3.4")
+    assert not rules.is_allowed("::ffff:10.1.3.4")
+
+
+def test_mapped_rules_apply_to_ipv4_addresses():
+    rules = IPRuleSet(allow=["::ffff:10.0.0.0/104"], deny=["::ffff:10.1.2.3"])
+
+    assert rules.is_allowed("10.2.3.4")
+    assert rules.is_allowed("::ffff:10.2.3.4")
+    assert not rules.is_allowed("10.1.2.3")
+    assert not rules.is_allowed("::ffff:10.1.2.3")
+    assert not rules.is_allowed("11.0.0.1")
+
+
+def test_ipv6_rules_covering_the_mapped_range_apply_to_ipv4():
+    rules = IPRuleSet(allow=["192.168.0.0/16"], deny=["::/0"], default_allow=True)
+
+    assert rules.is_allowed("192.168.1.1")
+    assert not rules.is_allowed("8.8.8.8")
+    assert not rules.is_allowed("::ffff:8.8.8.8")
+    assert not rules.is_allowed("2001:db8::1")
+
+    # 射影範囲を含まないIPv6ルールはIPv4に影響しない
+    assert IPRuleSet(deny=["2001:db8::/32"], default_allow=True).is_allowed("8.8.8.8")
+
+
+def test_watch_reloads_the_rule_file(tmp_path):
+    path = tmp_path / "ip-rules"
+    path.write_text("allow 10.0.0.0/8\n", encoding="utf-8")
+    ip_filter = IPFilter(path=path)
+    assert ip_filter.reload_file()
+    assert not ip_filter.is_allowed("192.168.1.1")
+
+    async def scenario():
+        await ip_filter.watch(interval=0.01)
+        path.write_text("allow 10.0.0.0/8\nallow 192.168.0.0/16\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        for _ in range(200):
+            if ip_filter.version == 2:
+                break
+            await asyncio.sleep(0.01)
+        await ip_filter.stop()
+
+    asyncio.run(scenario())
+    assert ip_filter.version == 2
+    assert ip_filter.is_allowed("192.168.1.1")
+
+
+def test_invalid_rule_file_keeps_the_current_rules(tmp_path):
+    path = tmp_path / "ip-rules"
+    path.write_text("allow 10.0.0.0/8\n", encoding="utf-8")
+    ip_filter = IPFilter(path=path)
+    ip_filter.reload_file()
+
+    path.write_text("allow not-a-network\n", encoding="utf-8")
+    assert not ip_filter.reload_file()
+    assert ip_filter.is_allowed("10.0.0.1")
+    assert ip_filter.version == 1
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.fernet import Fernet  # noqa: E402
+
+from app.core import key_ring as key_ring_module  # noqa: E402
+from app.core.key_ring import KeyRing, KeyRingError  # noqa: E402
+
+# PyJWTの鍵長の警告が出ない長さの署名鍵
+SIGNING_SECRET = "k1-" + "x" * 32
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in (key_ring_module.SIGNING_KEYS_ENV, key_ring_module.ENCRYPTION_KEYS_ENV, key_ring_module.SECRET_KEY_ENV):
+        monkeypatch.delenv(name, raising=False)
+
+
+def write_key_file(path, signing_keys, encryption_keys, active_kid=None):
+    content = {"signing_keys": signing_keys, "encryption_keys": encryption_keys}
+    if active_kid:
+        content["active_kid"] = active_kid
+    path.write_text(json.dumps(content), encoding="utf-8")
+
+
+def test_dropping_a_signing_key_keeps_encrypted_data_readable(tmp_path):
+    path = tmp_path / "keys.json"
+    encryption_key = Fernet.generate_key().decode()
+    write_key_file(path, {"old": "old-secret"}, [encryption_key])
+    ring = KeyRing(path=path)
+    token = ring.fernet.encrypt(b"data")
+
+    write_key_file(path, {"new": "new-secret", "old": "old-secret"}, [encryption_key], active_kid="new")
+    assert ring.load()
+    write_key_file(path, {"new": "new-secret"}, [encryption_key])
+    assert ring.load()
+
+    assert ring.kids == ["new"]
+    assert ring.fernet.decrypt(token) == b"data"
+
+
+def test_key_file_requires_encryption_keys(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"signing_keys": {"k1": "secret"}}), encoding="utf-8")
+
+    with pytest.raises(KeyRingError):
+        KeyRing(path=path).load()
+
+
+def test_signing_keys_env_requires_encryption_keys(monkeypatch):
+    monkeypatch.setenv(key_ring_module.SIGNING_KEYS_ENV, "k2:new,k1:old")
+    with pytest.raises(KeyRingError):
+        KeyRing().load()
+
+    monkeypatch.setenv(key_ring_module.ENCRYPTION_KEYS_ENV, Fernet.generate_key().decode())
+    ring = KeyRing()
+    assert ring.active_kid == "k2"
+    assert ring.kids == ["k2", "k1"]
+
+
+def test_single_secret_key_derives_the_encryption_key(monkeypatch):
+    monkeypatch.setenv(key_ring_module.SECRET_KEY_ENV, "secret")
+
+    token = KeyRing().fernet.encrypt(b"data")
+    assert KeyRing().fernet.decrypt(token) == b"data"
+
+
+def test_verify_token_rejects_unknown_and_invalid_tokens(tmp_path):
+    jwt = pytest.importorskip("jwt")
+    security = pytest.importorskip("app.core.security")
+    from fastapi import HTTPException
+
+    path = tmp_path / "keys.json"
+    write_key_file(path, {"k1": SIGNING_SECRET}, [Fernet.generate_key().decode()])
+    manager = security.SecurityManager()
+    manager.key_ring = KeyRing(path=path)
+
+    token = manager.generate_token({"sub": "user_1"})
+    assert manager.verify_token(token)["sub"] == "user_1"
+
+    expired = jwt.encode(
+        {"sub": "user_1", "exp": datetime.utcnow() - timedelta(minutes=1)}, SIGNING_SECRET, headers={"kid": "k1"}
+    )
+    cases = [
+        (jwt.encode({"sub": "user_1"}, SIGNING_SECRET, headers={"kid": "unknown"}), "Unknown signing key"),
+        (jwt.encode({"sub": "user_1"}, "other-" + SIGNING_SECRET, headers={"kid": "k1"}), "Invalid token"),
+        ("not-a-token", "Invalid token"),
+        (expired, "Token has expired"),
+    ]
+    for token, detail in cases:
+        with pytest.raises(HTTPException) as raised:
+            manager.verify_token(token)
+        assert raised.value.status_code == 401
+        assert raised.value.detail == detail
@@ -0,0 +1,38 @@
+import base64
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.core.pagination import PaginationError, build_page, decode_cursor, encode_cursor  # noqa: E402
+
+
+def raw_cursor(value) -> str:
+    raw = json.dumps({"after": value}).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    page = build_page([{"id": 1}, {"id": 2}, {"id": 3}], limit=2)
+    assert [item["id"] for item in page["items"]] == [1, 2]
+    assert decode_cursor(page["next_cursor"]) == 2
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("value", ["1", [1], {"id": 1}, None, True, 1.5])
+def test_cursor_must_decode_to_an_integer(value):
+    with pytest.raises(PaginationError):
+        decode_cursor(raw_cursor(value))
+
+
+@pytest.mark.parametrize("cursor", ["%%%", base64.urlsafe_b64encode(b"[]").decode(), "e30"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor)
+
+
+def test_string_ids_when_allowed():
+    assert decode_cursor(encode_cursor("42"), id_type=(int, str)) == "42"
+    with pytest.raises(PaginationError):
+        decode_cursor(raw_cursor(["42"]), id_type=(int, str))
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("passlib")
+
+from app.core.password_hasher import PasswordHasher, PasswordHasherBusy, PasswordHasherTimeout  # noqa: E402
+
+
+class BlockingContext:
+    """release されるまでハッシュ処理を止めるCryptContextの代わり"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify(self, password, hashed):
+        self.release.wait(5)
+        return hashed == f"hashed:{password}"
+
+    def verify_and_update(self, password, hashed):
+        verified = self.verify(password, hashed)
+        return verified, (f"hashed:{password}" if verified and hashed.startswith("hashed:") else None)
+
+
+def make_hasher(workers=1, max_queue=1, timeout=5.0):
+    hasher = PasswordHasher(workers=workers, max_queue=max_queue, timeout=timeout, rounds=4)
+    hasher.context = BlockingContext()
+    return hasher
+
+
+def test_requests_beyond_the_queue_bound_are_rejected():
+    hasher = make_hasher(workers=1, max_queue=1)
+
+    async def scenario():
+        running = [asyncio.create_task(hasher.hash(f"p{index}")) for index in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("p2")
+        busy = hasher.metrics()
+        hasher.context.release.set()
+        return busy, await asyncio.gather(*running)
+
+    busy, results = asyncio.run(scenario())
+    assert results == ["hashed:p0", "hashed:p1"]
+    assert (busy.in_flight, busy.max_pending, busy.rejected) == (2, 2, 1)
+    # 1スレッドに2件なので1件が待っている
+    assert busy.saturation == 2.0
+
+    done = hasher.metrics()
+    assert (done.in_flight, done.completed, done.saturation) == (0, 2, 0.0)
+    hasher.shutdown()
+
+
+def test_timeout_keeps_the_slot_until_the_thread_finishes():
+    hasher = make_hasher(timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(PasswordHasherTimeout):
+            await hasher.verify("secret", "hashed:secret")
+        return hasher.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert (metrics.timed_out, metrics.in_flight) == (1, 1)
+
+    hasher.context.release.set()
+    hasher.shutdown(wait=True)
+    assert hasher.metrics().in_flight == 0
+
+
+def test_user_password_methods(monkeypatch):
+    pytest.importorskip("sqlalchemy")
+    from app.models.user import User
+
+    hasher = make_hasher()
+    hasher.context.release.set()
+    monkeypatch.setattr("app.models.user.password_hasher", hasher)
+
+    user = User(username="alice")
+    user.set_password("secret")
+    assert user.hashed_password == "hashed:secret"
+    assert user.verify_password("secret") and not user.verify_password("wrong")
+
+    # 新しいハッシュは返すだけで、保存は呼び出し元が行う
+    verified, new_hash = asyncio.run(user.verify_password_async("secret"))
+    assert verified and new_hash == "hashed:secret"
+    assert asyncio.run(user.verify_password_async("wrong")) == (False, None)
+
+    asyncio.run(user.set_password_async("other"))
+    assert user.hashed_password == "hashed:other"
+    hasher.shutdown()
@@ -0,0 +1,126 @@
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+permissions = pytest.importorskip("app.core.permissions")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models.user import Permission, User  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def env(monkeypatch):
+    engine = sqlalchemy.create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    clock = FakeClock()
+    matrix = permissions.PermissionMatrix(
+        permissions.PermissionBits(), session_factory=session_factory, maxsize=2, ttl=5.0, clock=clock
+    )
+    # コミット時の反映先をこのテストのマトリクスにする
+    monkeypatch.setattr(permissions, "permission_matrix", matrix)
+
+    with session_factory() as db:
+        db.add_all([User(id=1, username="alice", email="a@example.com"),
+                    User(id=2, username="bob", email="b@example.com"),
+                    User(id=3, username="carol", email="c@example.com")])
+        db.add(Permission(user_id=1, resource="effects", action="read"))
+        db.commit()
+    yield matrix, session_factory, clock
+    engine.dispose()
+
+
+def allows(matrix, user_id, resource, action):
+    return matrix.get(user_id).allows(matrix.bits.bit(resource, action))
+
+
+def test_grant_is_applied_on_commit(env):
+    matrix, session_factory, _ = env
+    matrix.load(1)
+
+    with session_factory() as db:
+        db.add(Permission(user_id=1, resource="effects", action="write"))
+        db.flush()
+        assert not allows(matrix, 1, "effects", "write")
+        db.commit()
+
+    assert allows(matrix, 1, "effects", "write")
+    assert allows(matrix, 1, "effects", "read")
+
+
+def test_revoke_rebuilds_the_mask(env):
+    matrix, session_factory, _ = env
+    matrix.load(1)
+    assert allows(matrix, 1, "effects", "read")
+
+    with session_factory() as db:
+        db.delete(db.query(Permission).filter(Permission.user_id == 1).one())
+        db.commit()
+
+    assert not allows(matrix, 1, "effects", "read")
+
+
+def test_rollback_discards_pending_changes(env):
+    matrix, session_factory, _ = env
+    matrix.load(1)
+
+    with session_factory() as db:
+        db.add(Permission(user_id=1, resource="effects", action="delete"))
+        db.flush()
+        db.rollback()
+        db.commit()
+
+    assert not allows(matrix, 1, "effects", "delete")
+
+
+def test_superuser_change_rebuilds_the_mask(env):
+    matrix, session_factory, _ = env
+    matrix.load(2)
+    assert not allows(matrix, 2, "users", "delete")
+
+    with session_factory() as db:
+        db.get(User, 2).is_superuser = True
+        db.commit()
+    assert allows(matrix, 2, "users", "delete")
+
+    with session_factory() as db:
+        db.get(User, 2).is_superuser = False
+        db.commit()
+    assert not allows(matrix, 2, "users", "delete")
+
+
+def test_masks_expire_and_reload_changes_from_other_workers(env):
+    matrix, session_factory, clock = env
+    matrix.load(1)
+
+    # 別のワーカーでの削除（このプロセスのマトリクスには届かない）
+    with session_factory() as db:
+        db.query(Permission).filter(Permission.user_id == 1).delete()
+        db.commit()
+    assert allows(matrix, 1, "effects", "read")
+
+    clock.now += 5.0
+    assert matrix.get(1) is None
+    assert not matrix.load(1).allows(matrix.bits.bit("effects", "read"))
+
+
+def test_least_recently_used_users_are_evicted(env):
+    matrix, _, _ = env
+    for user_id in (1, 2, 3):
+        matrix.load(user_id)
+
+    assert len(matrix) == 2
+    assert matrix.get(1) is None
+    assert matrix.cache_stats.evictions == 1
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from pydantic import BaseModel  # noqa: E402
+
+from app.core import preset_catalog as catalog_module  # noqa: E402
+from app.core.preset_catalog import PresetCatalog  # noqa: E402
+
+
+class Preset(BaseModel):
+    name: str
+    type: str
+    parameters: Dict[str, Any] = {}
+
+
+def write_presets(path, names):
+    path.write_text(json.dumps([{"name": name, "type": "particle"} for name in names]))
+
+
+def test_cache_is_written_to_the_configured_directory(tmp_path, monkeypatch):
+    source = tmp_path / "presets"
+    source.mkdir()
+    write_presets(source / "effects.json", ["sparkle"])
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(catalog_module.PRESET_CACHE_DIR_ENV, str(cache_dir))
+
+    catalog = PresetCatalog(source / "effects.json", Preset)
+    assert catalog.load()
+
+    assert catalog.cache_path.parent == cache_dir
+    assert catalog.cache_path.exists()
+    assert sorted(path.name for path in source.iterdir()) == ["effects.json"]
+
+
+def test_cache_is_reused_after_restart(tmp_path, monkeypatch):
+    write_presets(tmp_path / "effects.json", ["sparkle", "glow"])
+    monkeypatch.setenv(catalog_module.PRESET_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    PresetCatalog(tmp_path / "effects.json", Preset).load()
+
+    restarted = PresetCatalog(tmp_path / "effects.json", Preset)
+    monkeypatch.setattr(restarted, "_validate", lambda raw: pytest.fail("cache was not used"))
+    assert restarted.load()
+    assert restarted.names() == ["sparkle", "glow"]
+
+
+def test_unwritable_cache_directory_does_not_fail_load(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    write_presets(tmp_path / "effects.json", ["sparkle"])
+
+    catalog = PresetCatalog(tmp_path / "effects.json", Preset, cache_path=blocker / "effects.cache")
+    assert catalog.load()
+    assert catalog.names() == ["sparkle"]
+
+
+def test_reload_unregisters_deleted_presets(tmp_path, monkeypatch):
+    pytest.importorskip("websockets")
+    magic_effects = pytest.importorskip("app.api.magic_effects")
+    from app.core.effect_engine import EffectEngine
+
+    path = tmp_path / "effects.json"
+    write_presets(path, ["sparkle", "glow"])
+    catalog = PresetCatalog(path, Preset, cache_path=tmp_path / "effects.cache")
+    catalog.load()
+    engine = EffectEngine()
+    monkeypatch.setattr(magic_effects, "effect_engine", engine)
+    asyncio.run(magic_effects.register_presets(catalog))
+    assert sorted(engine.presets) == ["glow", "sparkle"]
+
+    write_presets(path, ["sparkle"])
+    assert catalog.load()
+    asyncio.run(magic_effects.register_presets(catalog))
+    assert sorted(engine.presets) == ["sparkle"]
+
+
+def test_unregister_effect():
+    from app.core.effect_engine import EffectEngine
+
+    engine = EffectEngine()
+    asyncio.run(engine.register_effect(Preset(name="sparkle", type="particle")))
+
+    assert asyncio.run(engine.unregister_effect("sparkle"))
+    assert not asyncio.run(engine.unregister_effect("sparkle"))
+    assert engine.presets == {}
+
+
+def test_default_cache_directory_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv(catalog_module.PRESET_CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    write_presets(tmp_path / "effects.json", ["sparkle"])
+
+    catalog = PresetCatalog(tmp_path / "effects.json", Preset)
+    assert catalog.load()
+
+    assert catalog.cache_path.is_relative_to(tmp_path / "xdg")
+    assert catalog.cache_path.exists()
+    assert catalog.cache_path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_cache_in_a_shared_directory_is_ignored(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    write_presets(tmp_path / "effects.json", ["sparkle"])
+
+    catalog = PresetCatalog(tmp_path / "effects.json", Preset, cache_path=shared / "effects.cache")
+    assert catalog.load()
+    assert catalog.names() == ["sparkle"]
+    assert not catalog.cache_path.exists()
+
+
+def test_tampered_cache_rows_are_validated(tmp_path):
+    write_presets(tmp_path / "effects.json", ["sparkle", "glow"])
+    cache_path = tmp_path / "cache" / "effects.cache"
+    PresetCatalog(tmp_path / "effects.json", Preset, cache_path=cache_path).load()
+
+    cache = json.loads(cache_path.read_text())
+    cache["rows"][1][2] = "not-a-dict"
+    cache_path.write_text(json.dumps(cache))
+
+    restarted = PresetCatalog(tmp_path / "effects.json", Preset, cache_path=cache_path)
+    assert restarted.load()
+    assert [preset.name for preset in restarted.all()] == ["sparkle"]
+    # 検証できない行を含むキャッシュは破棄され、次の読み込みで元ファイルから作り直す
+    assert not cache_path.exists()
+
+
+def test_schema_version_invalidates_the_cache(tmp_path, monkeypatch):
+    write_presets(tmp_path / "effects.json", ["sparkle"])
+    cache_path = tmp_path / "cache" / "effects.cache"
+    PresetCatalog(tmp_path / "effects.json", Preset, cache_path=cache_path, schema_version="1").load()
+
+    stricter = PresetCatalog(
+        tmp_path / "effects.json",
+        Preset,
+        cache_path=cache_path,
+        validator=lambda preset: preset.name != "sparkle",
+        schema_version="2"
+    )
+    validated = []
+    original = stricter._validate
+    monkeypatch.setattr(stricter, "_validate", lambda raw: validated.append(raw) or original(raw))
+    assert stricter.load()
+    assert validated
+    assert stricter.names() == []
+
+
+def test_model_change_invalidates_the_cache(tmp_path):
+    class StrictPreset(BaseModel):
+        name: str
+        type: str
+        parameters: Dict[str, Any] = {}
+        intensity: float = 1.0
+
+    write_presets(tmp_path / "effects.json", ["sparkle"])
+    cache_path = tmp_path / "cache" / "effects.cache"
+    PresetCatalog(tmp_path / "effects.json", Preset, cache_path=cache_path).load()
+
+    catalog = PresetCatalog(tmp_path / "effects.json", StrictPreset, cache_path=cache_path)
+    content_hash = hashlib.sha256((tmp_path / "effects.json").read_bytes()).hexdigest()
+    assert catalog._read_cache(content_hash) is None
+    assert catalog.load()
+    assert catalog.get("sparkle").intensity == 1.0
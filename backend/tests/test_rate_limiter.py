@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.core.event_system import EventSystem
+from app.core.rate_limiter import (
+    AdmissionController,
+    EffectAdmission,
+    RateLimit,
+    RateLimitBackend,
+    RateLimiter,
+    RateLimitExceeded,
+    RedisRateLimitBackend,
+)
+
+
+def make_admission(burst=5, max_queue_depth=8000):
+    return EffectAdmission(
+        limiter=RateLimiter(limits={"user": RateLimit(rate=1.0, burst=burst)}),
+        controller=AdmissionController(max_queue_depth=max_queue_depth)
+    )
+
+
+def test_self_triggering_effect_is_throttled():
+    async def scenario():
+        system = EventSystem(admission=make_admission(burst=5))
+        fired = []
+        rejected = []
+
+        async def loop_trigger(event):
+            # 自分の発動イベントに一致して発火し続けるトリガー
+            fired.append(event)
+            try:
+                await system.trigger_effect("particle", {}, user="trigger:1")
+            except RateLimitExceeded as e:
+                rejected.append(e)
+
+        await system.add_listener("particle", loop_trigger)
+        await system.trigger_effect("particle", {}, user="trigger:1")
+        return system, fired, rejected
+
+    system, fired, rejected = asyncio.run(scenario())
+    assert len(fired) == 5
+    assert [e.scope for e in rejected] == ["user"]
+    assert system.admission.metrics.admitted == 5
+
+
+def test_admission_sheds_load_while_events_are_being_processed():
+    async def scenario():
+        admission = make_admission(max_queue_depth=1)
+        system = EventSystem(admission=admission)
+        admission.controller.queue_depth = system.queue_depth
+        nested = []
+
+        async def handler(event):
+            try:
+                await system.trigger_effect("particle", {}, user="user:b")
+            except RateLimitExceeded as e:
+                nested.append(e)
+
+        await system.add_listener("particle", handler)
+        await system.trigger_effect("particle", {}, user="user:a")
+        return system, nested
+
+    system, nested = asyncio.run(scenario())
+    assert [e.scope for e in nested] == ["event_queue"]
+    assert system.queue_depth() == 0
+
+
+def test_too_many_requests_sets_retry_after():
+    errors = pytest.importorskip("app.api.errors")
+    too_many_requests = errors.too_many_requests
+
+    error = too_many_requests(RateLimitExceeded("user", 2.2))
+
+    assert error.status_code == 429
+    assert error.headers == {"Retry-After": "3"}
+    assert too_many_requests(RateLimitExceeded("user", 0.01)).headers == {"Retry-After": "1"}
+
+
+def test_trigger_actions_are_limited_per_trigger():
+    triggers = pytest.importorskip("app.api.event_triggers")
+
+    async def scenario():
+        system = EventSystem(admission=make_admission(burst=2))
+        effects = []
+        await system.add_listener("particle", effects.append)
+        trigger_system = triggers.EventTriggerSystem()
+        trigger_system.event_system = system
+        action = {"action_type": "effect", "parameters": {"effect_type": "particle"}}
+        for _ in range(5):
+            await trigger_system.dispatch_action(1, action)
+        await trigger_system.dispatch_action(2, action)
+        # トリガーのアクションは完了を待たずに発行される
+        await asyncio.gather(*system._background_tasks)
+        return effects
+
+    assert len(asyncio.run(scenario())) == 3
+
+
+class FakeRedis:
+    """_REDIS_TOKEN_BUCKET と同じ判定を行うスクリプトを返すRedisクライアント（時刻は固定）"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = []
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.calls.append((list(keys), list(args)))
+            cost = args[0]
+            tokens, wait, blocked = [], 0.0, 0
+            for i, key in enumerate(keys, start=1):
+                rate, burst = args[i * 2 - 1], args[i * 2]
+                available = self.buckets.get(key, burst)
+                tokens.append(available)
+                if available < cost and (cost - available) / rate > wait:
+                    wait, blocked = (cost - available) / rate, i
+            if blocked:
+                return [str(wait).encode(), blocked]
+            for key, available in zip(keys, tokens):
+                self.buckets[key] = available - cost
+            return [b"0", 0]
+        return script
+
+
+def test_redis_backend_consumes_all_buckets_or_none():
+    redis = FakeRedis()
+    limiter = RateLimiter(
+        limits={"user": RateLimit(rate=1.0, burst=5.0), "effect_type": RateLimit(rate=2.0, burst=1.0)},
+        backend=RedisRateLimitBackend(redis)
+    )
+
+    async def scenario():
+        await limiter.check(user="a", effect_type="particle")
+        with pytest.raises(RateLimitExceeded) as raised:
+            await limiter.check(user="a", effect_type="particle")
+        return raised.value
+
+    error = asyncio.run(scenario())
+    # 2番目のバケット（Luaでは1始まりの2）が不足している
+    assert error.scope == "effect_type"
+    assert error.retry_after == pytest.approx(0.5)
+    # 不足したバケットがあるため、userのバケットも消費されていない
+    assert redis.buckets == {"ratelimit:user:a": 4.0, "ratelimit:effect_type:particle": 0.0}
+    assert redis.calls[0] == (
+        ["ratelimit:user:a", "ratelimit:effect_type:particle"], [1.0, 1.0, 5.0, 2.0, 1.0]
+    )
+
+
+def test_redis_backend_maps_the_first_bucket_to_index_zero():
+    redis = FakeRedis()
+    redis.buckets["ratelimit:user:a"] = 0.0
+    backend = RedisRateLimitBackend(redis)
+    buckets = [("ratelimit:user:a", RateLimit(rate=4.0, burst=5.0)), ("ratelimit:api_key:k", RateLimit(rate=1.0, burst=5.0))]
+
+    assert asyncio.run(backend.acquire(buckets)) == (0.25, 0)
+    assert asyncio.run(backend.acquire(buckets[1:])) == (0.0, None)
+
+
+def test_rate_limit_backend_requires_acquire():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
@@ -0,0 +1,196 @@
+import asyncio
+import struct
+
+import pytest
+
+from app.core import rcon_client
+from app.core.rcon_client import (
+    AUTH_FAILED_ID,
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_RESPONSE_VALUE,
+    AsyncRCONClient,
+    RCONError,
+    RCONPacket,
+    RCONTimeoutError,
+)
+
+
+class FakeRCONServer:
+    """ローカルで待ち受けるRCONサーバー
+
+    commands にはコマンド -> レスポンス断片のリストを登録する。
+    断片のリストが空の場合は空のレスポンスを1つ返す。
+    """
+
+    def __init__(self, password="secret", commands=None):
+        self.password = password
+        self.commands = commands or {}
+        self.received = []
+        # 各レスポンスの前に送る、どのリクエストにも対応しないパケット
+        self.stray = []
+        self.answer_sentinels = True
+        # Trueの場合は次のパケットを受け取った時点で接続を切る
+        self.hang_up = False
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                (length,) = struct.unpack("<i", await reader.readexactly(4))
+                packet = RCONPacket.decode(await reader.readexactly(length))
+                self.received.append(packet)
+                if self.hang_up:
+                    break
+                writer.write(b"".join(reply.encode() for reply in self._replies(packet)))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    def _replies(self, packet):
+        replies = list(self.stray)
+        if packet.packet_type == SERVERDATA_AUTH:
+            if packet.payload != self.password:
+                return replies + [RCONPacket(AUTH_FAILED_ID, SERVERDATA_AUTH_RESPONSE, "")]
+            # 実際のサーバーと同じく、認証応答の前に空のRESPONSE_VALUEが届く
+            return replies + [
+                RCONPacket(packet.request_id, SERVERDATA_RESPONSE_VALUE, ""),
+                RCONPacket(packet.request_id, SERVERDATA_AUTH_RESPONSE, "")
+            ]
+        if packet.packet_type == SERVERDATA_EXECCOMMAND:
+            fragments = self.commands.get(packet.payload, []) or [""]
+            return replies + [
+                RCONPacket(packet.request_id, SERVERDATA_RESPONSE_VALUE, fragment) for fragment in fragments
+            ]
+        if self.answer_sentinels:
+            return replies + [RCONPacket(packet.request_id, SERVERDATA_RESPONSE_VALUE, "Unknown request 0")]
+        return replies
+
+
+def run_with_server(server, scenario, timeout=1.0):
+    async def main():
+        port = await server.start()
+        client = AsyncRCONClient("127.0.0.1", port, timeout=timeout)
+        try:
+            return await scenario(client)
+        finally:
+            await client.stop()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_packet_framing_round_trips():
+    data = RCONPacket(7, SERVERDATA_EXECCOMMAND, "say こんにちは").encode()
+    body = "say こんにちは".encode("utf-8")
+
+    (length,) = struct.unpack_from("<i", data)
+    # 長さにはリクエストID・タイプ・終端の2バイトが含まれる
+    assert length == len(body) + 10 == len(data) - 4
+    assert data.endswith(b"\x00\x00")
+    assert RCONPacket.decode(data[4:]) == RCONPacket(7, SERVERDATA_EXECCOMMAND, "say こんにちは")
+
+
+def test_request_ids_wrap_before_the_signed_limit(monkeypatch):
+    monkeypatch.setattr(rcon_client, "MAX_REQUEST_ID", 3)
+    allocator = rcon_client._RequestIdAllocator()
+
+    assert [allocator.next() for _ in range(5)] == [1, 2, 1, 2, 1]
+
+
+def test_login_succeeds_with_the_right_password():
+    server = FakeRCONServer()
+
+    async def scenario(client):
+        return await client.login("secret"), client.is_authenticated()
+
+    assert run_with_server(server, scenario) == (True, True)
+    assert [packet.packet_type for packet in server.received] == [SERVERDATA_AUTH]
+
+
+def test_login_fails_when_the_server_answers_minus_one():
+    server = FakeRCONServer()
+
+    async def scenario(client):
+        return await client.login("wrong"), client.is_authenticated()
+
+    assert run_with_server(server, scenario) == (False, False)
+
+
+def test_commands_require_authentication():
+    async def scenario(client):
+        await client.start()
+        with pytest.raises(RCONError):
+            await client.command_batch(["list"])
+
+    run_with_server(FakeRCONServer(), scenario)
+
+
+def test_batch_joins_fragments_and_ends_at_the_sentinel():
+    server = FakeRCONServer(commands={"list": ["There are 2", " players online"], "say hi": []})
+
+    async def scenario(client):
+        await client.login("secret")
+        return await client.command_batch(["list", "say hi", "list"])
+
+    responses = run_with_server(server, scenario)
+    # 空のレスポンスはNoneになる
+    assert responses == ["There are 2 players online", None, "There are 2 players online"]
+
+    commands, sentinel = server.received[1:4], server.received[4]
+    assert [packet.packet_type for packet in commands] == [SERVERDATA_EXECCOMMAND] * 3
+    assert (sentinel.packet_type, sentinel.payload) == (SERVERDATA_RESPONSE_VALUE, "")
+    request_ids = [packet.request_id for packet in server.received[1:]]
+    assert len(set(request_ids)) == 4
+
+
+def test_responses_are_matched_by_request_id():
+    server = FakeRCONServer(commands={"a": ["A"], "b": ["B"]})
+
+    async def scenario(client):
+        await client.login("secret")
+        server.stray = [RCONPacket(9999, SERVERDATA_RESPONSE_VALUE, "stray")]
+        return await asyncio.gather(client.command_batch(["a"]), client.command_batch(["b", "a"]))
+
+    # 並行したバッチのレスポンスは混ざらず、知らないIDのパケットは無視される
+    assert run_with_server(server, scenario) == [["A"], ["B", "A"]]
+
+
+def test_missing_sentinel_response_times_out():
+    server = FakeRCONServer(commands={"list": ["ok"]})
+
+    async def scenario(client):
+        await client.login("secret")
+        server.answer_sentinels = False
+        with pytest.raises(RCONTimeoutError):
+            await client.command_batch(["list"], timeout=0.05)
+        # 遅れて届くレスポンスのための状態は残らない
+        return client._sentinels, client._fragments
+
+    assert run_with_server(server, scenario) == ({}, {})
+
+
+def test_pending_commands_fail_when_the_server_disconnects():
+    server = FakeRCONServer()
+
+    async def scenario(client):
+        await client.login("secret")
+        server.hang_up = True
+        with pytest.raises(RCONError) as raised:
+            await client.command_batch(["list"], timeout=1.0)
+        return raised.value, client.is_authenticated()
+
+    error, authenticated = run_with_server(server, scenario)
+    assert not isinstance(error, RCONTimeoutError)
+    assert not authenticated
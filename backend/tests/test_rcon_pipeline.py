@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.core.rcon_pipeline import EffectCommandPipeline
+
+
+class RecordingExecutor:
+    """受け取ったバッチを記録し、コマンドをそのままレスポンスとして返す"""
+
+    def __init__(self, error=None, responses=None):
+        self.batches = []
+        self.error = error
+        self.responses = responses
+
+    async def __call__(self, commands):
+        self.batches.append(list(commands))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        if self.responses is not None:
+            return self.responses
+        return [f"ok:{command}" for command in commands]
+
+
+def test_commands_within_the_window_are_sent_as_one_batch():
+    executor = RecordingExecutor()
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=0.01)
+        return pipeline, await asyncio.gather(*(pipeline.submit(f"say {index}") for index in range(3)))
+
+    pipeline, responses = asyncio.run(scenario())
+    assert responses == ["ok:say 0", "ok:say 1", "ok:say 2"]
+    assert executor.batches == [["say 0", "say 1", "say 2"]]
+    stats = pipeline.stats
+    assert (stats.batches_sent, stats.commands_sent, stats.largest_batch) == (1, 3, 3)
+
+
+def test_full_batches_are_sent_without_waiting_for_the_window():
+    executor = RecordingExecutor()
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=10.0, max_batch=2)
+        return await asyncio.wait_for(pipeline.submit_many(["a", "b", "c", "d"]), timeout=1.0)
+
+    assert asyncio.run(scenario()) == ["ok:a", "ok:b", "ok:c", "ok:d"]
+    assert executor.batches == [["a", "b"], ["c", "d"]]
+
+
+def test_batches_are_split_at_max_batch():
+    executor = RecordingExecutor()
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=0.01, max_batch=2)
+        responses = await pipeline.submit_many(["a", "b", "c"])
+        return pipeline, responses
+
+    pipeline, responses = asyncio.run(scenario())
+    assert responses == ["ok:a", "ok:b", "ok:c"]
+    assert executor.batches == [["a", "b"], ["c"]]
+    assert (pipeline.stats.batches_sent, pipeline.stats.largest_batch) == (2, 2)
+
+
+def test_executor_errors_fail_every_command_in_the_batch():
+    executor = RecordingExecutor(error=ConnectionError("rcon down"))
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=0.01)
+        return pipeline, await pipeline.submit_many(["a", "b"])
+
+    pipeline, responses = asyncio.run(scenario())
+    assert all(isinstance(response, ConnectionError) for response in responses)
+    assert (pipeline.stats.commands_failed, pipeline.stats.batches_sent) == (2, 0)
+
+
+def test_missing_responses_resolve_to_none():
+    executor = RecordingExecutor(responses=["first"])
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=0.01)
+        return await pipeline.submit_many(["a", "b", "c"])
+
+    assert asyncio.run(scenario()) == ["first", None, None]
+
+
+def test_flush_sends_pending_commands_immediately():
+    executor = RecordingExecutor()
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=10.0, max_batch=2)
+        pending = [asyncio.ensure_future(pipeline.submit(command)) for command in ["a", "b", "c"]]
+        await asyncio.sleep(0)
+        await pipeline.close()
+        return await asyncio.wait_for(asyncio.gather(*pending), timeout=1.0)
+
+    assert asyncio.run(scenario()) == ["ok:a", "ok:b", "ok:c"]
+    assert sorted(map(len, executor.batches)) == [1, 2]
+
+
+def test_in_flight_batches_are_limited():
+    in_flight = []
+    peak = []
+
+    async def executor(commands):
+        in_flight.append(commands)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(commands)
+        return commands
+
+    async def scenario():
+        pipeline = EffectCommandPipeline(executor, window=0.001, max_batch=1, max_in_flight=2)
+        return await pipeline.submit_many(["a", "b", "c", "d"])
+
+    assert asyncio.run(scenario()) == ["a", "b", "c", "d"]
+    assert max(peak) == 2
+
+
+@pytest.mark.parametrize("options", [{"max_batch": 0}, {"max_in_flight": 0}])
+def test_invalid_limits_are_rejected(options):
+    with pytest.raises(ValueError):
+        EffectCommandPipeline(RecordingExecutor(), **options)
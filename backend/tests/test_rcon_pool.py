@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.core.rcon_pool import RCONConnectionPool
+
+
+class FakeClient:
+    """login() の結果を差し替えられるRCONクライアント"""
+
+    def __init__(self, login_result):
+        self.login_result = login_result
+        self.stopped = False
+
+    async def login(self, password: str) -> bool:
+        if isinstance(self.login_result, BaseException):
+            raise self.login_result
+        return self.login_result
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+    def is_authenticated(self) -> bool:
+        return self.login_result is True and not self.stopped
+
+
+@pytest.mark.parametrize("login_result", [False, asyncio.TimeoutError(), ConnectionRefusedError()])
+def test_failed_login_closes_client(login_result):
+    clients = []
+
+    def factory():
+        clients.append(FakeClient(login_result))
+        return clients[-1]
+
+    async def scenario():
+        pool = RCONConnectionPool(factory, "secret", size=1)
+        session = pool._sessions[0]
+        with pytest.raises((PermissionError, asyncio.TimeoutError, ConnectionRefusedError)):
+            await pool._open_session(session)
+        assert session.client is None
+
+    asyncio.run(scenario())
+    assert clients and all(client.stopped for client in clients)
+
+
+def test_successful_login_keeps_client():
+    async def scenario():
+        pool = RCONConnectionPool(lambda: FakeClient(True), "secret", size=1)
+        session = pool._sessions[0]
+        assert await pool._open_session(session) is True
+        assert session.client.is_authenticated()
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+from app.core.timer_wheel import TimerWheel
+
+
+def make_wheel(slots=8):
+    return TimerWheel(tick=1.0, slots=slots, clock=lambda: 0.0)
+
+
+def test_deadlines_beyond_one_revolution_wait_for_their_round():
+    wheel = make_wheel()
+    wheel.schedule(20, "late")
+    wheel.schedule(4, "early")
+
+    fired = {}
+    for now in range(1, 25):
+        for item in wheel.advance(now=float(now)):
+            fired[item] = now
+
+    # 20tick後の要素は同じスロット（20 % 8 == 4）を2回通過しても発火しない
+    assert fired == {"early": 4, "late": 20}
+    assert len(wheel) == 0
+
+
+def test_advancing_past_several_revolutions_returns_items_in_deadline_order():
+    wheel = make_wheel()
+    for delay in (30, 3, 17, 9):
+        wheel.schedule(delay, delay)
+
+    assert wheel.advance(now=10.0) == [3, 9]
+    assert wheel.advance(now=100.0) == [17, 30]
+
+
+def test_schedule_at_rounds_up_and_never_fires_in_the_past():
+    wheel = make_wheel()
+    wheel.advance(now=5.0)
+    wheel.schedule_at(7.2, "rounded")
+    wheel.schedule_at(1.0, "past")
+
+    assert wheel.advance(now=6.0) == ["past"]
+    assert wheel.advance(now=7.0) == []
+    assert wheel.advance(now=8.0) == ["rounded"]
+
+
+def test_cancel():
+    wheel = make_wheel()
+    kept = wheel.schedule(12, "kept")
+    cancelled = wheel.schedule(12, "cancelled")
+
+    assert wheel.cancel(cancelled)
+    assert cancelled not in wheel and kept in wheel
+    assert not wheel.cancel(cancelled)
+    assert not wheel.cancel(None)
+    assert len(wheel) == 1
+    assert wheel.advance(now=20.0) == ["kept"]
@@ -0,0 +1,74 @@
+from app.core import token_cache as token_cache_module
+from app.core.token_cache import VerifiedTokenCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_at_ttl_before_exp():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(ttl=5.0, clock=clock)
+    claims = {"sub": "alice", "exp": clock.now + 1800}
+    cache.put("token", claims)
+
+    clock.now += 4.9
+    assert cache.get("token") == claims
+    clock.now += 0.2
+    assert cache.get("token") is None
+
+
+def test_entry_expires_at_exp_before_ttl():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(ttl=5.0, clock=clock)
+    cache.put("token", {"sub": "alice", "exp": clock.now + 2})
+
+    clock.now += 1.9
+    assert cache.get("token") is not None
+    clock.now += 0.2
+    assert cache.get("token") is None
+
+
+def test_expired_token_is_not_cached():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(ttl=5.0, clock=clock)
+    cache.put("token", {"sub": "alice", "exp": clock.now - 1})
+
+    assert len(cache) == 0
+    assert cache.get("token") is None
+
+
+def test_invalidate_removes_only_that_token():
+    cache = VerifiedTokenCache(ttl=5.0, clock=FakeClock())
+    cache.put("revoked", {"sub": "alice"})
+    cache.put("other", {"sub": "bob"})
+
+    assert cache.invalidate("revoked")
+    assert not cache.invalidate("revoked")
+    assert cache.get("revoked") is None
+    assert cache.get("other") == {"sub": "bob"}
+    assert cache.stats.invalidations == 1
+
+
+def test_returned_claims_are_copies():
+    cache = VerifiedTokenCache(ttl=5.0, clock=FakeClock())
+    cache.put("token", {"sub": "alice"})
+
+    cache.get("token")["sub"] = "mallory"
+    assert cache.get("token") == {"sub": "alice"}
+
+
+def test_ttl_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv(token_cache_module.TOKEN_CACHE_TTL_ENV, "0")
+    cache = VerifiedTokenCache(clock=FakeClock())
+    cache.put("token", {"sub": "alice"})
+
+    assert cache.ttl == 0.0
+    assert cache.get("token") is None
+
+    monkeypatch.delenv(token_cache_module.TOKEN_CACHE_TTL_ENV)
+    assert VerifiedTokenCache().ttl == token_cache_module.DEFAULT_TOKEN_CACHE_TTL
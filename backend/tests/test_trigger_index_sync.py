@@ -0,0 +1,93 @@
+import asyncio
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.core import trigger_registry as registry_module  # noqa: E402
+from app.core.condition_compiler import TriggerIndex  # noqa: E402
+from app.core.event_system import ALL_EVENTS, Event, EventSystem  # noqa: E402
+from app.core.trigger_registry import TriggerRegistry, index_trigger  # noqa: E402
+from app.models.trigger import TriggerType  # noqa: E402
+
+
+def make_trigger(trigger_id, trigger_type=TriggerType.EVENT, conditions=(), is_active=True):
+    def condition(condition_type, parameters):
+        return SimpleNamespace(
+            condition_type=condition_type,
+            parameters=parameters,
+            to_dict=lambda: {"condition_type": condition_type, "parameters": parameters}
+        )
+
+    action = {"action_type": "effect", "parameters": {"effect_type": "sparkle"}, "order": 0}
+    return SimpleNamespace(
+        id=trigger_id,
+        type=trigger_type,
+        is_active=is_active,
+        conditions=[condition(*item) for item in conditions],
+        actions=[SimpleNamespace(to_dict=lambda: dict(action))],
+        to_dict=lambda: {"id": trigger_id, "type": trigger_type.value, "is_active": is_active}
+    )
+
+
+def test_index_follows_trigger_changes():
+    index = TriggerIndex()
+    trigger = make_trigger(1, conditions=[("player_join", {"world": "nether"})])
+
+    index_trigger("1", trigger, index)
+    matched = index.match("player_join", {"world": "nether"})
+    assert [compiled.trigger_id for compiled in matched] == ["1"]
+    assert matched[0].payload[0]["parameters"]["effect_type"] == "sparkle"
+    assert index.match("player_join", {"world": "overworld"}) == []
+
+    index_trigger("1", make_trigger(1, conditions=[("player_join", {})], is_active=False), index)
+    assert "1" not in index
+
+    index_trigger("1", trigger, index)
+    index_trigger("1", None, index)
+    assert "1" not in index
+
+
+def test_time_and_invalid_triggers_are_not_indexed():
+    index = TriggerIndex()
+    index_trigger("1", make_trigger(1, TriggerType.TIME, [("schedule", {"cron": "* * * * *"})]), index)
+    index_trigger("2", make_trigger(2, conditions=[("player_join", {"$bogus": 1})]), index)
+    assert len(index) == 0
+
+
+def test_registry_load_builds_index(monkeypatch):
+    triggers = [
+        make_trigger(1, conditions=[("player_join", {"world": "nether"})]),
+        make_trigger(2, TriggerType.TIME, [("schedule", {"interval_seconds": 60})]),
+    ]
+    monkeypatch.setattr(
+        registry_module,
+        "query_triggers",
+        lambda db: SimpleNamespace(all=lambda: triggers)
+    )
+
+    @contextmanager
+    def session_factory():
+        yield object()
+
+    index = TriggerIndex()
+    registry = TriggerRegistry()
+    registry.subscribe(lambda trigger_id, trigger: index_trigger(trigger_id, trigger, index))
+    asyncio.run(registry.load(session_factory))
+
+    assert "1" in index and "2" not in index
+
+
+def test_all_events_handler_receives_every_event():
+    received = []
+
+    async def scenario():
+        events = EventSystem()
+        await events.add_listener(ALL_EVENTS, lambda event: received.append(event.type))
+        await events.publish(Event(type="player_join", data={}))
+        await events.publish(Event(type="effect_expired", data={}))
+
+    asyncio.run(scenario())
+    assert received == ["player_join", "effect_expired"]
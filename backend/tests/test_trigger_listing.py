@@ -0,0 +1,126 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api import event_triggers  # noqa: E402
+from app.core import authorization  # noqa: E402
+from app.core.auth import get_current_user  # noqa: E402
+from app.core.database import get_db  # noqa: E402
+from app.core.permissions import ALL_PERMISSIONS, UserPermissions  # noqa: E402
+from app.core.trigger_registry import TriggerRegistry  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.trigger import ActionType, EventCondition, Trigger, TriggerAction, TriggerType  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+from conftest import count_queries  # noqa: E402
+
+# サブモジュール router を読み込むとパッケージの属性 router が置き換わるため、先に取っておく
+trigger_api_router = event_triggers.router
+router_module = importlib.import_module("app.api.event_triggers.router")
+
+
+@pytest.fixture
+def engine():
+    engine = sqlalchemy.create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([User(id=1, username="alice", email="a@example.com"),
+                    User(id=2, username="bob", email="b@example.com")])
+        for trigger_id in range(1, 8):
+            db.add(Trigger(
+                id=trigger_id,
+                name=f"trigger-{trigger_id}",
+                description="x" * 100,
+                type=TriggerType.TIME if trigger_id % 2 else TriggerType.EVENT,
+                is_active=trigger_id != 3,
+                user_id=1 if trigger_id <= 5 else 2
+            ))
+            db.add(EventCondition(trigger_id=trigger_id, condition_type="event", parameters={"event_type": "x"}))
+            db.add(TriggerAction(trigger_id=trigger_id, action_type=ActionType.EFFECT, parameters={}, order=0))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    session_factory = sessionmaker(bind=engine)
+
+    async def allow_all(request):
+        return UserPermissions(1, ALL_PERMISSIONS)
+
+    def override_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(authorization, "resolve_permissions", allow_all)
+    monkeypatch.setattr(event_triggers, "SessionLocal", session_factory)
+    monkeypatch.setattr(event_triggers, "trigger_registry", TriggerRegistry())
+
+    app = FastAPI()
+    # /triggers/list が /triggers/{trigger_id} に一致しないよう先に登録する
+    app.include_router(router_module.router)
+    app.include_router(trigger_api_router)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    return TestClient(app)
+
+
+def collect(client, url, **params):
+    items, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "cursor": cursor} if cursor else params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_trigger_pages_are_read_from_the_database(client):
+    items = collect(client, "/triggers", limit=3)
+
+    assert [item["id"] for item in items] == list(range(1, 8))
+    assert items[0]["type"] == "time"
+    assert items[0]["conditions"][0]["condition_type"] == "event"
+    assert items[0]["actions"][0]["action_type"] == "effect"
+
+
+def test_trigger_pages_filter_by_type_and_active_flag(client):
+    items = collect(client, "/triggers", limit=2, type="time", is_active="true")
+
+    assert [item["id"] for item in items] == [1, 5, 7]
+
+
+def test_trigger_fields_are_projected_in_sql(client, engine):
+    with count_queries(engine) as counter:
+        response = client.get("/triggers", params={"fields": "name"})
+
+    assert response.status_code == 200
+    assert response.json()["items"][0] == {"id": 1, "name": "trigger-1"}
+    assert counter.count == 1
+    assert "description" not in counter.statements[0]
+
+
+def test_trigger_list_is_limited_to_the_owner(client):
+    items = collect(client, "/triggers/list", limit=2, is_active="true", fields="name,user_id")
+
+    assert [item["id"] for item in items] == [1, 2, 4, 5]
+    assert {item["user_id"] for item in items} == {1}
+    assert set(items[0]) == {"id", "name", "user_id"}
+
+    assert [item["id"] for item in collect(client, "/triggers/list", type="event")] == [2, 4]
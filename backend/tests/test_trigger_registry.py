@@ -0,0 +1,65 @@
+import asyncio
+import enum
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.core import trigger_registry as registry_module  # noqa: E402
+from app.core.trigger_registry import TriggerRegistry  # noqa: E402
+from app.models.trigger import TriggerType  # noqa: E402
+
+
+def make_trigger(trigger_id, trigger_type, is_active=True):
+    return SimpleNamespace(
+        id=trigger_id,
+        type=trigger_type,
+        is_active=is_active,
+        conditions=[],
+        actions=[],
+        to_dict=lambda: {"id": trigger_id, "type": trigger_type.value, "is_active": is_active}
+    )
+
+
+def load_registry(monkeypatch, triggers, threads=None):
+    def query(db):
+        if threads is not None:
+            threads.append(threading.get_ident())
+        return SimpleNamespace(all=lambda: list(triggers))
+
+    monkeypatch.setattr(registry_module, "query_triggers", query)
+
+    @contextmanager
+    def session_factory():
+        yield object()
+
+    registry = TriggerRegistry()
+    asyncio.run(registry.load(session_factory))
+    return registry
+
+
+def test_load_queries_outside_the_event_loop(monkeypatch):
+    threads = []
+    load_registry(monkeypatch, [make_trigger(1, TriggerType.EVENT)], threads)
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_type_filters_match_by_value(monkeypatch):
+    # 別のモジュールパスから読み込まれた同名の列挙型
+    class OtherTriggerType(enum.Enum):
+        TIME = "time"
+        EVENT = "event"
+
+    registry = load_registry(monkeypatch, [
+        make_trigger(1, TriggerType.TIME),
+        make_trigger(2, TriggerType.EVENT),
+        make_trigger(3, TriggerType.TIME, is_active=False),
+    ])
+
+    assert [trigger.id for trigger in registry.active(OtherTriggerType.TIME)] == [1]
+    assert [trigger.id for trigger in registry.active(TriggerType.EVENT)] == [2]
+    assert [row["id"] for row in registry.page(None, 10, trigger_type=OtherTriggerType.TIME)] == [1, 3]
+    assert [row["id"] for row in registry.page(None, 10, trigger_type="event")] == [2]
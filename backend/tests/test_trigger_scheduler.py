@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.trigger_scheduler import CronSchedule, Schedule, ScheduleError, parse_schedule
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def fire_times(expression, start, count):
+    schedule = CronSchedule(expression)
+    moments, moment = [], start
+    for _ in range(count):
+        moment = schedule.next_after(moment)
+        moments.append(moment)
+    return moments
+
+
+def test_schedule_requires_next_after():
+    with pytest.raises(TypeError):
+        Schedule()
+
+
+def test_cron_ranges_wrap_to_the_next_day():
+    assert fire_times("0 9-17 * * *", utc(2024, 5, 1, 17, 30), 2) == [
+        utc(2024, 5, 2, 9, 0), utc(2024, 5, 2, 10, 0)
+    ]
+
+
+@pytest.mark.parametrize("expression, minutes", [
+    ("*/15 * * * *", {0, 15, 30, 45}),
+    ("5-20/5 * * * *", {5, 10, 15, 20}),
+    ("10/20 * * * *", {10, 30, 50}),
+    ("1,2,40-41 * * * *", {1, 2, 40, 41}),
+])
+def test_cron_steps_and_lists(expression, minutes):
+    assert CronSchedule(expression).minutes == minutes
+
+
+def test_cron_step_fires_on_the_next_matching_minute():
+    assert fire_times("*/15 * * * *", utc(2024, 5, 1, 10, 7, 30), 3) == [
+        utc(2024, 5, 1, 10, 15), utc(2024, 5, 1, 10, 30), utc(2024, 5, 1, 10, 45)
+    ]
+
+
+def test_cron_day_of_month_or_day_of_week():
+    # 2024-09-01 は日曜日。13日か金曜日のどちらかに一致すれば発火する
+    assert fire_times("0 0 13 * 5", utc(2024, 9, 1), 4) == [
+        utc(2024, 9, 6), utc(2024, 9, 13), utc(2024, 9, 20), utc(2024, 9, 27)
+    ]
+    # 片方が * の場合はもう片方だけで判定する
+    assert fire_times("0 0 13 * *", utc(2024, 9, 1), 2) == [utc(2024, 9, 13), utc(2024, 10, 13)]
+    assert fire_times("0 0 * * 5", utc(2024, 9, 1), 2) == [utc(2024, 9, 6), utc(2024, 9, 13)]
+
+
+def test_cron_sunday_is_zero():
+    assert fire_times("30 12 * * 0", utc(2024, 9, 2), 1) == [utc(2024, 9, 8, 12, 30)]
+
+
+def test_cron_month_rollover():
+    # 31日がない月は飛ばす
+    assert fire_times("0 0 31 * *", utc(2024, 4, 15), 2) == [utc(2024, 5, 31), utc(2024, 7, 31)]
+    # 年をまたぐ
+    assert fire_times("0 0 1 1 *", utc(2024, 12, 31, 23, 59), 1) == [utc(2025, 1, 1)]
+    assert fire_times("59 23 31 12 *", utc(2024, 12, 31, 23, 59), 1) == [utc(2025, 12, 31, 23, 59)]
+    # うるう日は4年後まで待つ
+    assert fire_times("0 0 29 2 *", utc(2025, 3, 1), 1) == [utc(2028, 2, 29)]
+
+
+@pytest.mark.parametrize("expression", ["60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *", "* * * * 7",
+                                        "5-1 * * * *", "*/0 * * * *", "* * * *"])
+def test_invalid_cron_expressions(expression):
+    with pytest.raises(ScheduleError):
+        CronSchedule(expression)
+
+
+def test_parse_schedule_formats():
+    now = utc(2024, 1, 1)
+    interval = parse_schedule({"interval_seconds": 60}, now=now)
+    assert interval.next_after(utc(2024, 1, 1, 0, 2, 30)) == utc(2024, 1, 1, 0, 3)
+
+    once = parse_schedule({"at": "2024-01-02T00:00:00"}, now=now)
+    assert once.next_after(now) == utc(2024, 1, 2)
+    assert once.next_after(utc(2024, 1, 2)) is None
+
+    with pytest.raises(ScheduleError):
+        parse_schedule({"interval_seconds": 0}, now=now)
+    with pytest.raises(ScheduleError):
+        parse_schedule({}, now=now)
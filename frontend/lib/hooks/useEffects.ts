@@ -1,28 +1,130 @@
 import useSWR from 'swr';
-import { useCallback } from 'react';
+import useSWRInfinite from 'swr/infinite';
+import { useCallback, useMemo } from 'react';
 import { Effect } from '../types/Effect';
-import { fetchEffects } from '../api/effects';
 import { useEffectStore } from '../store/effectStore';
 
+// カーソルページネーションのレスポンス型
+interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// エフェクト一覧取得時のオプション
+export interface EffectListOptions {
+  pageSize?: number;
+  includePresets?: boolean;
+}
+
 /**
- * エフェクトの一覧を取得するカスタムフック
- * @returns エフェクト一覧とローディング・エラー状態
+ * エフェクトの一覧をページ単位で取得するカスタムフック
+ * @param options ページサイズ・プリセットを含めるかどうか
+ * @returns 読み込み済みのエフェクトと次のページの読み込み関数
  */
-export const useEffectsList = () => {
-  const { data, error, mutate } = useSWR<Effect[]>('/api/effects', fetchEffects, {
-    revalidateOnFocus: false,
-    revalidateOnReconnect: true,
-  });
+export const useEffectsList = (options: EffectListOptions = {}) => {
+  const { data, error, size, setSize, isValidating, mutate } = useSWRInfinite<Page<Effect>>(
+    (pageIndex, previousPage: Page<Effect> | null) => {
+      if (previousPage && !previousPage.next_cursor) return null;
+
+      const params = new URLSearchParams({ limit: String(options.pageSize ?? 100) });
+      if (pageIndex > 0 && previousPage?.next_cursor) params.set('cursor', previousPage.next_cursor);
+      if (options.includePresets) params.set('include_presets', 'true');
+      return `/api/effects?${params.toString()}`;
+    },
+    async (url: string) => {
+      const response = await fetch(url);
+      if (!response.ok) throw new Error('Failed to fetch effects');
+      return response.json();
+    },
+    {
+      revalidateOnFocus: false,
+      revalidateOnReconnect: true,
+    }
+  );
 
   const setEffects = useEffectStore((state) => state.setEffects);
+  // 描画ごとに新しい配列を作るとストアの更新が繰り返されるため、ページが変わった時だけ結合する
+  const effects = useMemo(() => data?.flatMap((page) => page.items), [data]);
 
   // データが更新されたらストアも更新
-  if (data) {
-    setEffects(data);
+  if (effects) {
+    setEffects(effects);
   }
 
+  const hasMore = Boolean(data?.[data.length - 1]?.next_cursor);
+
+  const loadMore = useCallback(() => {
+    if (hasMore && !isValidating) {
+      return setSize(size + 1);
+    }
+  }, [hasMore, isValidating, setSize, size]);
+
+  return {
+    effects,
+    hasMore,
+    loadMore,
+    isLoading: !error && !data,
+    isError: error,
+    mutate,
+  };
+};
+
+// エフェクトプリセットの型定義
+export interface EffectPreset {
+  id: number;
+  name: string;
+  effect_id: number;
+  settings: Record<string, unknown>;
+  created_at: number;
+}
+
+// プリセット一覧取得時の絞り込み条件
+export interface PresetListOptions {
+  pageSize?: number;
+  effectId?: number;
+  type?: string;
+  fields?: (keyof EffectPreset)[];
+}
+
+/**
+ * エフェクトプリセットの一覧をページ単位で取得するカスタムフック
+ * @param options ページサイズ・絞り込み条件
+ * @returns 読み込み済みのプリセットと次のページの読み込み関数
+ */
+export const useEffectPresets = (options: PresetListOptions = {}) => {
+  const { data, error, size, setSize, isValidating, mutate } = useSWRInfinite<Page<EffectPreset>>(
+    (pageIndex, previousPage: Page<EffectPreset> | null) => {
+      if (previousPage && !previousPage.next_cursor) return null;
+
+      const params = new URLSearchParams({ limit: String(options.pageSize ?? 100) });
+      if (pageIndex > 0 && previousPage?.next_cursor) params.set('cursor', previousPage.next_cursor);
+      if (options.effectId !== undefined) params.set('effect_id', String(options.effectId));
+      if (options.type) params.set('type', options.type);
+      if (options.fields?.length) params.set('fields', options.fields.join(','));
+      return `/api/effects/presets?${params.toString()}`;
+    },
+    async (url: string) => {
+      const response = await fetch(url);
+      if (!response.ok) throw new Error('Failed to fetch effect presets');
+      return response.json();
+    },
+    {
+      revalidateOnFocus: false,
+    }
+  );
+
+  const hasMore = Boolean(data?.[data.length - 1]?.next_cursor);
+
+  const loadMore = useCallback(() => {
+    if (hasMore && !isValidating) {
+      return setSize(size + 1);
+    }
+  }, [hasMore, isValidating, setSize, size]);
+
   return {
-    effects: data,
+    presets: data?.flatMap((page) => page.items),
+    hasMore,
+    loadMore,
     isLoading: !error && !data,
     isError: error,
     mutate,
@@ -1,5 +1,5 @@
 import { useState, useCallback } from 'react';
-import { useSWR } from 'swr';
+import useSWRInfinite from 'swr/infinite';
 import axios from 'axios';
 
 // トリガーの型定義
@@ -20,27 +20,71 @@ interface CreateTriggerInput {
   parameters?: Record<string, unknown>;
 }
 
+// カーソルページネーションのレスポンス型
+interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// 一覧取得時の絞り込み条件
+export interface TriggerListOptions {
+  pageSize?: number;
+  type?: string;
+  isActive?: boolean;
+  fields?: string[];
+}
+
 // APIエンドポイントの設定
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL;
 const TRIGGERS_ENDPOINT = `${API_BASE_URL}/api/triggers`;
+const DEFAULT_PAGE_SIZE = 100;
+
+/**
+ * ページのURLを組み立てる（前のページが最終ページならnullを返す）
+ */
+const buildPageUrl = (
+  options: TriggerListOptions,
+  pageIndex: number,
+  previousPage: Page<Trigger> | null
+): string | null => {
+  if (previousPage && !previousPage.next_cursor) return null;
+
+  const params = new URLSearchParams({ limit: String(options.pageSize ?? DEFAULT_PAGE_SIZE) });
+  if (pageIndex > 0 && previousPage?.next_cursor) params.set('cursor', previousPage.next_cursor);
+  if (options.type) params.set('type', options.type);
+  if (options.isActive !== undefined) params.set('is_active', String(options.isActive));
+  if (options.fields?.length) params.set('fields', options.fields.join(','));
+  return `${TRIGGERS_ENDPOINT}?${params.toString()}`;
+};
 
 /**
  * トリガー関連の操作を管理するカスタムフック
+ * @param options 一覧取得時のページサイズ・絞り込み条件
  * @returns トリガー関連の操作と状態を提供するオブジェクト
  */
-export const useTriggers = () => {
+export const useTriggers = (options: TriggerListOptions = {}) => {
   const [error, setError] = useState<Error | null>(null);
   const [isLoading, setIsLoading] = useState(false);
 
-  // SWRを使用してトリガー一覧を取得
-  const { data: triggers, mutate } = useSWR<Trigger[]>(
-    TRIGGERS_ENDPOINT,
-    async (url) => {
+  // SWRを使用してトリガー一覧をページ単位で取得
+  const { data: pages, mutate, size, setSize, isValidating } = useSWRInfinite<Page<Trigger>>(
+    (pageIndex, previousPage) => buildPageUrl(options, pageIndex, previousPage),
+    async (url: string) => {
       const response = await axios.get(url);
       return response.data;
     }
   );
 
+  const triggers = pages?.flatMap((page) => page.items);
+  const hasMore = Boolean(pages?.[pages.length - 1]?.next_cursor);
+
+  // 次のページを読み込む
+  const loadMore = useCallback(() => {
+    if (hasMore && !isValidating) {
+      return setSize(size + 1);
+    }
+  }, [hasMore, isValidating, setSize, size]);
+
   // トリガーの作成
   const createTrigger = useCallback(async (input: CreateTriggerInput) => {
     setIsLoading(true);
@@ -106,6 +150,8 @@ export const useTriggers = () => {
 
   return {
     triggers,
+    hasMore,
+    loadMore,
     isLoading,
     error,
     createTrigger,